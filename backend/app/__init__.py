@@ -6,16 +6,39 @@ from routes.property_routes import property_bp
 from routes.analytics_routes import analytics_bp
 from routes.data_routes import data_bp
 from routes.developer_routes import developer_bp
+from routes.metrics_routes import metrics_bp
+from routes.debug_routes import debug_bp
+from app.config import CLIMATE_LOOKUP_METHOD, DEBUG_PROFILING
+from app.services.metrics import instrument_app
+from app.services.gridcode_raster import prepare_gridcode_rasters
+from app.services.model_registry import model_registry
+from app.services.profiler import install_request_profiler
 
 def create_app():
     app = Flask(__name__)
     CORS(app, resources={r"/api/*": {"origins": "*"}})  # Enable CORS for all /api routes
     
+    # Per-route latency, status and in-flight metrics, served on /api/metrics
+    instrument_app(app)
+    
     # Register blueprints
     app.register_blueprint(test_bp)
     app.register_blueprint(property_bp)
     app.register_blueprint(analytics_bp)
     app.register_blueprint(data_bp)
     app.register_blueprint(developer_bp)
+    app.register_blueprint(metrics_bp)
+    
+    # Admin-only profiling; off by default so requests pay nothing for it
+    if DEBUG_PROFILING:
+        install_request_profiler(app)
+        app.register_blueprint(debug_bp)
+    
+    # Deserialize the price model once, not per prediction
+    model_registry.load_if_available()
+    
+    # Open the climate rasters; missing ones are built in the background
+    if CLIMATE_LOOKUP_METHOD == 'raster':
+        prepare_gridcode_rasters()
     
     return app
\ No newline at end of file
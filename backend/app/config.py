@@ -18,10 +18,126 @@ MAPID_API_KEY = os.getenv('MAPID_API_KEY', '')
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
 TESTING = os.getenv('TESTING', 'False') == 'True'
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret_key')
+# Token for admin-only endpoints (sent as X-Admin-Token); empty disables them
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+# Admin-only profiling (/api/debug/profile and the X-Profile: 1 request
+# header); nothing is registered while disabled. Sampling windows are capped
+# at DEBUG_PROFILE_MAX_SECONDS and take a stack sample every
+# DEBUG_PROFILE_INTERVAL_MS
+DEBUG_PROFILING = os.getenv('DEBUG_PROFILING', 'false').lower() == 'true'
+DEBUG_PROFILE_MAX_SECONDS = float(os.getenv('DEBUG_PROFILE_MAX_SECONDS', '60'))
+DEBUG_PROFILE_INTERVAL_MS = float(os.getenv('DEBUG_PROFILE_INTERVAL_MS', '5'))
 
 # Database URI
 DATABASE_URI = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Data locations
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(BASE_DIR, 'data'))
+GEOJSON_DIR = os.getenv('GEOJSON_DIR', os.path.join(DATA_DIR, 'geojson'))
+PROPERTY_CSV_PATH = os.getenv('PROPERTY_CSV_PATH', os.path.join(DATA_DIR, 'properti_bandung_rumah.csv'))
+
+# GeoJSON layer cache (parsed layers are evicted least-recently-used first
+# once their combined in-memory size exceeds this budget)
+LAYER_CACHE_MAX_BYTES = int(os.getenv('LAYER_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Binary layer stores written by python -m tools.compile_layers
+COMPILED_LAYERS_DIR = os.getenv('COMPILED_LAYERS_DIR', os.path.join(DATA_DIR, 'compiled'))
+
+# Price prediction pipeline, loaded once at startup and hot-swappable
+MODEL_PATH = os.path.abspath(os.getenv('MODEL_PATH', os.path.join(BASE_DIR, 'routes', 'model', 'best_xgb_pipeline.joblib')))
+# Directory POST /api/developer/model/reload may load models from (paths
+# are unpickled, so nothing outside it is accepted)
+MODEL_DIR = os.path.realpath(os.getenv('MODEL_DIR') or os.path.dirname(MODEL_PATH))
+# Most properties accepted by POST /api/developer/predict-price/batch
+PRICE_BATCH_MAX_ROWS = int(os.getenv('PRICE_BATCH_MAX_ROWS', '10000'))
+# Most values per axis of a /api/developer/price-sensitivity sweep (the
+# whole grid is also bounded by PRICE_BATCH_MAX_ROWS)
+PRICE_SWEEP_MAX_STEPS = int(os.getenv('PRICE_SWEEP_MAX_STEPS', '200'))
+# /api/developer/price-heatmap grids: cell size in degrees when none is
+# given (about 110 m), largest grid, and cached square blocks of cells
+PRICE_HEATMAP_DEFAULT_RESOLUTION = float(os.getenv('PRICE_HEATMAP_DEFAULT_RESOLUTION', '0.001'))
+PRICE_HEATMAP_MAX_CELLS = int(os.getenv('PRICE_HEATMAP_MAX_CELLS', '262144'))
+PRICE_HEATMAP_BLOCK_SIZE = int(os.getenv('PRICE_HEATMAP_BLOCK_SIZE', '64'))
+PRICE_HEATMAP_CACHE_BYTES = int(os.getenv('PRICE_HEATMAP_CACHE_BYTES', str(64 * 1024 * 1024)))
+# Concurrent single predictions are coalesced into one model call of up to
+# PRICE_MICROBATCH_SIZE rows, waiting at most PRICE_MICROBATCH_WAIT_MS for
+# the batch to fill (a size of 1 disables batching)
+PRICE_MICROBATCH_SIZE = int(os.getenv('PRICE_MICROBATCH_SIZE', '64'))
+PRICE_MICROBATCH_WAIT_MS = float(os.getenv('PRICE_MICROBATCH_WAIT_MS', '2'))
+# Memoized predictions, keyed on the preprocessed feature row and the model
+# version (cleared whenever a model is swapped in)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '3600'))
+# Encode features straight into NumPy instead of through a DataFrame when
+# the model's preprocessing allows it (checked against the DataFrame path)
+PRICE_FEATURE_ENCODER = os.getenv('PRICE_FEATURE_ENCODER', 'true').lower() == 'true'
+
+# Heavy prediction and geometry work runs on a bounded thread pool
+# ('inline': on the request thread); requests beyond INFERENCE_MAX_PENDING
+# running or queued tasks get 503, callers wait at most INFERENCE_TIMEOUT
+# seconds (504), and each model call uses INFERENCE_MODEL_THREADS threads
+INFERENCE_EXECUTOR = os.getenv('INFERENCE_EXECUTOR', 'thread')
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS') or 0) or min(4, os.cpu_count() or 1)
+INFERENCE_MAX_PENDING = int(os.getenv('INFERENCE_MAX_PENDING') or 0) or INFERENCE_WORKERS * 16
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '30'))
+INFERENCE_MODEL_THREADS = int(os.getenv('INFERENCE_MODEL_THREADS') or 0) or max(1, (os.cpu_count() or 1) // INFERENCE_WORKERS)
+
+# Largest page a client may request; larger values are clamped
+GEOJSON_MAX_PAGE_SIZE = int(os.getenv('GEOJSON_MAX_PAGE_SIZE', '5000'))
+PROPERTY_MAX_PAGE_SIZE = int(os.getenv('PROPERTY_MAX_PAGE_SIZE', '500'))
+PROPERTY_DEFAULT_PAGE_SIZE = int(os.getenv('PROPERTY_DEFAULT_PAGE_SIZE', '100'))
+
+# Derived artifacts rebuilt from the GeoJSON layers (safe to delete)
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(DATA_DIR, 'cache'))
+LAYER_PAGES_DIR = os.path.join(CACHE_DIR, 'pages')
+# Page sizes served from pre-serialized chunks; other sizes are encoded per request
+LAYER_PAGE_SIZES = [int(size) for size in os.getenv('LAYER_PAGE_SIZES', '1000').split(',') if size.strip()]
+
+# Map tiles built from the GeoJSON layers
+TILES_DIR = os.path.join(CACHE_DIR, 'tiles')
+TILE_EXTENT = int(os.getenv('TILE_EXTENT', '4096'))
+TILE_BUFFER = int(os.getenv('TILE_BUFFER', '64'))
+# Below this zoom a tile holds most of the city, so tiles are refused
+TILE_MIN_ZOOM = int(os.getenv('TILE_MIN_ZOOM', '10'))
+TILE_MAX_ZOOM = int(os.getenv('TILE_MAX_ZOOM', '18'))
+# Simplification tolerance in screen pixels of a 256px tile
+TILE_SIMPLIFY_PIXELS = float(os.getenv('TILE_SIMPLIFY_PIXELS', '0.5'))
+TILE_CACHE_MAX_BYTES = int(os.getenv('TILE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Grid size used to quantize coordinates in format=topojson responses
+TOPOJSON_QUANTIZATION = int(os.getenv('TOPOJSON_QUANTIZATION', '100000'))
+
+# Climate layers rasterized for array-indexed gridcode lookups
+# ('raster' or 'polygon'; raster falls back to polygon when no raster exists)
+CLIMATE_LOOKUP_METHOD = os.getenv('CLIMATE_LOOKUP_METHOD', 'raster')
+# Cell size in degrees; empty means the pixel size the layer was polygonized from
+GRIDCODE_RASTER_RESOLUTION = float(os.getenv('GRIDCODE_RASTER_RESOLUTION') or 0) or None
+# Largest raster per layer (one byte per cell for small integer gridcodes)
+GRIDCODE_RASTER_MAX_CELLS = int(os.getenv('GRIDCODE_RASTER_MAX_CELLS', str(16 * 1024 * 1024)))
+# Rasters are built by tools/rasterize_layers.py at deploy time; the app
+# opens them at startup and rasterizes missing ones on one background thread
+# (unless this is false), never on a request. Layers use the polygon lookup
+# until their raster exists.
+GRIDCODE_RASTER_BUILD_AT_STARTUP = os.getenv('GRIDCODE_RASTER_BUILD_AT_STARTUP', 'true').lower() == 'true'
+
+# POST /api/climate/scores/batch limits; results are scored and streamed in chunks
+CLIMATE_BATCH_MAX_POINTS = int(os.getenv('CLIMATE_BATCH_MAX_POINTS', '1000000'))
+CLIMATE_BATCH_CHUNK_SIZE = int(os.getenv('CLIMATE_BATCH_CHUNK_SIZE', '10000'))
+
+# Memoized climate scores, keyed on the climate raster cells of a point, or
+# on its exact coordinates when a layer has no raster; layer files are
+# re-checked for changes at most every CLIMATE_SCORE_CACHE_CHECK_SECONDS
+CLIMATE_SCORE_CACHE_SIZE = int(os.getenv('CLIMATE_SCORE_CACHE_SIZE', '100000'))
+CLIMATE_SCORE_CACHE_TTL = float(os.getenv('CLIMATE_SCORE_CACHE_TTL', '3600'))
+CLIMATE_SCORE_CACHE_CHECK_SECONDS = float(os.getenv('CLIMATE_SCORE_CACHE_CHECK_SECONDS', '1'))
+
+# Background recomputation of the CSV climate score columns; finished chunks
+# are checkpointed so an interrupted job resumes where it stopped
+SCORE_JOB_WORKERS = int(os.getenv('SCORE_JOB_WORKERS') or 0) or os.cpu_count()
+SCORE_JOB_CHUNK_SIZE = int(os.getenv('SCORE_JOB_CHUNK_SIZE', '5000'))
+SCORE_JOBS_DIR = os.path.join(CACHE_DIR, 'score_jobs')
+
 # GIS Configuration
 DEFAULT_BBOX = {
     'min_lon': 106.7,  # Default to Jakarta area
@@ -0,0 +1,115 @@
+# backend/app/services/binary_store.py
+import json
+import os
+import shutil
+
+import numpy as np
+
+from app.config import COMPILED_LAYERS_DIR
+from app.services.geometry_store import CompactLayer
+from app.services.rtree import PackedHilbertRTree
+
+FORMAT_VERSION = 1
+# Decimals kept when reading float32 coordinates back (about 1 cm)
+FLOAT32_PRECISION = 7
+
+
+def compiled_layer_dir(layer_name):
+    return os.path.join(COMPILED_LAYERS_DIR, f'{layer_name}.layer')
+
+
+def _smallest_int(values):
+    """int32 if every value fits, int64 otherwise"""
+    if len(values) == 0 or values.max() < np.iinfo(np.int32).max:
+        return values.astype(np.int32)
+    return values.astype(np.int64)
+
+
+def save_compiled_layer(layer, layer_name, source_version, float64=False, node_size=16):
+    """
+    Write a CompactLayer as a directory of .npy buffers plus meta.json.
+
+    Coordinates are stored as float32 offsets from the layer's lower-left
+    corner (float64 if requested), offsets as int32 where they fit, and a
+    packed Hilbert R-tree over the feature boxes is built and stored with
+    them. The directory is written aside and swapped in at the end.
+    """
+    target = compiled_layer_dir(layer_name)
+    tmp_dir = f'{target}.tmp{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    positions = layer.positions(0, len(layer.coords))
+    origin = positions.min(axis=0) if len(positions) else np.zeros(2)
+    coords = positions - origin
+    arrays = {
+        'coords': coords if float64 else coords.astype(np.float32),
+        'ring_offsets': _smallest_int(layer.ring_offsets),
+        'part_offsets': _smallest_int(layer.part_offsets),
+        'geom_offsets': _smallest_int(layer.geom_offsets),
+        'geom_types': layer.geom_types.astype(np.int8),
+        'bounds': layer.bounds.astype(np.float64),
+        'gridcode': layer.gridcode.astype(np.float64),
+        'attr_offsets': layer.attr_offsets.astype(np.int64),
+        'attrs': layer.attrs.astype(np.uint8)
+    }
+    tree = PackedHilbertRTree(layer.bounds, node_size)
+    arrays['rtree_order'] = _smallest_int(tree.order)
+    for depth, level in enumerate(tree.levels):
+        arrays[f'rtree_level_{depth}'] = level
+
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(values))
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "layer": layer_name,
+        "source_version": list(source_version),
+        "features": len(layer),
+        "origin": origin.tolist(),
+        "precision": None if float64 else FLOAT32_PRECISION,
+        "header": layer.header,
+        "rtree": {"node_size": node_size, "levels": len(tree.levels), "size": tree.size}
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    old_dir = f'{target}.old{os.getpid()}'
+    if os.path.exists(target):
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+def open_compiled_layer(layer_name, source_version):
+    """
+    Memory-map a compiled layer, or return None if there is none for this
+    source version. Nothing is copied: every array is a read-only view of
+    the file, shared through the page cache by all worker processes.
+    """
+    directory = compiled_layer_dir(layer_name)
+    try:
+        with open(os.path.join(directory, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != FORMAT_VERSION or tuple(meta['source_version']) != tuple(source_version):
+        return None
+
+    def load(name):
+        path = os.path.join(directory, f'{name}.npy')
+        try:
+            return np.load(path, mmap_mode='r')
+        except ValueError:
+            return np.load(path)  # empty arrays cannot be mapped
+
+    arrays = {name: load(name) for name in CompactLayer.ARRAYS}
+    rtree_meta = meta['rtree']
+    rtree = PackedHilbertRTree.from_arrays(
+        load('rtree_order'),
+        [load(f'rtree_level_{depth}') for depth in range(rtree_meta['levels'])],
+        rtree_meta['node_size'],
+        rtree_meta['size']
+    )
+    return CompactLayer(arrays, meta['header'], origin=meta['origin'], precision=meta['precision'], rtree=rtree)
@@ -0,0 +1,114 @@
+# backend/app/services/climate_cache.py
+import threading
+import time
+
+from app.config import (
+    CLIMATE_LOOKUP_METHOD, CLIMATE_SCORE_CACHE_SIZE, CLIMATE_SCORE_CACHE_TTL, CLIMATE_SCORE_CACHE_CHECK_SECONDS
+)
+from app.services.gridcode_raster import CLIMATE_LAYERS, get_gridcode_raster
+from app.services.layer_store import layer_store
+from app.services.lru import LRUCache
+
+
+class ClimateScoreCache:
+    """
+    Memo cache for climate scores.
+
+    When every climate layer has a gridcode raster, scores are keyed on the
+    raster cell each layer's lookup lands in (one cell per distinct raster
+    grid). Every point with the same key gets the same gridcodes, so the
+    cached scores are the ones calculate_climate_scores gives uncached.
+    Points on a no-data cell or off a raster score with generated values
+    or the polygon lookup, which depend on the exact point, so they are
+    not cached. Otherwise (polygon lookups) points are keyed on their exact
+    coordinates, so a hit never returns another point's scores. The whole
+    cache is dropped when any climate layer file changes; that check runs
+    at most every check_seconds so hits do not pay for file stats.
+    """
+
+    def __init__(self, layers=CLIMATE_LAYERS, max_items=CLIMATE_SCORE_CACHE_SIZE, ttl=CLIMATE_SCORE_CACHE_TTL,
+                 check_seconds=CLIMATE_SCORE_CACHE_CHECK_SECONDS):
+        self.layers = list(layers)
+        self.check_seconds = check_seconds
+        self.cache = LRUCache(max_items=max_items, ttl=ttl, name='climate_scores')
+        # One raster per distinct raster grid when keying on raster cells,
+        # else None for exact coordinates
+        self.rasters = None
+        self.uncacheable = 0
+        self.invalidations = 0
+        self._versions = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Drop cached scores and re-pick the keying if a layer changed or its rasters appeared"""
+        now = time.monotonic()
+        if self._versions is not None and now - self._checked_at < self.check_seconds:
+            return
+        with self._lock:
+            versions = tuple(layer_store.version(layer) for layer in self.layers)
+            if versions != self._versions:
+                if self._versions is not None:
+                    self.invalidations += 1
+                self.cache.clear()
+                self.rasters = self._pick_rasters()
+                self._versions = versions
+            elif self.rasters is None:
+                # Rasters finish building in the background after startup
+                rasters = self._pick_rasters()
+                if rasters:
+                    self.cache.clear()
+                    self.rasters = rasters
+            self._checked_at = now
+
+    def _pick_rasters(self):
+        if CLIMATE_LOOKUP_METHOD != 'raster':
+            return None
+        rasters = {}
+        for layer in self.layers:
+            raster = get_gridcode_raster(layer)
+            if raster is None:
+                return None
+            rasters.setdefault((raster.transform, raster.codes.shape), raster)
+        return list(rasters.values())
+
+    def key(self, lat, lng):
+        """Cache key of a point, or None if its scores must not be cached"""
+        rasters = self.rasters
+        if rasters is None:
+            return (lat, lng)
+        key = []
+        for raster in rasters:
+            cell = raster.cell(lat, lng)
+            if cell is None or not raster.has_data(*cell):
+                return None
+            key += cell
+        return tuple(key)
+
+    def get(self, lat, lng, compute):
+        """Scores of (lat, lng), computed as compute(lat, lng) unless its key is cached"""
+        self._refresh()
+        key = self.key(lat, lng)
+        if key is None:
+            self.uncacheable += 1
+            return compute(lat, lng)
+        scores = self.cache.get(key)
+        if scores is None:
+            scores = compute(lat, lng)
+            self.cache.put(key, scores)
+        return dict(scores)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats.update({
+            "keyed_on": "coordinates" if self.rasters is None else "raster_cells",
+            "uncacheable": self.uncacheable,
+            "invalidations": self.invalidations
+        })
+        return stats
+
+
+climate_score_cache = ClimateScoreCache()
@@ -0,0 +1,71 @@
+# backend/app/services/cursors.py
+import base64
+import hashlib
+import hmac
+import json
+
+from app.config import SECRET_KEY
+
+
+class CursorError(Exception):
+    """Invalid (status 400) or stale (status 410) pagination cursor"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(payload):
+    return hmac.new(SECRET_KEY.encode('utf-8'), payload, hashlib.sha256).digest()[:12]
+
+
+def key_fingerprint():
+    """Changes whenever SECRET_KEY does, invalidating stored cursors"""
+    return hashlib.sha256(_sign(b'cursor-key')).hexdigest()[:16]
+
+
+def encode_cursor(dataset, version, offset, limit):
+    """
+    Opaque token for the page starting at offset in one version of a dataset.
+
+    The token is signed, so clients cannot forge positions or page sizes.
+    """
+    payload = json.dumps([dataset, list(version), offset, limit], separators=(',', ':')).encode('utf-8')
+    return f'{_b64encode(payload)}.{_b64encode(_sign(payload))}'
+
+
+def decode_cursor(token, dataset, version):
+    """
+    Return (offset, limit) for a cursor issued for this dataset.
+
+    Raises CursorError if the token is malformed or tampered with, and with
+    status 410 if the dataset changed since the cursor was issued, so a
+    crawl never silently mixes two versions.
+    """
+    try:
+        payload_text, signature_text = token.split('.')
+        payload = _b64decode(payload_text)
+        valid = hmac.compare_digest(_b64decode(signature_text), _sign(payload))
+        cursor_dataset, cursor_version, offset, limit = json.loads(payload)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if not valid or cursor_dataset != dataset:
+        raise CursorError("Invalid cursor")
+    if tuple(cursor_version) != tuple(version):
+        raise CursorError("Dataset changed since this cursor was issued; restart from the first page", 410)
+    return offset, limit
+
+
+def next_cursor(dataset, version, offset, limit, total):
+    """Cursor for the page after the one at offset, or None on the last page"""
+    if offset + limit >= total:
+        return None
+    return encode_cursor(dataset, version, offset + limit, limit)
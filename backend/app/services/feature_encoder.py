@@ -0,0 +1,319 @@
+# backend/app/services/feature_encoder.py
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.config import PRICE_FEATURE_ENCODER
+from app.services.model_registry import model_registry
+
+PRICE_FEATURE_COLUMNS = ["TIPE", "KAMAR", "SERTIFIKAT", "HARGA TANAH", "LUAS TANAH", "KOTA", "KEC",
+                         "LST", "NDVI", "UHI", "UTFVI", "Overall_Score"]
+KOTA_CODES = {'KOTA BANDUNG': 1, 'KABUPATEN BANDUNG': 0}
+SERTIFIKAT_CODES = {'Sertifikat Hak Milik': 1, 'Sertifikat Hak Guna Bangunan': 0}
+TIPE_CODES = {'Rumah Baru': 1, 'Rumah Seken': 0}
+# Feature column of each climate score key
+CLIMATE_FEATURES = {
+    'lst_score': 'LST',
+    'ndvi_score': 'NDVI',
+    'uhi_score': 'UHI',
+    'utfvi_score': 'UTFVI',
+    'overall_score': 'Overall_Score'
+}
+
+
+def certificate_name(certificate):
+    return "Sertifikat Hak Milik" if certificate == "SHM - Sertifikat Hak Milik" else "Sertifikat Hak Guna Bangunan"
+
+
+def create_price_frame(records):
+    """One model input row per property (records are calculate_property_price arguments)"""
+    rows = []
+    for record in records:
+        # Dummy function to simulate data wrangling
+        # In a real scenario, this would involve more complex operations
+        cert = certificate_name(record['certificate'])
+        climate_scores = record['climate_scores']
+        rows.append({
+            "TIPE": record['property_type'],
+            "KAMAR": record['bedrooms'],
+            "SERTIFIKAT": cert,
+            "HARGA TANAH": record['land_price'],
+            "LUAS TANAH": record['land_area'],
+            "KOTA": record['city'].upper(),
+            "KEC": record['district'].upper(),
+            "LST": climate_scores["lst_score"],
+            "NDVI": climate_scores["ndvi_score"],
+            "UHI": climate_scores["uhi_score"],
+            "UTFVI": climate_scores["utfvi_score"],
+            "Overall_Score": climate_scores["overall_score"]
+        })
+    return pd.DataFrame(rows, columns=PRICE_FEATURE_COLUMNS)
+
+
+def preprocess_price_frame(df):
+    df['KOTA'] = df['KOTA'].map(KOTA_CODES)
+    df['SERTIFIKAT'] = df['SERTIFIKAT'].map(SERTIFIKAT_CODES)
+    df['TIPE'] = df['TIPE'].map(TIPE_CODES)
+    return df
+
+
+def preprocess_record(record):
+    """
+    The row preprocess_price_frame(create_price_frame([record])) holds, as a
+    tuple in PRICE_FEATURE_COLUMNS order, without building a DataFrame.
+    Unmapped categories are NaN, as Series.map leaves them.
+    """
+    nan = float('nan')
+    climate_scores = record['climate_scores']
+    return (
+        TIPE_CODES.get(record['property_type'], nan),
+        record['bedrooms'],
+        SERTIFIKAT_CODES[certificate_name(record['certificate'])],
+        record['land_price'],
+        record['land_area'],
+        KOTA_CODES.get(record['city'].upper(), nan),
+        record['district'].upper(),
+        climate_scores["lst_score"],
+        climate_scores["ndvi_score"],
+        climate_scores["uhi_score"],
+        climate_scores["utfvi_score"],
+        climate_scores["overall_score"]
+    )
+
+
+def preprocess_records(records):
+    """preprocess_record of many records"""
+    return [preprocess_record(record) for record in records]
+
+
+class UnsupportedModel(Exception):
+    """The model's preprocessing cannot be reproduced by a FeatureEncoder"""
+
+
+def _category_key(value):
+    """Category as a dict key that matches int, float and NumPy scalars alike"""
+    if isinstance(value, str) or value is None:
+        return value
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class FeatureEncoder:
+    """
+    Encodes preprocessed rows straight into the estimator's input matrix.
+
+    Compiled from a fitted model: a sklearn Pipeline whose preprocessing is
+    one ColumnTransformer of passthrough, drop and OneHotEncoder parts, or
+    a bare estimator taking the feature columns as they are. Each one-hot
+    column becomes a lookup table from category to output position, so
+    encoding a row is a handful of dict lookups and array writes, and the
+    fitted estimator is called on the matrix directly.
+    """
+
+    def __init__(self, estimator, width, passthrough, onehot, sparse=False):
+        self.estimator = estimator
+        self.width = width
+        # (input column, output column) pairs copied as numbers
+        self.passthrough = passthrough
+        # (input column, {category: output column}, unknown categories raise)
+        self.onehot = onehot
+        self.sparse = sparse
+
+    def _dense(self, rows):
+        matrix = np.zeros((len(rows), self.width), dtype=np.float64)
+        if not len(rows):
+            return matrix
+        columns = list(zip(*rows))
+        for source, target in self.passthrough:
+            matrix[:, target] = np.array(columns[source], dtype=np.float64)
+        for source, table, strict in self.onehot:
+            for i, value in enumerate(columns[source]):
+                target = table.get(_category_key(value))
+                if target is not None:
+                    matrix[i, target] = 1.0
+                elif strict:
+                    raise ValueError(f"Found unknown category {value!r} in column {PRICE_FEATURE_COLUMNS[source]}")
+        return matrix
+
+    def _finish(self, matrix):
+        if self.sparse:
+            from scipy import sparse
+            return sparse.csr_matrix(matrix)
+        return matrix
+
+    def encode(self, rows):
+        return self._finish(self._dense(rows))
+
+    def encode_repeated(self, row, count, columns):
+        """
+        encode([row] * count) with some numeric input columns replaced by
+        arrays of count values ({column name: values}), without a tuple
+        per row. Raises UnsupportedModel for a one-hot encoded column.
+        """
+        matrix = np.repeat(self._dense([row]), count, axis=0)
+        targets = dict(self.passthrough)
+        onehot = set(source for source, _, _ in self.onehot)
+        for name, values in columns.items():
+            source = PRICE_FEATURE_COLUMNS.index(name)
+            if source in onehot:
+                raise UnsupportedModel(f"column {name} is one-hot encoded")
+            if source in targets:
+                matrix[:, targets[source]] = values
+        return self._finish(matrix)
+
+    def predict(self, rows):
+        return self.estimator.predict(self.encode(rows))
+
+
+def _column_positions(columns, names):
+    """Positions in PRICE_FEATURE_COLUMNS of a ColumnTransformer column selection"""
+    if isinstance(columns, str):
+        columns = [columns]
+    positions = []
+    for column in columns:
+        if isinstance(column, (int, np.integer)) and not isinstance(column, bool):
+            if names is None:
+                raise UnsupportedModel("integer column selection without feature names")
+            column = names[column]
+        if column not in PRICE_FEATURE_COLUMNS:
+            raise UnsupportedModel(f"unexpected input column {column!r}")
+        positions.append(PRICE_FEATURE_COLUMNS.index(column))
+    return positions
+
+
+def _build_encoder(model):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+    if not isinstance(model, Pipeline):
+        names = list(getattr(model, 'feature_names_in_', PRICE_FEATURE_COLUMNS))
+        positions = _column_positions(names, names)
+        return FeatureEncoder(model, len(positions), list(zip(positions, range(len(positions)))), [])
+
+    steps = [step for _, step in model.steps if step is not None and step != 'passthrough']
+    if len(steps) != 2 or not isinstance(steps[0], ColumnTransformer):
+        raise UnsupportedModel("expected a ColumnTransformer followed by an estimator")
+    transformer, estimator = steps
+    names = getattr(transformer, 'feature_names_in_', None)
+    names = list(names) if names is not None else None
+
+    width = 0
+    passthrough = []
+    onehot = []
+    for _, part, columns in transformer.transformers_:
+        positions = _column_positions(columns, names)
+        if part == 'drop' or not positions:
+            continue
+        # Newer scikit-learn stores a passthrough remainder as an identity FunctionTransformer
+        if part == 'passthrough' or (isinstance(part, FunctionTransformer) and part.func is None):
+            for source in positions:
+                passthrough.append((source, width))
+                width += 1
+        elif isinstance(part, OneHotEncoder):
+            if getattr(part, 'drop_idx_', None) is not None or getattr(part, '_infrequent_enabled', False):
+                raise UnsupportedModel("OneHotEncoder with drop or infrequent categories")
+            for source, categories in zip(positions, part.categories_):
+                table = {_category_key(category): width + k for k, category in enumerate(categories.tolist())}
+                onehot.append((source, table, part.handle_unknown == 'error'))
+                width += len(categories)
+        else:
+            raise UnsupportedModel(f"unsupported transformer {type(part).__name__}")
+    return FeatureEncoder(estimator, width, passthrough, onehot, sparse=bool(getattr(transformer, 'sparse_output_', False)))
+
+
+def _probe_records(encoder=None, count=64, seed=0):
+    """Records covering every lookup table entry, with random numeric fields"""
+    rng = np.random.default_rng(seed)
+    districts = {'TIDAK DIKENAL'} if encoder is not None else {'COBLONG'}
+    for _, table, strict in encoder.onehot if encoder is not None else []:
+        districts.update(value for value in table if isinstance(value, str))
+        if strict:
+            districts.discard('TIDAK DIKENAL')
+    cities = list(KOTA_CODES) + ['KOTA CIMAHI']
+    records = []
+    for district in sorted(districts):
+        for k in range(max(count // len(districts), 2)):
+            records.append({
+                "property_type": list(TIPE_CODES)[k % 2],
+                "bedrooms": float(rng.integers(1, 8)),
+                "certificate": "SHM - Sertifikat Hak Milik" if rng.random() < 0.5 else "HGB - Hak Guna Bangunan",
+                "land_price": float(rng.uniform(1e6, 3e7)),
+                "land_area": float(rng.uniform(30, 1000)),
+                "city": cities[k % len(cities)].title(),
+                "district": district.title(),
+                "climate_scores": {key: int(rng.integers(0, 101)) for key in
+                                   ['lst_score', 'ndvi_score', 'uhi_score', 'utfvi_score', 'overall_score']}
+            })
+    return records
+
+
+def validate_price_model(model):
+    """
+    Raise ValueError unless a model predicts one finite price per row of a
+    probe frame built the way predictions build theirs.
+    """
+    if not callable(getattr(model, 'predict', None)):
+        raise ValueError(f"{type(model).__name__} is not a model (no predict method)")
+    try:
+        encoder = _build_encoder(model)
+    except Exception:
+        encoder = None
+    records = _probe_records(encoder, count=8)
+    try:
+        predictions = np.asarray(model.predict(preprocess_price_frame(create_price_frame(records))), dtype=np.float64)
+    except Exception as e:
+        raise ValueError(f"Model failed on probe rows: {str(e)}")
+    if predictions.shape != (len(records),) or not np.isfinite(predictions).all():
+        raise ValueError(f"Model returned {predictions.shape} predictions for {len(records)} probe rows, "
+                         f"or non-finite prices")
+
+
+def compile_encoder(model):
+    """
+    FeatureEncoder for a model, or None if its preprocessing is not
+    supported or the encoder does not reproduce the DataFrame path exactly
+    on a set of probe rows spanning every category it knows.
+    """
+    try:
+        encoder = _build_encoder(model)
+        records = _probe_records(encoder)
+        expected = np.asarray(model.predict(preprocess_price_frame(create_price_frame(records))))
+        actual = np.asarray(encoder.predict(preprocess_records(records)))
+    except UnsupportedModel as e:
+        print(f"Price model preprocessing not compiled, using the DataFrame path: {str(e)}")
+        return None
+    except Exception as e:
+        print(f"Compiling the price feature encoder failed, using the DataFrame path: {str(e)}")
+        return None
+    if not np.array_equal(expected, actual):
+        print("Compiled price feature encoder disagrees with the DataFrame path; not using it")
+        return None
+    return encoder
+
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def encoder_for(loaded_model):
+    """Compiled encoder of a LoadedModel (None: use the DataFrame path), built once per version"""
+    if not PRICE_FEATURE_ENCODER:
+        return None
+    try:
+        return _encoders[loaded_model.version]
+    except KeyError:
+        pass
+    with _encoders_lock:
+        if loaded_model.version not in _encoders:
+            encoder = compile_encoder(loaded_model.model)
+            # Only the serving model's encoder is kept
+            _encoders.clear()
+            _encoders[loaded_model.version] = encoder
+        return _encoders[loaded_model.version]
+
+
+# Compile at swap time so the first request after a reload does not pay for it
+model_registry.on_swap(encoder_for)
@@ -0,0 +1,100 @@
+# backend/app/services/geojson_stream.py
+import json
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = ' \t\n\r'
+
+
+class _Reader:
+    """Character buffer over a text file that grows on demand and drops consumed text"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, minimum=1):
+        """Read until at least minimum unconsumed characters are buffered (or EOF)"""
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        while not self.eof and len(self.buf) - self.pos < minimum:
+            chunk = self.f.read(max(self.chunk_size, minimum))
+            if not chunk:
+                self.eof = True
+            self.buf += chunk
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            self.fill()
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed GeoJSON: expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    def value(self, decoder):
+        """Decode one complete JSON value, reading more text until it fits"""
+        self.peek()
+        wanted = self.chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer edge may be truncated
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            wanted *= 2
+            self.fill(len(self.buf) - self.pos + wanted)
+
+
+def iter_geojson_features(path, header=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the features of a GeoJSON FeatureCollection one at a time.
+
+    Only one feature (plus a read buffer) is held in memory at once.
+    Top-level members other than "features" (type, name, crs, ...) are
+    stored into header if a dict is passed.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value(decoder)
+            reader.expect(':')
+            if key == 'features':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield reader.value(decoder)
+                        if reader.peek() == ',':
+                            reader.pos += 1
+                            continue
+                        reader.expect(']')
+                        break
+            else:
+                value = reader.value(decoder)
+                if header is not None:
+                    header[key] = value
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            break
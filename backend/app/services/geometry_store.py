@@ -0,0 +1,256 @@
+# backend/app/services/geometry_store.py
+import json
+from array import array
+
+import numpy as np
+
+from app.services.geojson_stream import iter_geojson_features
+
+GEOMETRY_TYPES = ['Point', 'MultiPoint', 'LineString', 'MultiLineString', 'Polygon', 'MultiPolygon']
+NULL_GEOMETRY = -1
+POLYGON_CODES = (GEOMETRY_TYPES.index('Polygon'), GEOMETRY_TYPES.index('MultiPolygon'))
+
+
+def _gather(offsets, selected):
+    """
+    Offsets and flat child indices of a subset of items in an offsets array.
+
+    For items i in selected whose children are offsets[i]:offsets[i + 1],
+    returns the offsets of the subset and the indices of all their children.
+    """
+    starts = offsets[selected]
+    counts = offsets[selected + 1] - starts
+    new_offsets = np.zeros(len(selected) + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_offsets[1:])
+    children = np.repeat(starts - new_offsets[:-1], counts) + np.arange(new_offsets[-1])
+    return new_offsets, children
+
+
+class CompactLayer:
+    """
+    Columnar store of a GeoJSON layer.
+
+    Geometry lives in flat NumPy arrays instead of nested Python lists:
+      coords        (n_coords, 2) positions, stored relative to origin
+      ring_offsets  coords of each ring / linestring / point set
+      part_offsets  rings of each part (a polygon or a line)
+      geom_offsets  parts of each feature
+      geom_types    index into GEOMETRY_TYPES, -1 for null geometry
+      bounds        (n_features, 4) bounding box of each feature
+      gridcode      gridcode property of each feature, NaN if absent
+    Every other member of a feature is kept as compact JSON and only
+    decoded for the features actually returned.
+
+    Compiled stores keep coords as float32 offsets from origin; positions
+    read from them are rounded to precision decimals. A compiled store may
+    also carry a prebuilt spatial index in rtree.
+    """
+
+    ARRAYS = ['coords', 'ring_offsets', 'part_offsets', 'geom_offsets', 'geom_types',
+              'bounds', 'gridcode', 'attr_offsets', 'attrs']
+
+    def __init__(self, arrays, header=None, origin=(0.0, 0.0), precision=None, rtree=None):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.header = header or {}
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.precision = precision
+        self.rtree = rtree
+
+    def __len__(self):
+        return len(self.geom_types)
+
+    @property
+    def nbytes(self):
+        size = sum(getattr(self, name).nbytes for name in self.ARRAYS)
+        return size + (self.rtree.nbytes if self.rtree is not None else 0)
+
+    def positions(self, start, stop):
+        """Absolute float64 positions of coords[start:stop]"""
+        positions = self.coords[start:stop].astype(np.float64) + self.origin
+        if self.precision is not None:
+            positions = np.round(positions, self.precision)
+        return positions
+
+    def geometry(self, i):
+        """GeoJSON geometry dict of feature i, or None"""
+        code = int(self.geom_types[i])
+        if code == NULL_GEOMETRY:
+            return None
+        kind = GEOMETRY_TYPES[code]
+        parts = []
+        for part in range(self.geom_offsets[i], self.geom_offsets[i + 1]):
+            rings = []
+            for ring in range(self.part_offsets[part], self.part_offsets[part + 1]):
+                rings.append(self.positions(self.ring_offsets[ring], self.ring_offsets[ring + 1]).tolist())
+            parts.append(rings)
+
+        if kind == 'Point':
+            coordinates = parts[0][0][0]
+        elif kind in ('MultiPoint', 'LineString'):
+            coordinates = parts[0][0]
+        elif kind == 'MultiLineString':
+            coordinates = [rings[0] for rings in parts]
+        elif kind == 'Polygon':
+            coordinates = parts[0]
+        else:
+            coordinates = parts
+        return {"type": kind, "coordinates": coordinates}
+
+    def gridcode_value(self, i):
+        """gridcode of feature i as a plain number, None if absent"""
+        value = float(self.gridcode[i])
+        if np.isnan(value):
+            return None
+        return int(value) if value.is_integer() else value
+
+    def attributes(self, i):
+        return json.loads(bytes(self.attrs[self.attr_offsets[i]:self.attr_offsets[i + 1]]))
+
+    def feature(self, i):
+        feature = self.attributes(i)
+        feature['geometry'] = self.geometry(i)
+        return feature
+
+    def features(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [self.feature(i) for i in range(max(start, 0), stop)]
+
+    def iter_features(self):
+        for i in range(len(self)):
+            yield self.feature(i)
+
+    def to_shapely(self, indices=None):
+        """Shapely geometries for the given features (all by default), None where null"""
+        import shapely
+
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        result = np.full(len(indices), None, dtype=object)
+        types = self.geom_types[indices]
+        for code in np.unique(types):
+            if code == NULL_GEOMETRY:
+                continue
+            where = np.flatnonzero(types == code)
+            selected = indices[where]
+            part_offsets, parts = _gather(self.geom_offsets, selected)
+            ring_offsets, rings = _gather(self.part_offsets, parts)
+            coord_offsets, coord_index = _gather(self.ring_offsets, rings)
+            coords = self.coords[coord_index].astype(np.float64) + self.origin
+
+            kind = GEOMETRY_TYPES[code]
+            if kind == 'Point':
+                offsets = ()
+            elif kind in ('MultiPoint', 'LineString'):
+                offsets = (coord_offsets,)
+            elif kind == 'MultiLineString':
+                offsets = (coord_offsets, part_offsets)
+            elif kind == 'Polygon':
+                offsets = (coord_offsets, ring_offsets)
+            else:
+                offsets = (coord_offsets, ring_offsets, part_offsets)
+            geometry_type = getattr(shapely.GeometryType, kind.upper())
+            result[where] = shapely.from_ragged_array(geometry_type, coords, offsets or None)
+        return result
+
+
+class CompactLayerBuilder:
+    """Accumulates features one at a time into the arrays of a CompactLayer"""
+
+    def __init__(self):
+        self.coords = array('d')
+        self.ring_offsets = array('q', [0])
+        self.part_offsets = array('q', [0])
+        self.geom_offsets = array('q', [0])
+        self.geom_types = array('b')
+        self.gridcode = array('d')
+        self.attr_offsets = array('q', [0])
+        self.attrs = bytearray()
+
+    def _add_ring(self, positions):
+        for position in positions:
+            self.coords.append(float(position[0]))
+            self.coords.append(float(position[1]))
+        self.ring_offsets.append(len(self.coords) // 2)
+
+    def _add_part(self, rings):
+        for ring in rings:
+            self._add_ring(ring)
+        self.part_offsets.append(len(self.ring_offsets) - 1)
+
+    def add(self, feature):
+        feature = feature or {}
+        geometry = feature.get('geometry') or {}
+        kind = geometry.get('type')
+        coordinates = geometry.get('coordinates')
+        if kind not in GEOMETRY_TYPES or coordinates is None:
+            code = NULL_GEOMETRY
+        else:
+            code = GEOMETRY_TYPES.index(kind)
+            if kind == 'Point':
+                self._add_part([[coordinates]])
+            elif kind in ('MultiPoint', 'LineString'):
+                self._add_part([coordinates])
+            elif kind == 'MultiLineString':
+                for line in coordinates:
+                    self._add_part([line])
+            elif kind == 'Polygon':
+                self._add_part(coordinates)
+            else:
+                for polygon in coordinates:
+                    self._add_part(polygon)
+        self.geom_types.append(code)
+        self.geom_offsets.append(len(self.part_offsets) - 1)
+
+        properties = feature.get('properties') or {}
+        try:
+            self.gridcode.append(float(properties.get('gridcode')))
+        except (TypeError, ValueError):
+            self.gridcode.append(float('nan'))
+
+        attributes = {key: value for key, value in feature.items() if key != 'geometry'}
+        self.attrs += json.dumps(attributes, separators=(',', ':')).encode('utf-8')
+        self.attr_offsets.append(len(self.attrs))
+
+    def build(self, header=None):
+        coords = np.frombuffer(self.coords, dtype=np.float64).reshape(-1, 2)
+        arrays = {
+            'coords': coords,
+            'ring_offsets': np.frombuffer(self.ring_offsets, dtype=np.int64),
+            'part_offsets': np.frombuffer(self.part_offsets, dtype=np.int64),
+            'geom_offsets': np.frombuffer(self.geom_offsets, dtype=np.int64),
+            'geom_types': np.frombuffer(self.geom_types, dtype=np.int8),
+            'gridcode': np.frombuffer(self.gridcode, dtype=np.float64),
+            'attr_offsets': np.frombuffer(self.attr_offsets, dtype=np.int64),
+            'attrs': np.frombuffer(bytes(self.attrs), dtype=np.uint8)
+        }
+        arrays['bounds'] = compute_bounds(coords, arrays['ring_offsets'], arrays['part_offsets'], arrays['geom_offsets'])
+        return CompactLayer(arrays, header)
+
+
+def compute_bounds(coords, ring_offsets, part_offsets, geom_offsets):
+    """(n_features, 4) bounding boxes from the flat coordinate arrays"""
+    n_features = len(geom_offsets) - 1
+    bounds = np.full((n_features, 4), np.nan)
+    starts = ring_offsets[part_offsets[geom_offsets[:-1]]]
+    ends = ring_offsets[part_offsets[geom_offsets[1:]]]
+    non_empty = np.flatnonzero(ends > starts)
+    if len(non_empty):
+        # Features are stored back to back, so each non-empty feature runs
+        # from its start to the next one's start and reduceat applies as is
+        first = starts[non_empty]
+        xs = np.asarray(coords[:, 0], dtype=np.float64)
+        ys = np.asarray(coords[:, 1], dtype=np.float64)
+        bounds[non_empty, 0] = np.minimum.reduceat(xs, first)
+        bounds[non_empty, 1] = np.minimum.reduceat(ys, first)
+        bounds[non_empty, 2] = np.maximum.reduceat(xs, first)
+        bounds[non_empty, 3] = np.maximum.reduceat(ys, first)
+    return bounds
+
+
+def load_compact_layer(path):
+    """Stream a GeoJSON file into a CompactLayer without building the dict tree"""
+    header = {}
+    builder = CompactLayerBuilder()
+    for feature in iter_geojson_features(path, header):
+        builder.add(feature)
+    return builder.build(header)
@@ -0,0 +1,90 @@
+# backend/app/services/gridcode_index.py
+import numpy as np
+
+from app.services.geometry_store import GEOMETRY_TYPES
+from app.services.layer_store import layer_store
+from app.services.spatial_index import get_shapely
+
+POLYGON = GEOMETRY_TYPES.index('Polygon')
+# Rough per-geometry overhead of a GEOS object, for cache accounting
+GEOMETRY_OVERHEAD_BYTES = 200
+
+
+class GridcodeIndex:
+    """
+    Point-in-polygon gridcode lookup over the Polygon features of a layer.
+
+    The polygons are built once per layer version and prepared, and an
+    STRtree over their exterior rings answers both steps of a lookup: its
+    box query gives the few candidates tested for containment, and its
+    nearest query replaces the scan for the closest exterior when no
+    polygon contains the point. Results match the original linear scan:
+    the lowest feature index wins among containing or equidistant polygons.
+    Requires shapely 2.x; available is False without it.
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self._shapely = get_shapely()
+        self.available = self._shapely is not None
+        self.features = np.flatnonzero(layer.geom_types == POLYGON)
+        self.polygons = None
+        self.tree = None
+        if self.available and len(self.features):
+            shapely = self._shapely
+            self.polygons = layer.to_shapely(self.features)
+            shapely.prepare(self.polygons)
+            self.tree = shapely.STRtree(shapely.get_exterior_ring(self.polygons))
+
+    @property
+    def nbytes(self):
+        if self.polygons is None:
+            return self.features.nbytes
+        coordinates = int(self._shapely.get_num_coordinates(self.polygons).sum())
+        # Polygons plus their exterior rings in the tree
+        return self.features.nbytes + 2 * (coordinates * 16 + len(self.polygons) * GEOMETRY_OVERHEAD_BYTES)
+
+    def lookup(self, lat, lng):
+        """Gridcode of the polygon containing the point, else of the nearest one"""
+        if self.tree is None:
+            return None
+        point = self._shapely.Point(lng, lat)  # GeoJSON is (longitude, latitude)
+
+        candidates = self.tree.query(point)
+        if len(candidates):
+            inside = candidates[self._shapely.contains(self.polygons[candidates], point)]
+            if len(inside):
+                return self.layer.gridcode_value(self.features[inside.min()])
+
+        nearest = self.tree.query_nearest(point, all_matches=True)
+        if not len(nearest):
+            return None
+        return self.layer.gridcode_value(self.features[nearest.min()])
+
+    def lookup_many(self, lats, lngs):
+        """lookup() for many points at once, as a float64 array (NaN for none)"""
+        shapely = self._shapely
+        result = np.full(len(lats), np.nan)
+        if self.tree is None or not len(lats):
+            return result
+        points = shapely.points(np.asarray(lngs, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+
+        # Lowest containing polygon per point; len(features) marks none
+        first = np.full(len(points), len(self.features), dtype=np.int64)
+        point_ids, candidates = self.tree.query(points)
+        inside = shapely.contains(self.polygons[candidates], points[point_ids])
+        np.minimum.at(first, point_ids[inside], candidates[inside])
+
+        outside = np.flatnonzero(first == len(self.features))
+        if len(outside):
+            point_ids, nearest = self.tree.query_nearest(points[outside], all_matches=True)
+            np.minimum.at(first, outside[point_ids], nearest)
+
+        found = first < len(self.features)
+        result[found] = self.layer.gridcode[self.features[first[found]]]
+        return result
+
+
+def get_gridcode_index(layer_name):
+    """Gridcode lookup index of a layer, built once per layer file version"""
+    return layer_store.get_derived(layer_name, 'gridcode_index', GridcodeIndex)
@@ -0,0 +1,426 @@
+# backend/app/services/gridcode_raster.py
+import json
+import math
+import os
+import shutil
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+from app.config import (
+    COMPILED_LAYERS_DIR, GRIDCODE_RASTER_BUILD_AT_STARTUP, GRIDCODE_RASTER_RESOLUTION, GRIDCODE_RASTER_MAX_CELLS
+)
+from app.services.gridcode_index import GridcodeIndex, get_gridcode_index
+from app.services.layer_store import layer_store
+from app.services.spatial_index import get_shapely
+
+FORMAT_VERSION = 2
+# Layers that are polygonized gridcode rasters
+CLIMATE_LAYERS = ['lst', 'ndvi', 'uhi', 'utfvi']
+# Raster rows whose cell centres are tested against the polygons at once
+ROW_CHUNK = 256
+# Cell value of int8 rasters where the layer has no gridcode
+NO_DATA = 0
+# Seconds before the disk is checked again for a raster a layer version lacks
+MISSING_RECHECK_SECONDS = 10
+
+_reported_missing = set()
+_build_lock = threading.Lock()
+_build_thread = None
+
+
+def gridcode_from_value(value):
+    """Raster cell value as the polygon lookup returns it: int, float or None"""
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+class GridcodeRaster:
+    """
+    Gridcode layer resampled onto a regular lon/lat grid.
+
+    codes[row, col] is the gridcode at the centre of the cell whose top-left
+    corner is (x0 + col * dx, y0 - row * dy). Cells outside every polygon
+    hold the gridcode of the nearest polygon, as the polygon lookup would
+    return for that centre, so a lookup is an array index. Points beyond
+    the grid have no cell: lookup() gives None and sample() NaN for them,
+    and callers answer those with the polygon lookup.
+    Integer gridcodes are stored as int8 with NO_DATA for cells without
+    one; other layers keep float32 or float64 codes with NaN.
+    """
+
+    def __init__(self, codes, transform, meta=None):
+        self.codes = codes
+        self.transform = tuple(float(value) for value in transform)
+        self.meta = meta or {}
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    @property
+    def resolution(self):
+        return self.transform[2]
+
+    @property
+    def integer(self):
+        return self.codes.dtype.kind == 'i'
+
+    def cells(self, lats, lngs):
+        """Row and column indices of the cells under the points (clamped), and which points are on the grid"""
+        x0, y0, dx, dy = self.transform
+        height, width = self.codes.shape
+        rows = np.floor((y0 - np.asarray(lats, dtype=np.float64)) / dy)
+        cols = np.floor((np.asarray(lngs, dtype=np.float64) - x0) / dx)
+        inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        return (np.clip(rows, 0, height - 1).astype(np.int64),
+                np.clip(cols, 0, width - 1).astype(np.int64), inside)
+
+    def sample(self, lats, lngs):
+        """Gridcodes at many points as a float64 array, NaN where the layer has none or off the grid"""
+        rows, cols, inside = self.cells(lats, lngs)
+        codes = self.codes[rows, cols]
+        values = codes.astype(np.float64)
+        if self.integer:
+            values[codes == NO_DATA] = np.nan
+        values[~inside] = np.nan
+        return values
+
+    def contains(self, lats, lngs):
+        """Which points fall on the grid"""
+        return self.cells(lats, lngs)[2]
+
+    def cell(self, lat, lng):
+        """Row and column index of the cell under one point, or None off the grid"""
+        x0, y0, dx, dy = self.transform
+        height, width = self.codes.shape
+        row = math.floor((y0 - lat) / dy)
+        col = math.floor((lng - x0) / dx)
+        if not (0 <= row < height and 0 <= col < width):
+            return None
+        return row, col
+
+    def has_data(self, row, col):
+        value = self.codes[row, col]
+        return value != NO_DATA if self.integer else not math.isnan(value)
+
+    def lookup(self, lat, lng):
+        """Gridcode at one point, None where the layer has none or off the grid"""
+        cell = self.cell(lat, lng)
+        if cell is None:
+            return None
+        if self.integer:
+            return int(self.codes[cell]) or None
+        return gridcode_from_value(self.codes[cell])
+
+
+def infer_pixel_size(layer, features):
+    """Smallest polygon width or height: the pixel size of a polygonized raster"""
+    bounds = layer.bounds[features]
+    sides = np.concatenate([bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1]])
+    sides = sides[np.isfinite(sides) & (sides > 0)]
+    return float(sides.min()) if len(sides) else None
+
+
+def cell_values(gridcodes):
+    """
+    Gridcodes in the dtype of the raster: int8 (NaN as NO_DATA) when they
+    are all integers from 1 to 127, else float32 if that is exact, else
+    float64.
+    """
+    gridcodes = np.asarray(gridcodes, dtype=np.float64)
+    known = gridcodes[~np.isnan(gridcodes)]
+    if np.all((known >= 1) & (known <= np.iinfo(np.int8).max) & (known == np.floor(known))):
+        return np.where(np.isnan(gridcodes), NO_DATA, gridcodes).astype(np.int8)
+    compact = gridcodes.astype(np.float32)
+    if np.array_equal(compact, gridcodes, equal_nan=True):
+        return compact
+    return gridcodes
+
+
+def build_gridcode_raster(layer, resolution=None):
+    """
+    Rasterize the Polygon features of a layer, or return None if it has none
+    or shapely 2.x is unavailable.
+
+    Each cell takes the gridcode of the lowest-index polygon containing its
+    centre, else of the polygon with the nearest exterior, matching the
+    polygon lookup at every cell centre. The resolution defaults to
+    GRIDCODE_RASTER_RESOLUTION, then to the inferred pixel size, and is
+    doubled until the grid fits in GRIDCODE_RASTER_MAX_CELLS.
+    """
+    shapely = get_shapely()
+    if shapely is None:
+        return None
+    index = GridcodeIndex(layer)
+    if index.tree is None:
+        return None
+
+    bounds = layer.bounds[index.features]
+    min_x, min_y = np.nanmin(bounds[:, 0]), np.nanmin(bounds[:, 1])
+    max_x, max_y = np.nanmax(bounds[:, 2]), np.nanmax(bounds[:, 3])
+    requested = resolution or GRIDCODE_RASTER_RESOLUTION
+    resolution = requested or infer_pixel_size(layer, index.features)
+    if not resolution:
+        return None
+
+    def shape(cell):
+        # The small epsilon keeps exact multiples of the pixel size from
+        # gaining an extra, empty row or column to float noise
+        return (max(int(math.ceil((max_y - min_y) / cell - 1e-6)), 1),
+                max(int(math.ceil((max_x - min_x) / cell - 1e-6)), 1))
+
+    height, width = shape(resolution)
+    while height * width > GRIDCODE_RASTER_MAX_CELLS:
+        resolution *= 2
+        height, width = shape(resolution)
+
+    polygon_tree = shapely.STRtree(index.polygons)
+    values = cell_values(layer.gridcode[index.features])
+    codes = np.empty((height, width), dtype=values.dtype)
+    xs = min_x + (np.arange(width) + 0.5) * resolution
+    inside_cells = 0
+    for row_start in range(0, height, ROW_CHUNK):
+        row_end = min(row_start + ROW_CHUNK, height)
+        ys = max_y - (np.arange(row_start, row_end) + 0.5) * resolution
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        points = shapely.points(grid_x.ravel(), grid_y.ravel())
+
+        # Lowest polygon index containing each centre (len(features) = none)
+        first = np.full(len(points), len(index.features), dtype=np.int64)
+        point_ids, polygon_ids = polygon_tree.query(points, predicate='within')
+        np.minimum.at(first, point_ids, polygon_ids)
+        outside = np.flatnonzero(first == len(index.features))
+        inside_cells += len(points) - len(outside)
+        if len(outside):
+            point_ids, polygon_ids = index.tree.query_nearest(points[outside], all_matches=True)
+            np.minimum.at(first, outside[point_ids], polygon_ids)
+        codes[row_start:row_end] = values[first].reshape(row_end - row_start, width)
+
+    meta = {
+        "requested_resolution": requested,
+        "shape": [height, width],
+        "inside_fraction": inside_cells / float(height * width)
+    }
+    return GridcodeRaster(codes, (min_x, max_y, resolution, resolution), meta)
+
+
+def raster_dir(layer_name):
+    return os.path.join(COMPILED_LAYERS_DIR, f'{layer_name}.raster')
+
+
+def save_gridcode_raster(raster, layer_name, source_version):
+    """Write a raster as codes.npy plus meta.json, swapped in atomically"""
+    target = raster_dir(layer_name)
+    tmp_dir = f'{target}.tmp{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    np.save(os.path.join(tmp_dir, 'codes.npy'), np.ascontiguousarray(raster.codes))
+    meta = dict(raster.meta)
+    meta.update({
+        "format": FORMAT_VERSION,
+        "layer": layer_name,
+        "source_version": list(source_version),
+        "transform": list(raster.transform)
+    })
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    old_dir = f'{target}.old{os.getpid()}'
+    if os.path.exists(target):
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+def open_gridcode_raster(layer_name, source_version):
+    """
+    Memory-map a saved raster, or return None if there is none for this
+    source version and the configured resolution.
+    """
+    directory = raster_dir(layer_name)
+    try:
+        with open(os.path.join(directory, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (meta.get('format') != FORMAT_VERSION
+            or tuple(meta['source_version']) != tuple(source_version)
+            or meta.get('requested_resolution') != GRIDCODE_RASTER_RESOLUTION):
+        return None
+    codes = np.load(os.path.join(directory, 'codes.npy'), mmap_mode='r')
+    return GridcodeRaster(codes, meta['transform'], meta)
+
+
+class _Unavailable:
+    """Cached marker for a layer version without a saved raster"""
+    nbytes = 0
+
+    def __init__(self):
+        self.checked_at = time.monotonic()
+
+
+def get_gridcode_raster(layer_name):
+    """
+    Gridcode raster of a layer, or None if there is none.
+
+    Memory-mapped from disk when a raster for the current layer version
+    exists, without loading the layer. Lookups never rasterize: a layer
+    version without a raster uses the polygon lookup, and the disk is
+    checked again every MISSING_RECHECK_SECONDS for one saved since (by the
+    background build of this or another worker, or tools/rasterize_layers.py).
+    """
+    def open_saved(version):
+        return open_gridcode_raster(layer_name, version)
+
+    def missing(layer):
+        if layer_name not in _reported_missing:
+            _reported_missing.add(layer_name)
+            print(f"No gridcode raster for {layer_name}, using the polygon lookup "
+                  f"(run python -m tools.rasterize_layers)")
+        return _Unavailable()
+
+    raster = layer_store.get_derived(layer_name, 'gridcode_raster', missing, opener=open_saved)
+    if not isinstance(raster, _Unavailable):
+        return raster
+    if time.monotonic() - raster.checked_at >= MISSING_RECHECK_SECONDS:
+        layer_store.discard_derived(layer_name, 'gridcode_raster')
+    return None
+
+
+@contextmanager
+def _rasterize_lock():
+    """Hold the rasterizing lock file, so one process at a time builds rasters"""
+    os.makedirs(COMPILED_LAYERS_DIR, exist_ok=True)
+    with open(os.path.join(COMPILED_LAYERS_DIR, '.rasterize.lock'), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def build_missing_gridcode_rasters(layers=CLIMATE_LAYERS):
+    """
+    Build and save the rasters missing for the current layer versions, and
+    return the names of the layers built. Processes sharing
+    COMPILED_LAYERS_DIR take turns, so a raster another worker has just
+    saved is opened rather than built again.
+    """
+    built = []
+    with _rasterize_lock():
+        for layer_name in layers:
+            version = layer_store.version(layer_name)
+            if version is None or open_gridcode_raster(layer_name, version) is not None:
+                continue
+            started = time.perf_counter()
+            raster = build_gridcode_raster(layer_store.get(layer_name))
+            if raster is None:
+                print(f"Gridcode raster for {layer_name} not built: no polygons or shapely 2.x unavailable")
+                continue
+            save_gridcode_raster(raster, layer_name, version)
+            layer_store.discard_derived(layer_name, 'gridcode_raster')
+            built.append(layer_name)
+            print(f"Rasterized gridcodes for {layer_name} in {time.perf_counter() - started:.1f}s")
+    return built
+
+
+def _build_in_background(layers):
+    try:
+        build_missing_gridcode_rasters(layers)
+    except Exception as e:
+        print(f"Error rasterizing gridcode layers: {str(e)}")
+        traceback.print_exc()
+
+
+def prepare_gridcode_rasters(build=GRIDCODE_RASTER_BUILD_AT_STARTUP):
+    """
+    Open the saved raster of every climate layer, and when build is true
+    start one background thread rasterizing the layers without one.
+    Startup does not wait for it: those layers use the polygon lookup
+    until their raster is saved. Returns the thread, or None.
+    """
+    global _build_thread
+    missing = []
+    for layer_name in CLIMATE_LAYERS:
+        version = layer_store.version(layer_name)
+        if version is None:
+            continue
+        if open_gridcode_raster(layer_name, version) is None:
+            missing.append(layer_name)
+        else:
+            get_gridcode_raster(layer_name)
+    if not missing or not build:
+        return None
+
+    with _build_lock:
+        if _build_thread is None or not _build_thread.is_alive():
+            print(f"Rasterizing {', '.join(missing)} in the background")
+            _build_thread = threading.Thread(target=_build_in_background, args=(missing,),
+                                             name='gridcode-rasterizer', daemon=True)
+            _build_thread.start()
+        return _build_thread
+
+
+def accuracy_report(layer_name, samples=10000, seed=0):
+    """
+    Compare raster and polygon lookups at random points over the layer.
+
+    Points are drawn uniformly over the raster extent (points off it use
+    the polygon lookup anyway). Returns the agreement rate (overall, for points inside a polygon
+    and for points answered by the nearest-polygon fallback) and per-lookup
+    timings of both methods, or None if the layer has no raster.
+    """
+    raster = get_gridcode_raster(layer_name)
+    index = get_gridcode_index(layer_name)
+    if raster is None or index is None or not index.available:
+        return None
+
+    x0, y0, dx, dy = raster.transform
+    height, width = raster.codes.shape
+    rng = np.random.default_rng(seed)
+    lngs = rng.uniform(x0, x0 + width * dx, samples)
+    lats = rng.uniform(y0 - height * dy, y0, samples)
+
+    started = time.perf_counter()
+    expected = [index.lookup(lat, lng) for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    polygon_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = [raster.lookup(lat, lng) for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    raster_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    raster.sample(lats, lngs)
+    batch_seconds = time.perf_counter() - started
+
+    # Points no polygon contains take the nearest-polygon fallback, which
+    # the raster can only approximate at cell resolution
+    shapely = get_shapely()
+    point_ids, _ = shapely.STRtree(index.polygons).query(shapely.points(lngs, lats), predicate='within')
+    contained = np.zeros(samples, dtype=bool)
+    contained[point_ids] = True
+    matches = np.array([a == b for a, b in zip(actual, expected)])
+    return {
+        "layer": layer_name,
+        "samples": samples,
+        "resolution": raster.resolution,
+        "shape": [height, width],
+        "raster_bytes": raster.nbytes,
+        "agreement": float(matches.mean()),
+        "agreement_in_polygons": float(matches[contained].mean()) if contained.any() else None,
+        "agreement_fallback": float(matches[~contained].mean()) if (~contained).any() else None,
+        "polygon_us_per_point": polygon_seconds / samples * 1e6,
+        "raster_us_per_point": raster_seconds / samples * 1e6,
+        "raster_batch_ns_per_point": batch_seconds / samples * 1e9
+    }
@@ -0,0 +1,132 @@
+# backend/app/services/inference_pool.py
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from app.config import (
+    INFERENCE_EXECUTOR, INFERENCE_WORKERS, INFERENCE_MAX_PENDING, INFERENCE_TIMEOUT, INFERENCE_MODEL_THREADS
+)
+from app.services.model_registry import model_registry
+
+
+class InferenceUnavailable(Exception):
+    """Inference pool full (status 503) or a task over its deadline (status 504)"""
+
+    def __init__(self, message, status=503):
+        super().__init__(message)
+        self.status = status
+
+
+class InferencePool:
+    """
+    Bounded thread pool for model inference and geometry work.
+
+    Heavy work runs on at most workers threads instead of on every request
+    thread, so a burst of predictions cannot take every core from cheap
+    endpoints. At most max_pending tasks are admitted (running plus
+    queued); further calls fail at once with status 503 instead of piling
+    up. A caller waits at most timeout seconds and then gets status 504;
+    the task itself cannot be interrupted and keeps its slot until it ends.
+    XGBoost and Shapely release the GIL, so the threads run in parallel.
+    With executor 'inline' tasks run on the calling thread as before.
+    """
+
+    def __init__(self, executor=INFERENCE_EXECUTOR, workers=INFERENCE_WORKERS, max_pending=INFERENCE_MAX_PENDING,
+                 timeout=INFERENCE_TIMEOUT):
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.timeout = timeout
+        self._pool = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _get_pool(self):
+        with self._lock:
+            # A forked server process needs its own threads
+            if self._pool is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+            return self._pool
+
+    def submit(self, fn, *args):
+        """
+        Start fn(*args) on the pool and return its Future without waiting;
+        raises InferenceUnavailable (503) when the pool is full. With
+        executor 'inline' fn runs now and the Future is already done.
+        """
+        if self.executor == 'inline':
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise InferenceUnavailable("Inference capacity exhausted, retry shortly", 503)
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn, *args, timeout=None):
+        """fn(*args) on the pool; raises InferenceUnavailable when full or too slow"""
+        if self.executor == 'inline':
+            return fn(*args)
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise InferenceUnavailable("Inference timed out", 504)
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future is not None and future.exception() is not None:
+                self.failures += 1
+            else:
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "executor": self.executor,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "timeout_seconds": self.timeout,
+                "model_threads": INFERENCE_MODEL_THREADS,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "failures": self.failures
+            }
+
+
+def pin_model_threads(loaded_model, threads=INFERENCE_MODEL_THREADS):
+    """Limit the XGBoost threads of a loaded model so workers do not oversubscribe the cores"""
+    model = loaded_model.model
+    estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+    if threads and hasattr(estimator, 'get_booster'):
+        estimator.set_params(n_jobs=threads)
+        estimator.get_booster().set_param({'nthread': threads})
+
+
+inference_pool = InferencePool()
+model_registry.on_swap(pin_model_threads)
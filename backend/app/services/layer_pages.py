@@ -0,0 +1,243 @@
+# backend/app/services/layer_pages.py
+import gzip
+import json
+import mmap
+import os
+import threading
+import traceback
+from contextlib import contextmanager
+from math import ceil
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+from app.config import LAYER_PAGES_DIR
+from app.services.cursors import key_fingerprint, next_cursor
+from app.services.layer_store import layer_store
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def page_document(layer_name, version, page, per_page, total_features, features):
+    """One page of a layer as the paginated endpoint returns it"""
+    offset = (page - 1) * per_page
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total_features": total_features,
+        "total_pages": ceil(total_features / per_page),
+        "next_cursor": next_cursor(layer_name, version, offset, per_page, total_features) if page >= 1 else None,
+        "features": features,
+        "type": "FeatureCollection"
+    }
+
+
+def encode_page(layer_name, version, page, per_page, total_features, features):
+    """Serialize one page of a layer exactly as the paginated endpoint returns it"""
+    return json.dumps(
+        page_document(layer_name, version, page, per_page, total_features, features),
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+def _paths(layer_name, per_page):
+    base = os.path.join(LAYER_PAGES_DIR, f'{layer_name}.{per_page}')
+    return base + '.index.json', base + '.pages', base + '.pages.gz'
+
+
+def _write_atomic(path, data):
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_page_set(layer_name, per_page):
+    """
+    Write a layer as pre-serialized page chunks plus a byte-offset index.
+
+    Produces <layer>.<per_page>.pages (plain JSON pages back to back),
+    <layer>.<per_page>.pages.gz (one gzip member per page) and an index with
+    the offsets of both. The index is written last, so readers never see a
+    half-built set. Each page embeds its next_cursor, so the index records
+    the cursor key fingerprint the pages were signed with. Returns None if
+    the layer does not exist.
+    """
+    version = layer_store.version(layer_name)
+    layer = layer_store.get(layer_name)
+    if layer is None:
+        return None
+
+    total_features = len(layer)
+    total_pages = ceil(total_features / per_page)
+
+    index_path, pages_path, gzip_path = _paths(layer_name, per_page)
+    os.makedirs(LAYER_PAGES_DIR, exist_ok=True)
+    tmp_suffix = f'.tmp{os.getpid()}'
+
+    offsets, gzip_offsets = [0], [0]
+    with open(pages_path + tmp_suffix, 'wb') as plain_file, open(gzip_path + tmp_suffix, 'wb') as gzip_file:
+        for page in range(1, total_pages + 1):
+            start = (page - 1) * per_page
+            chunk = encode_page(layer_name, version, page, per_page, total_features,
+                                layer.features(start, start + per_page))
+            compressed = gzip.compress(chunk, compresslevel=6)
+            plain_file.write(chunk)
+            gzip_file.write(compressed)
+            offsets.append(offsets[-1] + len(chunk))
+            gzip_offsets.append(gzip_offsets[-1] + len(compressed))
+    os.replace(pages_path + tmp_suffix, pages_path)
+    os.replace(gzip_path + tmp_suffix, gzip_path)
+
+    index = {
+        "layer": layer_name,
+        "per_page": per_page,
+        "source_version": list(version),
+        "cursor_key": key_fingerprint(),
+        "total_features": total_features,
+        "total_pages": total_pages,
+        "offsets": offsets,
+        "gzip_offsets": gzip_offsets
+    }
+    _write_atomic(index_path, json.dumps(index).encode('utf-8'))
+    return index
+
+
+def _map_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class PageSet:
+    """Memory-mapped pre-serialized pages of one layer at one page size"""
+
+    def __init__(self, index):
+        index_path, pages_path, gzip_path = _paths(index['layer'], index['per_page'])
+        self.layer_name = index['layer']
+        self.per_page = index['per_page']
+        self.source_version = tuple(index['source_version'])
+        self.total_features = index['total_features']
+        self.total_pages = index['total_pages']
+        self._offsets = index['offsets']
+        self._gzip_offsets = index['gzip_offsets']
+        self._pages = _map_file(pages_path)
+        self._gzip_pages = _map_file(gzip_path)
+
+    def page_range(self, page, compressed=False):
+        """(start, end) byte range of a 1-based page in the plain or gzip file"""
+        offsets = self._gzip_offsets if compressed else self._offsets
+        return offsets[page - 1], offsets[page]
+
+    def iter_page(self, page, compressed=False):
+        """Yield the bytes of a page in blocks straight from the mapped file"""
+        data = self._gzip_pages if compressed else self._pages
+        start, end = self.page_range(page, compressed)
+        for block_start in range(start, end, STREAM_BLOCK_SIZE):
+            yield data[block_start:min(block_start + STREAM_BLOCK_SIZE, end)]
+
+
+_page_sets = {}
+# (layer_name, per_page, version) waiting for the background builder, in order
+_queued = []
+# Last version whose build failed per (layer_name, per_page), not retried
+_failed = {}
+_builder = None
+_lock = threading.Lock()
+
+
+def _load_index(layer_name, per_page):
+    index_path = _paths(layer_name, per_page)[0]
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_current(index, version):
+    return (index is not None and tuple(index['source_version']) == version
+            and index.get('cursor_key') == key_fingerprint())
+
+
+@contextmanager
+def _build_lock():
+    """Hold the page build lock file, so one process at a time builds chunks"""
+    os.makedirs(LAYER_PAGES_DIR, exist_ok=True)
+    with open(os.path.join(LAYER_PAGES_DIR, '.build.lock'), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _build_queued():
+    """Background builder: build queued page sets one at a time until none are left"""
+    global _builder
+    while True:
+        with _lock:
+            if not _queued:
+                _builder = None
+                return
+            layer_name, per_page, version = _queued[0]
+        try:
+            with _build_lock():
+                # Another worker may have built it while this one waited
+                if not _is_current(_load_index(layer_name, per_page), layer_store.version(layer_name)):
+                    print(f"Building page chunks for {layer_name} (per_page={per_page})")
+                    build_page_set(layer_name, per_page)
+        except Exception as e:
+            print(f"Error building page chunks for {layer_name}: {str(e)}")
+            traceback.print_exc()
+            _failed[(layer_name, per_page)] = version
+        finally:
+            with _lock:
+                _queued.pop(0)
+
+
+def _queue_build(layer_name, per_page, version):
+    global _builder
+    with _lock:
+        if _failed.get((layer_name, per_page)) == version:
+            return
+        if any(queued[:2] == (layer_name, per_page) for queued in _queued):
+            return
+        _queued.append((layer_name, per_page, version))
+        if _builder is None:
+            _builder = threading.Thread(target=_build_queued, name='layer-page-builder', daemon=True)
+            _builder.start()
+
+
+def get_page_set(layer_name, per_page):
+    """
+    Return the PageSet for a layer, or None if the layer is missing or its
+    chunks are not built yet.
+
+    Chunks are never built on the calling thread: missing or outdated ones
+    are queued for a single background builder (or built ahead of time with
+    tools/build_layer_pages.py), and callers serve pages from the parsed
+    layer until the index appears. Chunks are reused across restarts as
+    long as the source file version and cursor key recorded in the index
+    still match.
+    """
+    version = layer_store.version(layer_name)
+    if version is None:
+        return None
+
+    key = (layer_name, per_page)
+    page_set = _page_sets.get(key)
+    if page_set is not None and page_set.source_version == version:
+        return page_set
+
+    index = _load_index(layer_name, per_page)
+    if not _is_current(index, version):
+        _queue_build(layer_name, per_page, version)
+        return None
+
+    with _lock:
+        page_set = _page_sets.get(key)
+        if page_set is None or page_set.source_version != version:
+            page_set = _page_sets[key] = PageSet(index)
+        return page_set
@@ -0,0 +1,159 @@
+# backend/app/services/layer_store.py
+import os
+import threading
+import time
+
+from app.config import DATA_DIR, GEOJSON_DIR, LAYER_CACHE_MAX_BYTES
+from app.services.binary_store import open_compiled_layer
+from app.services.geometry_store import load_compact_layer
+from app.services.lru import LRUCache
+from app.services.metrics import metrics
+
+VALID_LAYERS = ['lst', 'ndvi', 'uhi', 'utfvi', 'landuse', 'jaringan_jalan', 'kemiringan_lereng', 'ndbi', 'rtrw']
+
+
+def resolve_layer_path(layer_name):
+    """Return the GeoJSON file backing a layer, or None if it does not exist"""
+    candidates = [
+        os.path.join(GEOJSON_DIR, f'{layer_name}.geojson'),
+        os.path.join(DATA_DIR, f'{layer_name}.geojson'),
+        os.path.join(DATA_DIR, '..', 'static', f'{layer_name}.geojson')
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return os.path.abspath(path)
+    return None
+
+
+def file_version(path):
+    """Version token for a file: changes whenever the file is rewritten"""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class LayerStore:
+    """
+    Process-wide store of parsed GeoJSON layers.
+
+    Each layer is parsed at most once per file version (mtime and size) and
+    kept in a byte-bounded LRU, so every blueprint shares the same parsed copy.
+    Layers are streamed from disk into CompactLayer arrays, so the full
+    GeoJSON dict tree is never held in memory, or memory-mapped from a
+    compiled binary store when one exists for the current file version.
+    """
+
+    def __init__(self, max_bytes=LAYER_CACHE_MAX_BYTES):
+        self._cache = LRUCache(max_bytes=max_bytes, name='geojson_layers')
+        self._versions = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.compiled_loads = 0
+        self.load_seconds = 0.0
+
+    def _layer_lock(self, layer_name):
+        with self._lock:
+            return self._locks.setdefault(layer_name, threading.Lock())
+
+    def version(self, layer_name):
+        """Current file version of a layer, or None if the file is missing"""
+        path = resolve_layer_path(layer_name)
+        if path is None:
+            return None
+        return file_version(path)
+
+    def get(self, layer_name):
+        """Return the CompactLayer for a layer, or None if it does not exist"""
+        path = resolve_layer_path(layer_name)
+        if path is None:
+            return None
+
+        version = file_version(path)
+        data = self._cache.get((layer_name, version))
+        if data is not None:
+            return data
+
+        # Only one thread parses a given layer; the others wait and reuse it
+        with self._layer_lock(layer_name):
+            data = self._cache.peek((layer_name, version))
+            if data is not None:
+                return data
+
+            started = time.perf_counter()
+            with metrics.timer('compiled_layer_open'):
+                data = open_compiled_layer(layer_name, version)
+            if data is not None:
+                self.compiled_loads += 1
+            else:
+                print(f"Loading GeoJSON from {path}")
+                with metrics.timer('geojson_load'):
+                    data = load_compact_layer(path)
+            self.load_seconds += time.perf_counter() - started
+            self.loads += 1
+
+            stale = self._versions.get(layer_name)
+            if stale is not None and stale != version:
+                self._cache.discard_where(lambda key: key[0] == layer_name and key[1] == stale)
+            self._versions[layer_name] = version
+            self._cache.put((layer_name, version), data, data.nbytes)
+            return data
+
+    def get_derived(self, layer_name, name, builder, opener=None):
+        """
+        Return an object derived from a layer (an index, an encoding, ...),
+        building it with builder(layer) once per layer file version.
+
+        If opener is given, opener(version) is tried first and the layer is
+        only loaded when it returns None (for artifacts saved on disk).
+        Derived objects share the layer LRU; their size is taken from an
+        nbytes attribute when they have one.
+        """
+        version = self.version(layer_name)
+        if version is None:
+            return None
+
+        key = (layer_name, version, name)
+        derived = self._cache.get(key)
+        if derived is not None:
+            return derived
+
+        if opener is not None:
+            derived = opener(version)
+            if derived is not None:
+                self._cache.put(key, derived, getattr(derived, 'nbytes', 0))
+                return derived
+
+        layer = self.get(layer_name)
+        if layer is None:
+            return None
+        with self._layer_lock(layer_name):
+            derived = self._cache.peek(key)
+            if derived is None:
+                derived = builder(layer)
+                self._cache.put(key, derived, getattr(derived, 'nbytes', 0))
+            return derived
+
+    def discard_derived(self, layer_name, name):
+        """Forget a derived object of a layer, so the next get_derived opens or builds it again"""
+        self._cache.discard_where(lambda key: len(key) == 3 and key[0] == layer_name and key[2] == name)
+
+    def invalidate(self, layer_name=None):
+        if layer_name is None:
+            self._cache.clear()
+            self._versions.clear()
+        else:
+            self._cache.discard_where(lambda key: key[0] == layer_name)
+            self._versions.pop(layer_name, None)
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update({
+            "loads": self.loads,
+            "compiled_loads": self.compiled_loads,
+            "load_seconds": round(self.load_seconds, 3),
+            "layers": sorted(key[0] for key in self._cache.keys() if len(key) == 2)
+        })
+        return stats
+
+
+layer_store = LayerStore()
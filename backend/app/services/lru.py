@@ -0,0 +1,120 @@
+# backend/app/services/lru.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache.
+
+    Entries can be bounded by count (max_items), by their reported size in
+    bytes (max_bytes) and by age (ttl, in seconds). Any bound left as None is
+    not enforced. An entry larger than max_bytes on its own is still kept as
+    the only occupant so that it is not reloaded on every access.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, ttl=None, name='cache'):
+        self.name = name
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, nbytes, stored_at)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.peek(key) is not None
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def get(self, key, default=None):
+        """Return the cached value and mark it as recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self._expired(entry[2], time.monotonic()):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """Return the cached value without touching LRU order or counters"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[2], time.monotonic()):
+                return default
+            return entry[0]
+
+    def put(self, key, value, nbytes=0):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, nbytes, time.monotonic())
+            self._bytes += nbytes
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key matches predicate"""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def _remove(self, key):
+        value, nbytes, _ = self._data.pop(key)
+        self._bytes -= nbytes
+        return value
+
+    def _evict(self):
+        while len(self._data) > 1 and (
+            (self.max_items is not None and len(self._data) > self.max_items) or
+            (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "items": len(self._data),
+                "bytes": self._bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
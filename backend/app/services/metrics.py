@@ -0,0 +1,205 @@
+# backend/app/services/metrics.py
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+from flask.json.provider import DefaultJSONProvider
+
+# Latency histogram bucket bounds, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (not locked; the registry locks around it)"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            yield '_bucket', labels + (('le', _format_value(float(bound))),), cumulative
+        yield '_sum', labels, self.sum
+        yield '_count', labels, self.count
+
+
+class _Timer:
+    __slots__ = ('registry', 'labels', 'started')
+
+    def __init__(self, registry, labels):
+        self.registry = registry
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe('hot_path_duration_seconds', self.labels, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges and histograms rendered as Prometheus text.
+
+    Series are keyed on a metric name and a tuple of (label, value) pairs.
+    Recording takes one lock and a dict lookup, so it can sit on hot paths.
+    Collectors registered with register_collector() are called at render
+    time to report state other modules already keep (cache and pool
+    counters, ...) as (name, type, help, samples) families, where samples
+    are (suffix, labels, value) tuples.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # name -> {labels: value or Histogram}
+        self._meta = {}  # name -> (type, help)
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        self._meta[name] = (kind, help_text)
+
+    def inc(self, name, labels=(), amount=1):
+        with self._lock:
+            series = self._series.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, labels, value, buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            series = self._series.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, name):
+        """Context manager timing a block into hot_path_duration_seconds{name=...}"""
+        return _Timer(self, (('name', name),))
+
+    def timed(self, name):
+        """Decorator form of timer()"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe('hot_path_duration_seconds', (('name', name),), time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self):
+        families = []
+        with self._lock:
+            for name in sorted(self._series):
+                kind, help_text = self._meta.get(name, ('untyped', name))
+                samples = []
+                for labels, value in sorted(self._series[name].items()):
+                    if isinstance(value, Histogram):
+                        samples.extend(value.samples(labels))
+                    else:
+                        samples.append(('', labels, value))
+                families.append((name, kind, help_text, samples))
+        for collector in list(self._collectors):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"Metrics collector failed: {str(e)}")
+
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{_format_labels(tuple(labels))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+metrics.describe('http_request_duration_seconds', 'histogram', 'Request latency by route and method')
+metrics.describe('http_requests_total', 'counter', 'Requests by route, method and status')
+metrics.describe('http_requests_in_flight', 'gauge', 'Requests being handled by route')
+metrics.describe('hot_path_duration_seconds', 'histogram', 'Duration of named hot-path operations')
+
+
+JSON_ENCODE_LABELS = (('name', 'json_encode'),)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that times response encoding"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            metrics.observe('hot_path_duration_seconds', JSON_ENCODE_LABELS, time.perf_counter() - started)
+
+
+def instrument_app(app, registry=metrics):
+    """
+    Record latency, status and in-flight requests of every request.
+
+    Routes are labelled by their URL rule (/api/properties/<int:property_id>,
+    not the concrete path) so the number of series stays bounded; requests
+    matching no rule share the 'unmatched' label. Streaming responses are
+    timed up to the start of the stream.
+    """
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.metrics_route = route
+        g.metrics_started = time.perf_counter()
+        registry.inc('http_requests_in_flight', (('route', route),))
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            labels = (('method', request.method), ('route', g.metrics_route))
+            registry.observe('http_request_duration_seconds', labels, time.perf_counter() - started)
+            registry.inc('http_requests_total', labels + (('status', str(response.status_code)),))
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if g.get('metrics_started') is not None:
+            registry.inc('http_requests_in_flight', (('route', g.metrics_route),), -1)
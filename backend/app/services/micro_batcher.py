@@ -0,0 +1,208 @@
+# backend/app/services/micro_batcher.py
+import os
+import threading
+import time
+from collections import deque
+
+
+# Handler exceptions caused by a bad item rather than by the batch as a whole
+ITEM_ERRORS = (ValueError, TypeError, KeyError, AttributeError)
+
+
+class _Pending:
+    """One submitted item waiting for its batch to run"""
+    __slots__ = ('item', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls.
+
+    submit(item) queues the item and blocks until handler(items), called
+    with up to max_batch queued items at once, has returned the results
+    (one per item, in order). A worker thread starts a batch as soon as
+    max_batch items are queued or max_wait seconds after the oldest one
+    arrived, whichever comes first; items keep queueing while a batch runs,
+    so under load batches fill without waiting. If the handler raises one
+    of item_errors (a bad item), the batch is split in halves and retried
+    until the failing items are isolated, so only their callers get the
+    exception. Any other exception (capacity, timeouts, a broken model)
+    fails every caller of the batch at once instead of being retried. A
+    caller waits at most timeout seconds and then gets
+    timeout_error(message).
+
+    Batches run on the worker thread, or are handed to executor(fn, *args),
+    which returns a Future without waiting (e.g. InferencePool.submit), so
+    up to max_in_flight batches run at once while the next one fills. An
+    executor that raises (a full pool) fails its batch at once. With
+    max_batch <= 1 every item is its own batch, run without the worker.
+    """
+
+    def __init__(self, handler, max_batch=64, max_wait=0.002, name='batcher', timeout=None,
+                 timeout_error=TimeoutError, item_errors=ITEM_ERRORS, executor=None, max_in_flight=1):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self.timeout = timeout
+        self.timeout_error = timeout_error
+        self.item_errors = item_errors
+        self.executor = executor
+        self.max_in_flight = max(max_in_flight, 1) if executor is not None else 1
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.max_queue_depth = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.batch_sizes = {}
+
+    def submit(self, item):
+        """Result of handler([item]), computed in a batch with concurrent submits"""
+        pending = _Pending(item)
+        if self.max_batch <= 1:
+            self._record_batch(1)
+            self._dispatch([pending], release=False)
+            if not pending.done.wait(self.timeout):
+                with self._condition:
+                    self.timeouts += 1
+                raise self.timeout_error(f"{self.name} result not ready after {self.timeout:g}s")
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        with self._condition:
+            self._ensure_worker()
+            self._queue.append(pending)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._condition.notify()
+        if not pending.done.wait(self.timeout):
+            with self._condition:
+                self.timeouts += 1
+                # Not started yet: drop it so the worker does not compute it
+                try:
+                    self._queue.remove(pending)
+                except ValueError:
+                    pass
+            raise self.timeout_error(f"{self.name} result not ready after {self.timeout:g}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_worker(self):
+        # Called with the condition held; a forked worker process starts its own thread
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            if self._pid != os.getpid():
+                # Batches in flight in the parent never finish here
+                self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-worker', daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            count = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            # Wait for a free slot first, so items keep queueing into the next batch
+            self._in_flight.acquire()
+            batch = self._next_batch()
+            self._record_batch(len(batch))
+            self._dispatch(batch)
+
+    def _dispatch(self, batch, release=True):
+        if self.executor is None:
+            self._finish(batch, release)
+            return
+        try:
+            self.executor(self._finish, batch, release)
+        except Exception as e:
+            with self._condition:
+                self.errors += 1
+            for pending in batch:
+                pending.error = e
+                pending.done.set()
+            if release:
+                self._in_flight.release()
+
+    def _finish(self, batch, release=True):
+        try:
+            self._run_batch(batch)
+        finally:
+            for pending in batch:
+                pending.done.set()
+            if release:
+                self._in_flight.release()
+
+    def _run_batch(self, batch):
+        try:
+            results = self.handler([pending.item for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} handler returned {len(results)} results for {len(batch)} items")
+            for pending, result in zip(batch, results):
+                pending.result = result
+            return
+        except self.item_errors as e:
+            error = e
+            split = len(batch) > 1
+        except Exception as e:
+            error = e
+            split = False
+        with self._condition:
+            self.errors += 1
+        if split:
+            # Bisect so a bad item fails only its own caller
+            middle = len(batch) // 2
+            self._run_batch(batch[:middle])
+            self._run_batch(batch[middle:])
+        else:
+            for pending in batch:
+                pending.error = error
+
+    def _record_batch(self, size):
+        with self._condition:
+            self.batches += 1
+            self.items += size
+            self.max_batch_seen = max(self.max_batch_seen, size)
+            # Power-of-two buckets: 1, 2, 4, ... (each counts sizes up to its key)
+            bucket = 1 << (size - 1).bit_length()
+            self.batch_sizes[bucket] = self.batch_sizes.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._condition:
+            return {
+                "name": self.name,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else None,
+                "max_batch_size": self.max_batch_seen,
+                "batch_size_buckets": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+                "errors": self.errors,
+                "timeouts": self.timeouts
+            }
@@ -0,0 +1,142 @@
+# backend/app/services/model_registry.py
+import hashlib
+import os
+import threading
+import time
+
+from joblib import load
+
+from app.config import MODEL_DIR, MODEL_PATH
+from app.services.metrics import metrics
+
+
+class LoadedModel:
+    """A deserialized model together with where it came from"""
+
+    def __init__(self, model, path, sha256, loaded_at):
+        self.model = model
+        self.path = path
+        self.sha256 = sha256
+        self.version = sha256[:12]
+        self.loaded_at = loaded_at
+
+    def info(self):
+        return {
+            "path": self.path,
+            "version": self.version,
+            "sha256": self.sha256,
+            "loaded_at": self.loaded_at
+        }
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def resolve_model_path(path, model_dir=MODEL_DIR):
+    """
+    Absolute path of a model file requested by a client, relative to
+    model_dir. Raises ValueError for paths that resolve (through symlinks
+    or '..') outside it, since model files are unpickled.
+    """
+    resolved = os.path.realpath(os.path.join(model_dir, path))
+    if os.path.commonpath([resolved, model_dir]) != model_dir:
+        raise ValueError(f"Model path must be inside {model_dir}")
+    return resolved
+
+
+class ModelRegistry:
+    """
+    Holds the price model, deserialized once instead of on every request.
+
+    load() reads a model file completely and checks that it predicts a
+    price for every row of a probe frame before publishing it, so a swap is
+    a single reference assignment: requests in flight keep the model they
+    started with and a failed load or check leaves the current model and
+    path in place. The
+    version is the start of the file's SHA-256, so it names the content, not
+    the path. Fallbacks to the heuristic price are counted per reason.
+    Callbacks registered with on_swap() run after each swap, for caches of
+    results computed by the previous model.
+    """
+
+    def __init__(self, path=MODEL_PATH):
+        self.path = path
+        self._current = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.load_errors = 0
+        self.last_error = None
+        self.fallbacks = {}
+        self._listeners = []
+
+    def current(self):
+        """The LoadedModel serving requests, or None if no model is loaded"""
+        return self._current
+
+    def load(self, path=None):
+        """Load a model file and swap it in atomically; returns the LoadedModel"""
+        path = os.path.abspath(path or self.path)
+        # Imported here: feature_encoder registers itself on this registry
+        from app.services.feature_encoder import validate_price_model
+
+        with self._lock:
+            try:
+                with metrics.timer('model_load'):
+                    sha256 = _file_sha256(path)
+                    model = load(path)
+                validate_price_model(model)
+            except Exception as e:
+                self.load_errors += 1
+                self.last_error = f"{path}: {str(e)}"
+                raise
+            loaded = LoadedModel(model, path, sha256, time.time())
+            self._current = loaded
+            self.path = path
+            self.loads += 1
+            self.last_error = None
+        print(f"Loaded price model {loaded.version} from {path}")
+        for listener in list(self._listeners):
+            try:
+                listener(loaded)
+            except Exception as e:
+                print(f"Model swap listener failed: {str(e)}")
+        return loaded
+
+    def on_swap(self, listener):
+        """Call listener(loaded_model) every time a model is swapped in"""
+        self._listeners.append(listener)
+        return listener
+
+    def load_if_available(self):
+        """Load the configured model at startup, logging instead of raising"""
+        try:
+            return self.load()
+        except Exception as e:
+            print(f"Price model not loaded, predictions will use the fallback method: {str(e)}")
+            return None
+
+    def record_fallback(self, reason, count=1):
+        with self._lock:
+            self.fallbacks[reason] = self.fallbacks.get(reason, 0) + count
+
+    def stats(self):
+        current = self._current
+        with self._lock:
+            fallbacks = dict(self.fallbacks)
+        return {
+            "model": current.info() if current is not None else None,
+            "configured_path": self.path,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "last_error": self.last_error,
+            "fallbacks": fallbacks,
+            "fallbacks_total": sum(fallbacks.values())
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,56 @@
+# backend/app/services/prediction_cache.py
+import math
+
+from app.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from app.services.lru import LRUCache
+from app.services.model_registry import model_registry
+
+
+def _normalize(value):
+    """Feature value as a hashable key part that compares equal across dtypes"""
+    if value is None or isinstance(value, str):
+        return value
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class PredictionCache:
+    """
+    Memo cache for model predictions.
+
+    A prediction is keyed on the model version and the preprocessed feature
+    row (after the KOTA / SERTIFIKAT / TIPE mappings), so inputs that only
+    differ before preprocessing, like the case of a city name, share an
+    entry. Only model outputs are stored, never fallback prices, and the
+    cache is cleared whenever the registry swaps in a model.
+    """
+
+    def __init__(self, max_items=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.cache = LRUCache(max_items=max_items, ttl=ttl, name='predictions')
+        self.invalidations = 0
+
+    def keys(self, version, rows):
+        """Cache key of every preprocessed row (see feature_encoder.preprocess_records)"""
+        return [(version,) + tuple(_normalize(value) for value in row) for row in rows]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def put(self, key, price):
+        self.cache.put(key, price)
+
+    def invalidate(self, loaded_model=None):
+        self.cache.clear()
+        self.invalidations += 1
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+prediction_cache = PredictionCache()
+model_registry.on_swap(prediction_cache.invalidate)
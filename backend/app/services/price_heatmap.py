@@ -0,0 +1,118 @@
+# backend/app/services/price_heatmap.py
+import math
+
+import numpy as np
+
+from app.config import PRICE_HEATMAP_BLOCK_SIZE, PRICE_HEATMAP_CACHE_BYTES
+from app.services.lru import LRUCache
+
+
+class PriceHeatmapCache:
+    """
+    Predicted-price rasters assembled from cached blocks of a global grid.
+
+    Cell (row, col) of a grid of the given resolution covers latitudes
+    [row * res, (row + 1) * res) and longitudes [col * res, (col + 1) * res)
+    and is valued at its centre, so every request at one resolution shares
+    the same cells no matter its bbox. Cells are computed and cached in
+    square blocks of block_size, keyed on the caller's key (spec hash, model
+    version, layer versions) plus the resolution, which lets a panned or
+    zoomed-out view reuse every block it overlaps with an earlier one. All
+    missing blocks of a request are computed in one call, unless their
+    cells exceed max_cells (a thin strip touches many blocks but few of
+    their cells): then only the requested cells are computed and those
+    partial blocks are not cached.
+    """
+
+    def __init__(self, block_size=PRICE_HEATMAP_BLOCK_SIZE, max_bytes=PRICE_HEATMAP_CACHE_BYTES):
+        self.block_size = block_size
+        self.cache = LRUCache(max_bytes=max_bytes, name='price_heatmap_blocks')
+        self.blocks_computed = 0
+
+    @staticmethod
+    def grid_window(bbox, resolution):
+        """First row, first column, height and width of the cells overlapping a bbox"""
+        min_lng, min_lat, max_lng, max_lat = bbox
+        col0 = int(math.floor(min_lng / resolution))
+        row0 = int(math.floor(min_lat / resolution))
+        width = max(int(math.ceil(max_lng / resolution)) - col0, 1)
+        height = max(int(math.ceil(max_lat / resolution)) - row0, 1)
+        return row0, col0, height, width
+
+    def render(self, key, bbox, resolution, compute, max_cells=None):
+        """
+        North-up float32 raster of the cells overlapping bbox, its transform
+        (x0, y0, dx, dy) as used by GridcodeRaster, and block and cell counts.
+
+        compute(lats, lngs) returns the value at each cell centre; it is
+        asked for at most max(max_cells, cells in the bbox) values.
+        """
+        size = self.block_size
+        row0, col0, height, width = self.grid_window(bbox, resolution)
+        blocks = [(block_row, block_col)
+                  for block_row in range(row0 // size, (row0 + height - 1) // size + 1)
+                  for block_col in range(col0 // size, (col0 + width - 1) // size + 1)]
+
+        values = {}
+        missing = []
+        for block in blocks:
+            cached = self.cache.get((key, resolution) + block)
+            if cached is None:
+                missing.append(block)
+            else:
+                values[block] = cached
+
+        clipped = []  # (rows, cols, values) of computed cells that are not cached
+        blocks_computed = cells_computed = 0
+        if missing and max_cells is not None and len(missing) * size * size > max_cells:
+            # Clip each missing block to the window; nothing new is cached
+            pieces = []
+            for block_row, block_col in missing:
+                top, left = block_row * size - row0, block_col * size - col0
+                pieces.append((slice(max(top, 0), min(top + size, height)), slice(max(left, 0), min(left + size, width))))
+            lats = np.concatenate([np.repeat((row0 + np.arange(rows.start, rows.stop) + 0.5) * resolution,
+                                             cols.stop - cols.start) for rows, cols in pieces])
+            lngs = np.concatenate([np.tile((col0 + np.arange(cols.start, cols.stop) + 0.5) * resolution,
+                                           rows.stop - rows.start) for rows, cols in pieces])
+            computed = np.asarray(compute(lats, lngs), dtype=np.float32)
+            cells_computed = len(computed)
+            start = 0
+            for rows, cols in pieces:
+                count = (rows.stop - rows.start) * (cols.stop - cols.start)
+                clipped.append((rows, cols, computed[start:start + count].reshape(rows.stop - rows.start, -1)))
+                start += count
+        elif missing:
+            offsets = (np.arange(size) + 0.5) * resolution
+            lats = np.concatenate([np.repeat(block_row * size * resolution + offsets, size)
+                                   for block_row, _ in missing])
+            lngs = np.concatenate([np.tile(block_col * size * resolution + offsets, size)
+                                   for _, block_col in missing])
+            computed = np.asarray(compute(lats, lngs), dtype=np.float32).reshape(len(missing), size, size)
+            for block, block_values in zip(missing, computed):
+                values[block] = block_values
+                self.cache.put((key, resolution) + block, block_values, block_values.nbytes)
+            self.blocks_computed += len(missing)
+            blocks_computed, cells_computed = len(missing), computed.size
+
+        # Rows of the blocks run south to north; the raster is flipped at the end
+        raster = np.empty((height, width), dtype=np.float32)
+        for (block_row, block_col), block_values in values.items():
+            top, left = block_row * size - row0, block_col * size - col0
+            rows = slice(max(top, 0), min(top + size, height))
+            cols = slice(max(left, 0), min(left + size, width))
+            raster[rows, cols] = block_values[rows.start - top:rows.stop - top, cols.start - left:cols.stop - left]
+        for rows, cols, piece in clipped:
+            raster[rows, cols] = piece
+
+        transform = (col0 * resolution, (row0 + height) * resolution, resolution, resolution)
+        return raster[::-1], transform, {"blocks": len(blocks), "blocks_computed": blocks_computed,
+                                         "cells_computed": cells_computed}
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["blocks_computed"] = self.blocks_computed
+        stats["block_size"] = self.block_size
+        return stats
+
+
+price_heatmap_cache = PriceHeatmapCache()
@@ -0,0 +1,155 @@
+# backend/app/services/profiler.py
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+from flask import g, request
+
+from app.config import DEBUG_PROFILE_INTERVAL_MS
+from utils.auth import is_admin_request
+
+# Deepest stack kept per sample; deeper frames are cut at the root end
+MAX_STACK_DEPTH = 200
+# Shortest sampling interval accepted, so a window cannot busy-spin
+MIN_INTERVAL = 0.001
+
+
+class ProfilerBusy(Exception):
+    """Another sampling window is already running (status 409)"""
+
+    def __init__(self, message, status=409):
+        super().__init__(message)
+        self.status = status
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler over every Python thread of the process.
+
+    sample() wakes every interval seconds on the calling thread, reads the
+    current frame of each other thread with sys._current_frames() and counts
+    each distinct stack. Stacks are collapsed root first with the thread
+    name as the root frame (request threads, inference workers, batcher
+    workers, ...), one "frame;frame;frame count" line each, the input
+    format of flamegraph.pl and speedscope. Nothing runs between windows,
+    and only one window runs at a time.
+    """
+
+    def __init__(self, interval=DEBUG_PROFILE_INTERVAL_MS / 1000.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def sample(self, seconds, interval=None):
+        """Counts of collapsed stacks seen over a window, and the number of samples taken"""
+        interval = max(interval or self.interval, MIN_INTERVAL)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already being taken")
+        try:
+            own = threading.get_ident()
+            labels = {}  # code object -> frame label
+            stacks = {}
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    frames = []
+                    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                        code = frame.f_code
+                        label = labels.get(code)
+                        if label is None:
+                            label = labels[code] = _frame_label(code)
+                        frames.append(label)
+                        frame = frame.f_back
+                    frames.append(names.get(ident, f'thread-{ident}'))
+                    stack = ';'.join(reversed(frames))
+                    stacks[stack] = stacks.get(stack, 0) + 1
+                samples += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(interval, remaining))
+            return stacks, samples
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapsed(stacks):
+        """Collapsed-stack text, most frequent stacks first"""
+        return ''.join(f'{stack} {count}\n'
+                       for stack, count in sorted(stacks.items(), key=lambda item: (-item[1], item[0])))
+
+
+def profile_summary(profile, limit=40):
+    """pstats text of a finished cProfile run, top functions by cumulative time"""
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def install_request_profiler(app):
+    """
+    Profile single requests sent with "X-Profile: 1" and the admin token.
+
+    The request runs under cProfile on its own thread and the response body
+    is replaced by the profile summary (text/plain), keeping the status
+    code; the original content type is sent in X-Profile-Content-Type.
+    Work handed to the inference pool or micro-batcher runs on other
+    threads and shows up as time spent waiting for it; use the sampling
+    profiler to see inside it. Only call this when profiling is enabled:
+    the hooks are not registered otherwise, so unprofiled requests pay
+    nothing.
+    """
+    @app.before_request
+    def start_request_profile():
+        if request.headers.get('X-Profile') != '1' or not is_admin_request():
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one active cProfile per process
+            print(f"Request profile not taken: {str(e)}")
+            return None
+        g.request_profile = profile
+        g.request_profile_started = time.perf_counter()
+        return None
+
+    @app.after_request
+    def finish_request_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return response
+        profile.disable()
+        elapsed = time.perf_counter() - g.pop('request_profile_started')
+        header = f'{request.method} {request.full_path.rstrip("?")} -> {response.status_code} in {elapsed * 1000:.1f} ms\n\n'
+        response.headers['X-Profile-Content-Type'] = response.content_type or ''
+        # The summary replaces a possibly gzipped, streamed or conditional body
+        response.direct_passthrough = False
+        for name in ('Content-Encoding', 'Content-Length', 'Vary', 'ETag', 'Last-Modified'):
+            response.headers.pop(name, None)
+        response.headers['Cache-Control'] = 'no-store'
+        response.set_data(header + profile_summary(profile))
+        response.mimetype = 'text/plain'
+        return response
+
+    @app.teardown_request
+    def stop_request_profile(exc):
+        # The view raised before after_request ran
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profile.disable()
+
+
+stack_sampler = StackSampler()
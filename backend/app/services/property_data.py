@@ -0,0 +1,35 @@
+# backend/app/services/property_data.py
+import threading
+
+import pandas as pd
+
+from app.config import PROPERTY_CSV_PATH
+from app.services.layer_store import file_version
+from app.services.metrics import metrics
+
+_lock = threading.Lock()
+_cached = None
+
+
+def property_data_version():
+    """(mtime_ns, size) of the property CSV"""
+    return file_version(PROPERTY_CSV_PATH)
+
+
+def get_property_frame():
+    """
+    Return (DataFrame, version) of the property CSV.
+
+    The CSV is parsed once per file version and the frame is shared by all
+    requests, so callers must treat it as read-only (copy before mutating).
+    """
+    global _cached
+    version = property_data_version()
+    cached = _cached
+    if cached is not None and cached[1] == version:
+        return cached
+    with _lock:
+        if _cached is None or _cached[1] != version:
+            with metrics.timer('csv_load'):
+                _cached = (pd.read_csv(PROPERTY_CSV_PATH), version)
+        return _cached
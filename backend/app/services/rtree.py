@@ -0,0 +1,94 @@
+# backend/app/services/rtree.py
+import numpy as np
+
+
+def _hilbert_index(x, y, order=16):
+    """Vectorized distance along a Hilbert curve of 2**order cells per side"""
+    x = x.astype(np.int64)
+    y = y.astype(np.int64)
+    n = 1 << order
+    d = np.zeros_like(x)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return d
+
+
+class PackedHilbertRTree:
+    """
+    Static R-tree over bounding boxes, packed in Hilbert order.
+
+    Items are sorted by the Hilbert index of their box centre and grouped
+    node_size at a time; each level above stores the union box of its
+    children. Queries walk the levels top-down with vectorized box tests.
+    """
+
+    def __init__(self, bounds, node_size=16):
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.node_size = node_size
+        self.size = len(bounds)
+
+        valid = ~np.isnan(bounds).any(axis=1)
+        items = np.flatnonzero(valid)
+        boxes = bounds[items]
+        if len(boxes):
+            cx = (boxes[:, 0] + boxes[:, 2]) / 2
+            cy = (boxes[:, 1] + boxes[:, 3]) / 2
+            span_x = max(cx.max() - cx.min(), 1e-12)
+            span_y = max(cy.max() - cy.min(), 1e-12)
+            hx = ((cx - cx.min()) / span_x * 65535).astype(np.int64)
+            hy = ((cy - cy.min()) / span_y * 65535).astype(np.int64)
+            order = np.argsort(_hilbert_index(hx, hy), kind='stable')
+            items = items[order]
+            boxes = boxes[order]
+
+        self.order = items
+        self.levels = [boxes]
+        while len(self.levels[-1]) > node_size:
+            children = self.levels[-1]
+            starts = np.arange(0, len(children), node_size)
+            self.levels.append(np.column_stack([
+                np.minimum.reduceat(children[:, 0], starts),
+                np.minimum.reduceat(children[:, 1], starts),
+                np.maximum.reduceat(children[:, 2], starts),
+                np.maximum.reduceat(children[:, 3], starts)
+            ]))
+
+    @classmethod
+    def from_arrays(cls, order, levels, node_size, size):
+        """Rebuild a tree from arrays saved by a previous build"""
+        tree = cls.__new__(cls)
+        tree.node_size = node_size
+        tree.size = size
+        tree.order = order
+        tree.levels = list(levels)
+        return tree
+
+    @property
+    def nbytes(self):
+        return self.order.nbytes + sum(level.nbytes for level in self.levels)
+
+    def query(self, minx, miny, maxx, maxy):
+        """Sorted indices of the items whose box intersects the query box"""
+        candidates = np.arange(len(self.levels[-1]))
+        for depth in range(len(self.levels) - 1, -1, -1):
+            boxes = self.levels[depth][candidates]
+            hit = (
+                (boxes[:, 0] <= maxx) & (boxes[:, 2] >= minx) &
+                (boxes[:, 1] <= maxy) & (boxes[:, 3] >= miny)
+            )
+            candidates = candidates[hit]
+            if depth == 0:
+                break
+            children = (candidates[:, None] * self.node_size + np.arange(self.node_size)).ravel()
+            candidates = children[children < len(self.levels[depth - 1])]
+        return np.sort(self.order[candidates])
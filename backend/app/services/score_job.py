@@ -0,0 +1,175 @@
+# backend/app/services/score_job.py
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    CLIMATE_LOOKUP_METHOD, PROPERTY_CSV_PATH, SCORE_JOB_WORKERS, SCORE_JOB_CHUNK_SIZE, SCORE_JOBS_DIR
+)
+from app.services.gridcode_raster import CLIMATE_LAYERS
+from app.services.layer_store import file_version, layer_store
+
+# CSV column written for each score key of calculate_climate_scores
+SCORE_COLUMNS = {
+    'lst_score': 'score_LST',
+    'ndvi_score': 'score_NDVI',
+    'utfvi_score': 'score_UTFVI',
+    'uhi_score': 'score_UHI',
+    'overall_score': 'Overall_Score'
+}
+
+
+def _score_chunk(lats, lngs):
+    """Worker: climate scores of one chunk of rows"""
+    # Imported here so the service layer does not depend on the routes at import time
+    from routes.developer_routes import calculate_climate_scores_batch
+    return calculate_climate_scores_batch(lats, lngs)
+
+
+def _checkpoint_path(directory, start):
+    return os.path.join(directory, f'chunk_{start}.npz')
+
+
+def _save_checkpoint(path, scores):
+    tmp_path = f'{path}.tmp{os.getpid()}.npz'
+    np.savez(tmp_path, **scores)
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(path):
+    try:
+        with np.load(path) as data:
+            return {key: data[key] for key in SCORE_COLUMNS}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class ScoreJob:
+    """
+    Recomputes the climate score columns of the property CSV.
+
+    Rows are scored in chunks of chunk_size by a pool of worker processes
+    using calculate_climate_scores semantics. Each finished chunk is saved
+    as a checkpoint under a directory keyed on the CSV and layer versions,
+    so a job interrupted by a crash or restart picks up the remaining chunks
+    on the next run. The CSV is only replaced (atomically) once every chunk
+    is done, and only if it did not change while the job ran. Rows without
+    valid coordinates keep their previous scores.
+    """
+
+    def __init__(self, csv_path=PROPERTY_CSV_PATH, workers=SCORE_JOB_WORKERS, chunk_size=SCORE_JOB_CHUNK_SIZE,
+                 jobs_dir=SCORE_JOBS_DIR):
+        self.csv_path = csv_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.jobs_dir = jobs_dir
+        self._lock = threading.Lock()
+        self._thread = None
+        self._status = {"state": "idle"}
+
+    def status(self):
+        with self._lock:
+            status = dict(self._status)
+        if status.get('state') == 'running':
+            status['elapsed_seconds'] = round(time.time() - status['started_at'], 3)
+        return status
+
+    def _update(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def start(self):
+        """Run the job in a background thread; returns False if one is already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._status = {"state": "running", "started_at": time.time()}
+            self._thread = threading.Thread(target=self._run_safely, name='climate-score-job', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run_safely(self):
+        try:
+            self.run()
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self._update(state="failed", error=str(e), finished_at=time.time())
+
+    def _job_dir(self, csv_version, layer_versions):
+        key = json.dumps([list(csv_version), [list(v) if v else None for v in layer_versions],
+                          self.chunk_size, CLIMATE_LOOKUP_METHOD])
+        return os.path.join(self.jobs_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:16])
+
+    def run(self):
+        """Score every row and write the columns back to the CSV (blocking)"""
+        with self._lock:
+            if self._status.get('state') != 'running':
+                self._status = {"state": "running", "started_at": time.time()}
+
+        csv_version = file_version(self.csv_path)
+        layer_versions = tuple(layer_store.version(layer) for layer in CLIMATE_LAYERS)
+        df = pd.read_csv(self.csv_path)
+        lats = pd.to_numeric(df.get('LATITUDE'), errors='coerce').to_numpy(dtype=np.float64)
+        lngs = pd.to_numeric(df.get('LONGITUDE'), errors='coerce').to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            valid = np.flatnonzero((np.abs(lats) <= 90) & (np.abs(lngs) <= 180))
+
+        job_dir = self._job_dir(csv_version, layer_versions)
+        os.makedirs(job_dir, exist_ok=True)
+        chunks = list(range(0, len(valid), self.chunk_size))
+        results = {}
+        for start in chunks:
+            scores = _load_checkpoint(_checkpoint_path(job_dir, start))
+            if scores is not None:
+                results[start] = scores
+        self._update(
+            job_id=os.path.basename(job_dir), total_rows=len(df), scored_rows=len(valid),
+            chunks_total=len(chunks), chunks_done=len(results), resumed_chunks=len(results)
+        )
+
+        pending = [start for start in chunks if start not in results]
+        if pending:
+            context = multiprocessing.get_context('spawn')  # never fork a threaded server
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending)), mp_context=context) as pool:
+                futures = {}
+                for start in pending:
+                    rows = valid[start:start + self.chunk_size]
+                    futures[pool.submit(_score_chunk, lats[rows], lngs[rows])] = start
+                for future in as_completed(futures):
+                    start = futures[future]
+                    results[start] = future.result()
+                    _save_checkpoint(_checkpoint_path(job_dir, start), results[start])
+                    self._update(chunks_done=len(results))
+
+        if file_version(self.csv_path) != csv_version:
+            raise RuntimeError("Property dataset changed while scoring; run the job again")
+
+        self._update(state="writing")
+        for key, column in SCORE_COLUMNS.items():
+            values = np.concatenate([results[start][key] for start in chunks]) if chunks else np.array([])
+            if column not in df.columns:
+                df[column] = np.nan
+            if len(valid):
+                df[column] = df[column].astype(np.float64)
+                df.loc[df.index[valid], column] = values
+        tmp_path = f'{self.csv_path}.tmp{os.getpid()}'
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.csv_path)
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+        finished_at = time.time()
+        self._update(state="completed", finished_at=finished_at,
+                     duration_seconds=round(finished_at - self._status['started_at'], 3))
+        return self.status()
+
+
+score_job = ScoreJob()
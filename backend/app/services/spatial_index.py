@@ -0,0 +1,108 @@
+# backend/app/services/spatial_index.py
+import numpy as np
+
+from app.services.layer_store import layer_store
+from app.services.rtree import PackedHilbertRTree
+
+
+def get_shapely():
+    """Return the shapely module if shapely 2.x is installed, else None"""
+    try:
+        import shapely
+    except ImportError:
+        return None
+    if int(shapely.__version__.split('.')[0]) < 2:
+        return None
+    return shapely
+
+
+class LayerSpatialIndex:
+    """
+    Bounding-box index over the features of one layer's CompactLayer.
+
+    Candidates come from the layer's prebuilt R-tree when it was compiled
+    with one, else from a shapely STRtree over the feature boxes when
+    shapely 2.x is available, otherwise from a packed Hilbert R-tree. With
+    shapely the candidates are then refined against their real geometry
+    (built only for the candidates) and can be clipped to the query box.
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.bounds = layer.bounds
+        self._shapely = get_shapely()
+        if layer.rtree is not None:
+            self.tree = layer.rtree
+            self.backend = 'prebuilt'
+        elif self._shapely is not None:
+            self._items = np.flatnonzero(~np.isnan(self.bounds).any(axis=1))
+            b = self.bounds[self._items]
+            self.tree = self._shapely.STRtree(self._shapely.box(b[:, 0], b[:, 1], b[:, 2], b[:, 3]))
+            self.backend = 'strtree'
+        else:
+            self.tree = PackedHilbertRTree(self.bounds)
+            self.backend = 'hilbert'
+
+    @property
+    def nbytes(self):
+        if self.backend == 'strtree':
+            return self._items.nbytes
+        if self.backend == 'hilbert':
+            return self.tree.nbytes
+        return 0  # prebuilt tree is accounted for with its layer
+
+    @property
+    def can_clip(self):
+        return self._shapely is not None
+
+    def candidates(self, minx, miny, maxx, maxy):
+        """Sorted indices of the features whose bounding box intersects the box"""
+        if self.backend == 'strtree':
+            box = self._shapely.box(minx, miny, maxx, maxy)
+            return np.sort(self._items[self.tree.query(box)])
+        return self.tree.query(minx, miny, maxx, maxy)
+
+    def _query_geometries(self, minx, miny, maxx, maxy):
+        indices = self.candidates(minx, miny, maxx, maxy)
+        geometries = self.layer.to_shapely(indices)
+        hit = self._shapely.intersects(geometries, self._shapely.box(minx, miny, maxx, maxy))
+        return indices[hit], geometries[hit]
+
+    def query(self, minx, miny, maxx, maxy):
+        """Sorted indices of the features intersecting the box"""
+        if self._shapely is None:
+            return self.candidates(minx, miny, maxx, maxy)
+        return self._query_geometries(minx, miny, maxx, maxy)[0]
+
+    def features_in_bbox(self, minx, miny, maxx, maxy, clip=False):
+        """GeoJSON features intersecting the box, clipped to it if requested"""
+        if not (clip and self.can_clip):
+            return [self.layer.feature(i) for i in self.query(minx, miny, maxx, maxy)]
+
+        from shapely.geometry import mapping
+        indices, geometries = self._query_geometries(minx, miny, maxx, maxy)
+        clipped = self._shapely.clip_by_rect(geometries, minx, miny, maxx, maxy)
+        result = []
+        for i, geometry in zip(indices, clipped):
+            if geometry.is_empty:
+                continue
+            feature = self.layer.attributes(i)
+            feature['geometry'] = mapping(geometry)
+            result.append(feature)
+        return result
+
+
+def get_layer_index(layer_name):
+    """Spatial index of a layer, built once per layer file version"""
+    return layer_store.get_derived(layer_name, 'spatial_index', LayerSpatialIndex)
+
+
+def parse_bbox(value):
+    """Parse 'minx,miny,maxx,maxy' into four floats, raising ValueError if invalid"""
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError("bbox must be minx,miny,maxx,maxy")
+    minx, miny, maxx, maxy = parts
+    if minx > maxx or miny > maxy:
+        raise ValueError("bbox min values must not exceed max values")
+    return minx, miny, maxx, maxy
@@ -0,0 +1,249 @@
+# backend/app/services/topology.py
+import gzip
+import json
+
+import numpy as np
+
+from app.config import TOPOJSON_QUANTIZATION
+from app.services.geometry_store import GEOMETRY_TYPES, NULL_GEOMETRY, POLYGON_CODES
+from app.services.layer_store import layer_store
+
+LINE_CODES = (GEOMETRY_TYPES.index('LineString'), GEOMETRY_TYPES.index('MultiLineString'))
+
+
+def _lattice_step(values, quantization):
+    """
+    Spacing of the regular grid the values lie on (a polygonized raster's
+    pixel size), or None if they are not on one of at most quantization
+    lines.
+    """
+    unique = np.unique(values)
+    if len(unique) < 2:
+        return None
+    span = unique[-1] - unique[0]
+    steps = np.diff(unique)
+    steps = steps[steps > span * 1e-9]  # float noise around one grid line
+    lines = np.rint(span / steps.min())
+    if lines + 1 > quantization:
+        return None
+    step = span / lines
+    offsets = (unique - unique[0]) / step
+    if np.abs(offsets - np.rint(offsets)).max() > 1e-6:
+        return None
+    return step
+
+
+def _quantize(layer, quantization):
+    """
+    Integer grid positions of every coordinate, plus the TopoJSON transform.
+
+    Coordinates already on a regular grid (polygonized rasters) are
+    quantized on that grid, which is exact and keeps the integers small;
+    others on quantization lines over the layer bounds.
+    """
+    positions = layer.positions(0, len(layer.coords))
+    if len(positions):
+        x0, y0 = positions.min(axis=0)
+        span_x, span_y = positions.max(axis=0) - (x0, y0)
+        kx = _lattice_step(positions[:, 0], quantization) or (span_x / (quantization - 1) if span_x else 1.0)
+        ky = _lattice_step(positions[:, 1], quantization) or (span_y / (quantization - 1) if span_y else 1.0)
+    else:
+        x0 = y0 = 0.0
+        kx = ky = 1.0
+    grid = np.rint((positions - (x0, y0)) / (kx, ky)).astype(np.int64)
+    transform = {"scale": [float(kx), float(ky)], "translate": [float(x0), float(y0)]}
+    return grid, transform
+
+
+def _dedupe(points):
+    """Drop consecutive repeated positions created by quantization"""
+    result = []
+    for point in points:
+        if not result or result[-1] != point:
+            result.append(point)
+    return result
+
+
+class _ArcBuilder:
+    """
+    Cuts quantized lines and rings at junctions and deduplicates the pieces.
+
+    A junction is a point where the shared path between parts diverges:
+    line endpoints, and any point whose pair of neighbours differs between
+    two of its occurrences. Pieces between junctions are shared arcs; a
+    piece seen in reverse is referenced as ~index, as in TopoJSON.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.junctions = self._find_junctions(parts)
+        self.arcs = []
+        self._arc_ids = {}
+
+    @staticmethod
+    def _find_junctions(parts):
+        neighbours = {}
+        junctions = set()
+        for kind, points in parts:
+            if kind == 'line':
+                if points:
+                    junctions.add(points[0])
+                    junctions.add(points[-1])
+                indices = range(1, len(points) - 1)
+                previous = lambda i: points[i - 1]
+            else:
+                # Closed ring: the last point repeats the first one
+                indices = range(len(points) - 1)
+                previous = lambda i: points[i - 1] if i > 0 else points[-2]
+            for i in indices:
+                before, after = previous(i), points[i + 1]
+                pair = (before, after) if before <= after else (after, before)
+                seen = neighbours.setdefault(points[i], pair)
+                if seen != pair:
+                    junctions.add(points[i])
+        return junctions
+
+    def _arc_id(self, points):
+        key = tuple(points)
+        if key in self._arc_ids:
+            return self._arc_ids[key]
+        reverse_key = key[::-1]
+        if reverse_key in self._arc_ids:
+            return ~self._arc_ids[reverse_key]
+        self._arc_ids[key] = len(self.arcs)
+        self.arcs.append(points)
+        return len(self.arcs) - 1
+
+    def _cut(self, points):
+        cuts = [i for i in range(1, len(points) - 1) if points[i] in self.junctions]
+        bounds = [0] + cuts + [len(points) - 1]
+        return [self._arc_id(points[start:end + 1]) for start, end in zip(bounds, bounds[1:])]
+
+    def line(self, points):
+        return self._cut(points)
+
+    def ring(self, points):
+        if len(points) < 2:
+            return [self._arc_id(points)]
+        body = points[:-1]
+        starts = [i for i, point in enumerate(body) if point in self.junctions]
+        # Rotate so the ring starts on a junction, or on its smallest point
+        # when it has none, so identical rings always cut the same way
+        start = starts[0] if starts else body.index(min(body))
+        rotated = body[start:] + body[:start]
+        return self._cut(rotated + [rotated[0]])
+
+
+def _drop_collinear(points):
+    """Drop points lying straight between their neighbours (pixel corners along a straight edge)"""
+    if len(points) < 3:
+        return points
+    kept = [points[0]]
+    for point, following in zip(points[1:-1], points[2:]):
+        previous = kept[-1]
+        ax, ay = point[0] - previous[0], point[1] - previous[1]
+        bx, by = following[0] - point[0], following[1] - point[1]
+        if ax * by != ay * bx or ax * bx + ay * by <= 0:
+            kept.append(point)
+    kept.append(points[-1])
+    return kept
+
+
+def _delta_encode(points):
+    encoded = [list(points[0])]
+    for previous, point in zip(points, points[1:]):
+        encoded.append([point[0] - previous[0], point[1] - previous[1]])
+    return encoded
+
+
+def build_topology(layer, object_name, quantization=TOPOJSON_QUANTIZATION):
+    """
+    Encode a CompactLayer as a quantized, delta-encoded TopoJSON Topology.
+
+    Shared polygon edges (nearly every edge of a polygonized grid) are
+    stored once as arcs and referenced from both neighbouring polygons,
+    without the pixel corners along their straight runs. How much smaller
+    than compact GeoJSON this is depends on the polygons: about 9x for
+    grids polygonized into merged regions, but only about 1.6x when every
+    pixel is its own polygon, where the per-feature type, arcs and
+    properties dominate (and gzipped it is then larger than gzipped
+    GeoJSON).
+    """
+    grid, transform = _quantize(layer, quantization)
+    ring_offsets, part_offsets, geom_offsets = layer.ring_offsets, layer.part_offsets, layer.geom_offsets
+
+    # Geometry type of the feature owning each ring
+    part_feature = np.repeat(np.arange(len(layer)), np.diff(geom_offsets))
+    ring_part = np.repeat(np.arange(len(part_offsets) - 1), np.diff(part_offsets))
+    ring_types = layer.geom_types[part_feature[ring_part]] if len(ring_part) else np.array([], dtype=np.int8)
+
+    linear = {}
+    parts = []
+    for ring, code in enumerate(ring_types.tolist()):
+        if code in POLYGON_CODES:
+            kind = 'ring'
+        elif code in LINE_CODES:
+            kind = 'line'
+        else:
+            continue
+        points = _dedupe([tuple(p) for p in grid[ring_offsets[ring]:ring_offsets[ring + 1]].tolist()])
+        linear[ring] = len(parts)
+        parts.append((kind, points))
+
+    builder = _ArcBuilder(parts)
+    part_arcs = [builder.line(points) if kind == 'line' else builder.ring(points) for kind, points in parts]
+
+    def rings_of(part):
+        return [part_arcs[linear[ring]] for ring in range(part_offsets[part], part_offsets[part + 1])]
+
+    geometries = []
+    for i in range(len(layer)):
+        code = int(layer.geom_types[i])
+        kind = GEOMETRY_TYPES[code] if code != NULL_GEOMETRY else None
+        first_part, end_part = geom_offsets[i], geom_offsets[i + 1]
+        encoded = {"type": kind}
+        if kind in ('LineString', 'Polygon'):
+            rings = rings_of(first_part)
+            encoded['arcs'] = rings[0] if kind == 'LineString' else rings
+        elif kind == 'MultiLineString':
+            encoded['arcs'] = [rings_of(part)[0] for part in range(first_part, end_part)]
+        elif kind == 'MultiPolygon':
+            encoded['arcs'] = [rings_of(part) for part in range(first_part, end_part)]
+        elif kind in ('Point', 'MultiPoint'):
+            ring = part_offsets[first_part]
+            points = grid[ring_offsets[ring]:ring_offsets[ring + 1]].tolist()
+            encoded['coordinates'] = points[0] if kind == 'Point' else points
+        properties = layer.attributes(i).get('properties')
+        if properties:
+            encoded['properties'] = properties
+        geometries.append(encoded)
+
+    return {
+        "type": "Topology",
+        "transform": transform,
+        "objects": {
+            object_name: {"type": "GeometryCollection", "geometries": geometries}
+        },
+        "arcs": [_delta_encode(_drop_collinear(arc)) for arc in builder.arcs]
+    }
+
+
+class EncodedTopology:
+    """Serialized (and gzipped) TopoJSON of one layer, ready to send"""
+
+    def __init__(self, data):
+        self.data = data
+        self.gzip_data = gzip.compress(data, compresslevel=6)
+
+    @property
+    def nbytes(self):
+        return len(self.data) + len(self.gzip_data)
+
+
+def get_layer_topology(layer_name):
+    """TopoJSON encoding of a layer, computed once per layer file version"""
+    def build(layer):
+        topology = build_topology(layer, layer_name)
+        return EncodedTopology(json.dumps(topology, separators=(',', ':')).encode('utf-8'))
+
+    return layer_store.get_derived(layer_name, 'topojson', build)
@@ -0,0 +1,300 @@
+# backend/app/services/vector_tiles.py
+import gzip
+import json
+import math
+import os
+
+import numpy as np
+
+from app.config import (
+    TILES_DIR, TILE_EXTENT, TILE_BUFFER, TILE_MIN_ZOOM, TILE_MAX_ZOOM, TILE_SIMPLIFY_PIXELS, TILE_CACHE_MAX_BYTES
+)
+from app.services.layer_store import layer_store
+from app.services.lru import LRUCache
+from app.services.spatial_index import get_layer_index, get_shapely
+
+# Bumped when tile contents change, so tiles cached on disk are rebuilt
+TILE_FORMAT_VERSION = 2
+TILE_LAYERS = ['lst', 'ndvi', 'uhi', 'utfvi', 'landuse', 'rtrw', 'jaringan_jalan', 'kemiringan_lereng', 'ndbi']
+
+tile_cache = LRUCache(max_bytes=TILE_CACHE_MAX_BYTES, name='tiles')
+
+
+def valid_tile(z, x, y):
+    return TILE_MIN_ZOOM <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_bounds(z, x, y):
+    """(min_lon, min_lat, max_lon, max_lat) of a web mercator tile"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def lonlat_to_tile(lon, lat, z):
+    """Tile column and row containing a lon/lat at zoom z"""
+    n = 2 ** z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    column = int((lon + 180.0) / 360.0 * n)
+    row = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(column, 0), n - 1), min(max(row, 0), n - 1)
+
+
+def _project(points, z, x, y):
+    """Lon/lat positions to tile coordinates in [0, TILE_EXTENT]"""
+    n = 2 ** z
+    lat = np.radians(np.clip(points[:, 1], -85.05112878, 85.05112878))
+    px = (points[:, 0] + 180.0) / 360.0 * n
+    py = (1 - np.arcsinh(np.tan(lat)) / np.pi) / 2 * n
+    return np.column_stack([(px - x) * TILE_EXTENT, (py - y) * TILE_EXTENT])
+
+
+def simplify(points, tolerance):
+    """Douglas-Peucker simplification of a polyline (closed rings stay closed)"""
+    count = len(points)
+    if count < 3 or tolerance <= 0:
+        return points
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        origin = points[start]
+        direction = points[end] - origin
+        length = math.hypot(direction[0], direction[1])
+        offsets = inner - origin
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def _quantize(points):
+    """Round to integer tile coordinates and drop repeated positions"""
+    quantized = np.rint(points).astype(np.int64)
+    if len(quantized) > 1:
+        repeated = np.all(quantized[1:] == quantized[:-1], axis=1)
+        quantized = quantized[np.concatenate([[True], ~repeated])]
+    return quantized
+
+
+def _ring_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+def _encode_line(coordinates):
+    line = _quantize(np.asarray(coordinates, dtype=np.float64)[:, :2])
+    return line.tolist() if len(line) >= 2 else None
+
+
+def _encode_polygon(rings):
+    encoded = []
+    for i, coordinates in enumerate(rings):
+        ring = _quantize(np.asarray(coordinates, dtype=np.float64)[:, :2])
+        if len(ring) < 4 or _ring_area(ring) < 1:
+            if i == 0:
+                return None  # exterior collapsed below tile resolution
+            continue
+        encoded.append(ring.tolist())
+    return encoded
+
+
+def encode_geometry(geometry):
+    """Quantize a geometry in tile coordinates, dropping parts that collapse"""
+    kind = geometry.get('type')
+    coordinates = geometry.get('coordinates')
+    if kind == 'Point':
+        return {"type": kind, "coordinates": _quantize(np.array([coordinates[:2]], dtype=np.float64))[0].tolist()}
+    if kind == 'MultiPoint':
+        return {"type": kind, "coordinates": _quantize(np.asarray(coordinates, dtype=np.float64)[:, :2]).tolist()}
+    if kind == 'LineString':
+        line = _encode_line(coordinates)
+        return {"type": kind, "coordinates": line} if line else None
+    if kind == 'MultiLineString':
+        lines = [line for line in (_encode_line(part) for part in coordinates) if line]
+        return {"type": kind, "coordinates": lines} if lines else None
+    if kind == 'Polygon':
+        polygon = _encode_polygon(coordinates)
+        return {"type": kind, "coordinates": polygon} if polygon else None
+    if kind == 'MultiPolygon':
+        polygons = [p for p in (_encode_polygon(part) for part in coordinates) if p]
+        return {"type": kind, "coordinates": polygons} if polygons else None
+    return None
+
+
+def _simplify_rings(rings, z, x, y, tolerance):
+    """Simplified rings of a polygon, or None if its exterior collapsed"""
+    simplified = []
+    for i, ring in enumerate(rings):
+        ring = simplify(_project(np.asarray(ring, dtype=np.float64)[:, :2], z, x, y), tolerance)
+        if len(ring) < 4:
+            if i == 0:
+                return None
+            continue
+        simplified.append(ring)
+    return simplified
+
+
+def simplify_geometry(geometry, z, x, y, tolerance):
+    """Project a GeoJSON geometry into tile coordinates and simplify it, or None if nothing is left"""
+    kind = geometry.get('type')
+    coordinates = geometry.get('coordinates')
+
+    def line(part):
+        return simplify(_project(np.asarray(part, dtype=np.float64)[:, :2], z, x, y), tolerance)
+
+    if kind == 'Point':
+        simplified = _project(np.array([coordinates[:2]], dtype=np.float64), z, x, y)[0]
+    elif kind == 'MultiPoint':
+        simplified = _project(np.asarray(coordinates, dtype=np.float64)[:, :2], z, x, y)
+    elif kind == 'LineString':
+        simplified = line(coordinates)
+    elif kind == 'MultiLineString':
+        simplified = [line(part) for part in coordinates]
+    elif kind == 'Polygon':
+        simplified = _simplify_rings(coordinates, z, x, y, tolerance)
+    elif kind == 'MultiPolygon':
+        simplified = [p for p in (_simplify_rings(part, z, x, y, tolerance) for part in coordinates) if p]
+    else:
+        return None
+    if simplified is None or (isinstance(simplified, list) and not simplified):
+        return None
+    return {"type": kind, "coordinates": simplified}
+
+
+def _clip(geometry, shapely, limit):
+    """Clip a tile-space geometry to [-limit, extent + limit], or None if nothing is left"""
+    kind, coordinates = geometry['type'], geometry['coordinates']
+    if kind in ('Point', 'MultiPoint'):
+        return geometry
+    # Exteriors bound their holes, so they decide whether a polygon crosses the box
+    parts = {'LineString': [coordinates], 'MultiLineString': coordinates,
+             'Polygon': coordinates[:1], 'MultiPolygon': [polygon[0] for polygon in coordinates]}[kind]
+    if all(part.min() >= -limit and part.max() <= TILE_EXTENT + limit for part in parts):
+        return geometry
+    from shapely.geometry import mapping, shape
+    try:
+        clipped = shapely.clip_by_rect(shape(geometry), -limit, -limit, TILE_EXTENT + limit, TILE_EXTENT + limit)
+    except Exception:
+        # Simplification can leave a ring self-intersecting; send it unclipped
+        return geometry
+    if clipped.is_empty:
+        return None
+    return mapping(clipped)
+
+
+def build_tile(layer_name, z, x, y):
+    """
+    Build one tile of a layer as compact GeoJSON.
+
+    Coordinates are integers in tile space (0..extent, y down, as in Mapbox
+    Vector Tiles), simplified to the zoom level's pixel tolerance. Whole
+    features are simplified first and then clipped to the tile plus a small
+    buffer (when shapely is available), so a feature simplifies the same way
+    in every tile it crosses and no clip edge is simplified away. Returns
+    None if the layer does not exist.
+    """
+    index = get_layer_index(layer_name)
+    if index is None:
+        return None
+
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    pad_lon = (max_lon - min_lon) * TILE_BUFFER / TILE_EXTENT
+    pad_lat = (max_lat - min_lat) * TILE_BUFFER / TILE_EXTENT
+    features = index.features_in_bbox(min_lon - pad_lon, min_lat - pad_lat, max_lon + pad_lon, max_lat + pad_lat)
+    shapely = get_shapely()
+
+    tolerance = TILE_SIMPLIFY_PIXELS * TILE_EXTENT / 256
+    encoded = []
+    for feature in features:
+        geometry = feature.get('geometry')
+        if not geometry:
+            continue
+        tile_geometry = simplify_geometry(geometry, z, x, y, tolerance)
+        if tile_geometry is not None and shapely is not None:
+            tile_geometry = _clip(tile_geometry, shapely, TILE_BUFFER)
+        if tile_geometry is not None:
+            tile_geometry = encode_geometry(tile_geometry)
+        if tile_geometry is not None:
+            encoded.append({
+                "type": "Feature",
+                "properties": feature.get('properties') or {},
+                "geometry": tile_geometry
+            })
+
+    return {
+        "type": "FeatureCollection",
+        "layer": layer_name,
+        "z": z,
+        "x": x,
+        "y": y,
+        "extent": TILE_EXTENT,
+        "features": encoded
+    }
+
+
+def _tile_path(layer_name, version, z, x, y):
+    version_token = f'{version[0]}-{version[1]}-v{TILE_FORMAT_VERSION}'
+    return os.path.join(TILES_DIR, layer_name, version_token, str(z), str(x), f'{y}.json.gz')
+
+
+def get_tile(layer_name, z, x, y):
+    """
+    Return a tile as gzipped JSON bytes, or None if the layer does not exist.
+
+    Lookups go through the in-memory LRU, then the on-disk tile cache, and
+    only build the tile when neither has it. Both caches are keyed on the
+    layer file version, so refreshed layers never serve stale tiles.
+    """
+    version = layer_store.version(layer_name)
+    if version is None:
+        return None
+
+    key = (layer_name, version, z, x, y)
+    data = tile_cache.get(key)
+    if data is not None:
+        return data
+
+    path = _tile_path(layer_name, version, z, x, y)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+    else:
+        tile = build_tile(layer_name, z, x, y)
+        if tile is None:
+            return None
+        data = gzip.compress(json.dumps(tile, separators=(',', ':')).encode('utf-8'), compresslevel=6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp{os.getpid()}'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    tile_cache.put(key, data, len(data))
+    return data
+
+
+def tile_range(layer_name, z):
+    """Columns and rows of the tiles covering a layer at zoom z, or None"""
+    index = get_layer_index(layer_name)
+    if index is None or not len(index.bounds) or np.isnan(index.bounds).all():
+        return None
+    min_lon, min_lat = np.nanmin(index.bounds[:, 0]), np.nanmin(index.bounds[:, 1])
+    max_lon, max_lat = np.nanmax(index.bounds[:, 2]), np.nanmax(index.bounds[:, 3])
+    min_x, min_y = lonlat_to_tile(min_lon, max_lat, z)
+    max_x, max_y = lonlat_to_tile(max_lon, min_lat, z)
+    return range(min_x, max_x + 1), range(min_y, max_y + 1)
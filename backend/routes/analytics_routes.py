@@ -7,6 +7,7 @@ import os
 import pandas as pd
 from datetime import datetime
 import numpy as np
+from app.services.metrics import metrics
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -14,7 +15,8 @@ analytics_bp = Blueprint('analytics', __name__)
 def get_property_data():
     try:
         csv_path = os.path.join(os.path.dirname(__file__), '../data/properti_bandung_rumah.csv')
-        df = pd.read_csv(csv_path)
+        with metrics.timer('csv_load'):
+            df = pd.read_csv(csv_path)
         return df
     except Exception as e:
         import traceback
@@ -22,6 +24,7 @@ def get_property_data():
         return pd.DataFrame()  # Return empty dataframe if file not found
 
 # Process data for the analytics dashboard
+@metrics.timed('process_property_data')
 def process_property_data(df):
     # Convert price to numeric, handling errors
     df['HARGA PROPERTI NET (RP)'] = pd.to_numeric(df['HARGA PROPERTI NET (RP)'], errors='coerce')
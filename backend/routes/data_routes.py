@@ -1,8 +1,13 @@
 # backend/routes/data_routes.py
-from flask import Blueprint, jsonify, request
-import os
-import json
-from math import ceil
+from flask import Blueprint, Response, jsonify, request
+import gzip
+from app.config import GEOJSON_MAX_PAGE_SIZE, LAYER_PAGE_SIZES, TILE_MIN_ZOOM, TILE_MAX_ZOOM
+from app.services.cursors import CursorError, decode_cursor
+from app.services.layer_store import layer_store, VALID_LAYERS
+from app.services.layer_pages import get_page_set, page_document
+from app.services.spatial_index import get_layer_index, parse_bbox
+from app.services.topology import get_layer_topology
+from app.services.vector_tiles import TILE_LAYERS, get_tile, tile_cache, valid_tile
 
 data_bp = Blueprint('data', __name__)
 
@@ -10,42 +15,134 @@ data_bp = Blueprint('data', __name__)
 def get_paginated_geojson(layer_name):
     """Get paginated GeoJSON data"""
     try:
-        valid_layers = ['lst', 'ndvi', 'uhi', 'utfvi', 'landuse', 'jaringan_jalan', 'kemiringan_lereng', 'ndbi', 'rtrw']
-        if layer_name not in valid_layers:
+        if layer_name not in VALID_LAYERS:
             return jsonify({"error": "Invalid layer"}), 400
 
-        # Get pagination params
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 1000))
-        
-        geojson_path = os.path.join(
-            os.path.dirname(__file__), 
-            f'../data/geojson/{layer_name}.geojson'
-        )
+        # Whole layer as quantized TopoJSON with shared edges stored once
+        if request.args.get('format') == 'topojson':
+            return get_topojson(layer_name)
 
-        if not os.path.exists(geojson_path):
-            return jsonify({"error": "Data not found"}), 404
+        # Viewport queries return only the features intersecting the bbox
+        if 'bbox' in request.args:
+            return get_geojson_in_bbox(layer_name)
+
+        # Get pagination params; a cursor from a previous page pins both the
+        # position and the layer version the crawl started on
+        version = layer_store.version(layer_name)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                offset, per_page = decode_cursor(cursor, layer_name, version)
+            except CursorError as e:
+                return jsonify({"error": str(e)}), e.status
+            page = offset // per_page + 1
+        else:
+            page = int(request.args.get('page', 1))
+            per_page = int(request.args.get('per_page', 1000))
+        if per_page < 1:
+            return jsonify({"error": "per_page must be positive"}), 400
+        per_page = min(per_page, GEOJSON_MAX_PAGE_SIZE)
 
-        with open(geojson_path, 'r') as f:
-            full_data = json.load(f)
-        
-        features = full_data.get('features', [])
-        total_features = len(features)
-        total_pages = ceil(total_features / per_page)
+        # Common page sizes are served as pre-serialized chunks, no JSON work,
+        # once the background builder has written them
+        if per_page in LAYER_PAGE_SIZES:
+            page_set = get_page_set(layer_name, per_page)
+            if page_set is not None:
+                if 1 <= page <= page_set.total_pages:
+                    return stream_page(page_set, page)
+                return jsonify(page_document(
+                    layer_name, page_set.source_version, page, per_page, page_set.total_features, []
+                ))
+
+        # Parsed once per file version and shared with the other blueprints
+        layer = layer_store.get(layer_name)
+        if layer is None:
+            return jsonify({"error": "Data not found"}), 404
 
         # Paginate features
         start = (page - 1) * per_page
         end = start + per_page
-        paginated_features = features[start:end]
+        paginated_features = layer.features(start, end) if page >= 1 else []
+
+        return jsonify(page_document(layer_name, version, page, per_page, len(layer), paginated_features))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def get_topojson(layer_name):
+    """Get a whole layer as precomputed TopoJSON"""
+    topology = get_layer_topology(layer_name)
+    if topology is None:
+        return jsonify({"error": "Data not found"}), 404
+
+    compressed = 'gzip' in request.accept_encodings
+    response = Response(topology.gzip_data if compressed else topology.data, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compressed:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def get_geojson_in_bbox(layer_name):
+    """Get the features of a layer that intersect ?bbox=minx,miny,maxx,maxy"""
+    try:
+        minx, miny, maxx, maxy = parse_bbox(request.args['bbox'])
+    except ValueError as e:
+        return jsonify({"error": f"Invalid bbox: {str(e)}"}), 400
+    clip = request.args.get('clip', 'false').lower() in ('1', 'true', 'yes')
+
+    index = get_layer_index(layer_name)
+    if index is None:
+        return jsonify({"error": "Data not found"}), 404
+
+    features = index.features_in_bbox(minx, miny, maxx, maxy, clip=clip)
+    return jsonify({
+        "bbox": [minx, miny, maxx, maxy],
+        "clipped": clip and index.can_clip,
+        "total_features": len(features),
+        "features": features,
+        "type": "FeatureCollection"
+    })
+
+def stream_page(page_set, page):
+    """Stream a pre-serialized page, gzipped if the client accepts it"""
+    compressed = 'gzip' in request.accept_encodings
+    start, end = page_set.page_range(page, compressed)
+    response = Response(page_set.iter_page(page, compressed), mimetype='application/json')
+    response.headers['Content-Length'] = str(end - start)
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compressed:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@data_bp.route('/api/data/tiles/<string:layer_name>/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_layer_tile(layer_name, z, x, y):
+    """Get a simplified, quantized GeoJSON tile of a layer"""
+    try:
+        if layer_name not in TILE_LAYERS:
+            return jsonify({"error": "Invalid layer"}), 400
+        if not valid_tile(z, x, y):
+            return jsonify({"error": f"Invalid tile coordinates (zoom must be {TILE_MIN_ZOOM}-{TILE_MAX_ZOOM})"}), 400
 
-        return jsonify({
-            "page": page,
-            "per_page": per_page,
-            "total_features": total_features,
-            "total_pages": total_pages,
-            "features": paginated_features,
-            "type": "FeatureCollection"
-        })
+        data = get_tile(layer_name, z, x, y)
+        if data is None:
+            return jsonify({"error": "Data not found"}), 404
+
+        compressed = 'gzip' in request.accept_encodings
+        response = Response(data if compressed else gzip.decompress(data), mimetype='application/json')
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'public, max-age=300'
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@data_bp.route('/api/data/layers/stats', methods=['GET'])
+def get_layer_cache_stats():
+    """Get hit/miss and memory statistics of the shared GeoJSON layer cache"""
+    return jsonify({
+        "status": "success",
+        "data": layer_store.stats(),
+        "tiles": tile_cache.stats()
+    })
@@ -0,0 +1,51 @@
+from flask import Blueprint, Response, jsonify, request
+from app.config import DEBUG_PROFILE_MAX_SECONDS
+from app.services.profiler import MIN_INTERVAL, ProfilerBusy, stack_sampler
+from utils.auth import require_admin
+
+debug_bp = Blueprint('debug', __name__)
+
+@debug_bp.route('/api/debug/profile', methods=['GET'])
+@require_admin
+def get_profile():
+    """Sample the stacks of all threads for ?seconds=N and return them collapsed"""
+    try:
+        seconds = float(request.args.get('seconds', '5'))
+        interval_ms = float(request.args.get('interval_ms', '0'))
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "seconds and interval_ms must be numbers"
+        }), 400
+    if not 0 < seconds <= DEBUG_PROFILE_MAX_SECONDS:
+        return jsonify({
+            "status": "error",
+            "message": f"seconds must be between 0 and {DEBUG_PROFILE_MAX_SECONDS:g}"
+        }), 400
+    if interval_ms and not MIN_INTERVAL * 1000 <= interval_ms <= 1000:
+        return jsonify({
+            "status": "error",
+            "message": f"interval_ms must be between {MIN_INTERVAL * 1000:g} and 1000"
+        }), 400
+
+    try:
+        stacks, samples = stack_sampler.sample(seconds, interval_ms / 1000.0 or None)
+    except ProfilerBusy as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), e.status
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "status": "success",
+            "data": {
+                "seconds": seconds,
+                "samples": samples,
+                "stacks": [{"stack": stack.split(';'), "count": count}
+                           for stack, count in sorted(stacks.items(), key=lambda item: -item[1])]
+            }
+        })
+    # Collapsed stacks, ready for flamegraph.pl or speedscope
+    return Response(stack_sampler.collapsed(stacks), mimetype='text/plain',
+                    headers={'X-Profile-Samples': str(samples)})
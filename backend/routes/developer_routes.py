@@ -1,17 +1,35 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+import base64
+import csv
+import hashlib
+import io
+import itertools
 import json
-import os
 import pandas as pd
 import numpy as np
 import math
-import random
 import traceback
-from joblib import load
+from app.config import (
+    CLIMATE_LOOKUP_METHOD, CLIMATE_BATCH_MAX_POINTS, CLIMATE_BATCH_CHUNK_SIZE, PRICE_BATCH_MAX_ROWS,
+    PRICE_MICROBATCH_SIZE, PRICE_MICROBATCH_WAIT_MS, PRICE_SWEEP_MAX_STEPS, PRICE_HEATMAP_MAX_CELLS,
+    PRICE_HEATMAP_DEFAULT_RESOLUTION, INFERENCE_TIMEOUT
+)
+from app.services.climate_cache import climate_score_cache
+from app.services.feature_encoder import (
+    CLIMATE_FEATURES, create_price_frame, encoder_for, preprocess_price_frame, preprocess_record
+)
+from app.services.gridcode_index import get_gridcode_index
+from app.services.gridcode_raster import CLIMATE_LAYERS, get_gridcode_raster
+from app.services.inference_pool import InferenceUnavailable, inference_pool
+from app.services.layer_store import layer_store
+from app.services.metrics import metrics
+from app.services.micro_batcher import MicroBatcher
+from app.services.model_registry import model_registry, resolve_model_path
+from app.services.prediction_cache import prediction_cache
+from app.services.price_heatmap import price_heatmap_cache
+from utils.auth import require_admin
 developer_bp = Blueprint('developer', __name__)
 
-# Cache for GeoJSON data to avoid repeated file reads
-geojson_cache = {}
-
 @developer_bp.route('/api/climate/scores', methods=['GET'])
 def get_climate_scores():
     """Get climate scores for a specific location"""
@@ -28,21 +46,15 @@ def get_climate_scores():
             }), 400
             
         # Calculate climate scores based on GeoJSON data or generate them
-        try:
-            # Try to calculate based on GeoJSON data first
-            scores = calculate_climate_scores(lat, lng)
-            print(f"Calculated climate scores: {scores}")
-        except Exception as e:
-            # If calculation fails, fall back to generated scores
-            print(f"Error calculating climate scores from GeoJSON: {str(e)}")
-            print("Falling back to generated scores")
-            scores = generate_climate_scores(lat, lng)
+        scores = inference_pool.run(climate_scores_for, lat, lng)
         
         return jsonify({
             "status": "success",
             "data": scores
         })
         
+    except InferenceUnavailable as e:
+        return inference_unavailable(e)
     except Exception as e:
         traceback.print_exc()
         return jsonify({
@@ -50,83 +62,173 @@ def get_climate_scores():
             "message": f"Failed to get climate scores: {str(e)}"
         }), 500
 
+@developer_bp.route('/api/climate/scores/cache', methods=['GET'])
+def get_climate_score_cache_stats():
+    """Get hit/miss statistics of the climate score cache"""
+    return jsonify({
+        "status": "success",
+        "data": climate_score_cache.stats()
+    })
+
+SCORE_KEYS = ['lst_score', 'ndvi_score', 'utfvi_score', 'uhi_score', 'overall_score']
+
+@developer_bp.route('/api/climate/scores/batch', methods=['POST'])
+def get_climate_scores_batch():
+    """Get climate scores for many locations (JSON array or CSV upload), in input order"""
+    try:
+        try:
+            lats, lngs = parse_coordinate_batch()
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        if len(lats) > CLIMATE_BATCH_MAX_POINTS:
+            return jsonify({
+                "status": "error",
+                "message": f"Too many coordinates: at most {CLIMATE_BATCH_MAX_POINTS} per request"
+            }), 413
+
+        output_csv = request.args.get('format') == 'csv'
+        with np.errstate(invalid='ignore'):
+            valid = (np.abs(lats) <= 90) & (np.abs(lngs) <= 180)
+
+        def score_chunk(start):
+            stop = min(start + CLIMATE_BATCH_CHUNK_SIZE, len(lats))
+            return inference_pool.run(score_batch_rows, lats[start:stop], lngs[start:stop], valid[start:stop])
+
+        # The first chunk is scored before the response starts, so a full
+        # or slow pool still answers 503/504
+        first_rows = score_chunk(0)
+
+        # The rest are scored chunk by chunk on the pool while the response
+        # streams, so large batches never hold all their rows in memory
+        def generate():
+            if output_csv:
+                yield ','.join(['lat', 'lng'] + SCORE_KEYS + ['error']) + '\n'
+            else:
+                yield f'{{"status":"success","count":{len(lats)},"data":['
+            for start in range(0, len(lats), CLIMATE_BATCH_CHUNK_SIZE):
+                try:
+                    rows = first_rows if start == 0 else score_chunk(start)
+                except InferenceUnavailable as e:
+                    # Too late for a status code: end the stream with the error
+                    if output_csv:
+                        yield ',' * (len(SCORE_KEYS) + 1) + f'{str(e)} (rows from {start} not scored)\n'
+                    else:
+                        yield f'],"error":{json.dumps(str(e))},"scored":{start}}}'
+                    return
+                if output_csv:
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer, lineterminator='\n')
+                    for row in rows:
+                        writer.writerow([row['lat'], row['lng']] + [row.get(key) for key in SCORE_KEYS] + [row.get('error')])
+                    yield buffer.getvalue()
+                else:
+                    yield (',' if start else '') + json.dumps(rows, separators=(',', ':'))[1:-1]
+            if not output_csv:
+                yield ']}'
+
+        return Response(generate(), mimetype='text/csv' if output_csv else 'application/json')
+
+    except InferenceUnavailable as e:
+        return inference_unavailable(e)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to get climate scores: {str(e)}"
+        }), 500
+
+def parse_coordinate_batch():
+    """Read batch coordinates as two float arrays, NaN where a value is not a number"""
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        df = pd.read_csv(upload if upload is not None else io.BytesIO(request.get_data()))
+        columns = {str(column).strip().lower(): column for column in df.columns}
+        lat_column = next((columns[name] for name in ('lat', 'latitude') if name in columns), None)
+        lng_column = next((columns[name] for name in ('lng', 'lon', 'long', 'longitude') if name in columns), None)
+        if lat_column is None or lng_column is None:
+            raise ValueError("CSV must have lat/latitude and lng/longitude columns")
+        return (pd.to_numeric(df[lat_column], errors='coerce').to_numpy(dtype=np.float64),
+                pd.to_numeric(df[lng_column], errors='coerce').to_numpy(dtype=np.float64))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('points', data.get('locations'))
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of coordinates or a CSV file upload")
+
+    lats = np.full(len(data), np.nan)
+    lngs = np.full(len(data), np.nan)
+    for i, item in enumerate(data):
+        try:
+            if isinstance(item, dict):
+                lat = item.get('lat', item.get('latitude'))
+                lng = item.get('lng', item.get('longitude'))
+            else:
+                lat, lng = item
+            lats[i], lngs[i] = float(lat), float(lng)
+        except (TypeError, ValueError):
+            continue  # left as NaN and reported as invalid
+    return lats, lngs
+
+def score_batch_rows(lats, lngs, valid):
+    """Climate score rows for a chunk of coordinates, in input order"""
+    scores = calculate_climate_scores_batch(lats[valid], lngs[valid])
+    scored = {key: iter(values.tolist()) for key, values in scores.items()}
+    rows = []
+    for lat, lng, ok in zip(lats.tolist(), lngs.tolist(), valid.tolist()):
+        row = {
+            "lat": lat if math.isfinite(lat) else None,
+            "lng": lng if math.isfinite(lng) else None
+        }
+        if ok:
+            for key in SCORE_KEYS:
+                row[key] = next(scored[key])
+        else:
+            row["error"] = "Invalid coordinates"
+        rows.append(row)
+    return rows
+
 @developer_bp.route('/api/developer/predict-price', methods=['POST'])
 def predict_property_price():
     """Predict property price based on location, climate data, and property details"""
     try:
-        # Parse JSON data from request
-        data = request.json
-        
-        # Validate required fields
-        required_fields = ['location', 'bedrooms', 'landArea', 'certificate', 'propertyType', 'landPricePerMeter']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    "status": "error",
-                    "message": f"Missing required field: {field}"
-                }), 400
-        
-        # Extract location data
-        location = data['location']
-        if 'latitude' not in location or 'longitude' not in location:
+        # Validate and extract the property details
+        try:
+            spec = parse_price_spec(request.json)
+        except ValueError as e:
             return jsonify({
                 "status": "error",
-                "message": "Location must include latitude and longitude"
+                "message": str(e)
             }), 400
-            
-        # Extract property details
-        bedrooms = float(data['bedrooms'])
-        land_area = float(data['landArea'])
-        certificate = data['certificate']
-        property_type = data['propertyType']
-        land_price_per_meter = float(data['landPricePerMeter'])
-        city = data['city']
-        district  = data['district']
-        # Get climate scores, either from request or calculate them
-        climate_scores = data.get('climateScores')
+
+        # Get climate scores, either from request or calculate them (on the inference pool)
+        climate_scores = spec['climate_scores']
         if not climate_scores:
-            try:
-                # Try to calculate based on GeoJSON data first
-                climate_scores = calculate_climate_scores(
-                    location['latitude'], 
-                    location['longitude']
-                )
-            except Exception as e:
-                # If calculation fails, fall back to generated scores
-                print(f"Error calculating climate scores from GeoJSON: {str(e)}")
-                print("Falling back to generated scores")
-                climate_scores = generate_climate_scores(
-                    location['latitude'], 
-                    location['longitude']
-                )
+            climate_scores = inference_pool.run(climate_scores_for, spec['latitude'], spec['longitude'])
         
-        # Calculate property price based on all factors
-        predicted_price= calculate_property_price(
-            property_type=property_type,
-            bedrooms=bedrooms,
-            certificate=certificate,
-            land_price=land_price_per_meter,
-            land_area=land_area,
-            city=city,
-            district=district,
-            climate_scores=climate_scores
-        )
+        # Calculate property price based on all factors (batched onto the inference pool)
+        predicted_price = calculate_property_price(**price_arguments(spec, climate_scores))
         
         return jsonify({
             "status": "success",
             "predicted_price": predicted_price,
             "factors": {
                 "predictedPrice" : predicted_price,
-                "propertyType": property_type,
-                "bedrooms": bedrooms,
-                "land_area": land_area,
-                "certificate": certificate,
-                "landPricePerMeter": land_price_per_meter,
+                "propertyType": spec['property_type'],
+                "bedrooms": spec['bedrooms'],
+                "land_area": spec['land_area'],
+                "certificate": spec['certificate'],
+                "landPricePerMeter": spec['land_price'],
                 "climateScores": climate_scores,
                 
             }
         })
         
+    except InferenceUnavailable as e:
+        return inference_unavailable(e)
     except Exception as e:
         traceback.print_exc()
         return jsonify({
@@ -134,74 +236,474 @@ def predict_property_price():
             "message": f"Failed to predict price: {str(e)}"
         }), 500
 
+@developer_bp.route('/api/developer/predict-price/batch', methods=['POST'])
+def predict_property_price_batch():
+    """Predict prices for many properties with one model call, reporting invalid rows individually"""
+    try:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('properties')
+        if not isinstance(data, list):
+            return jsonify({
+                "status": "error",
+                "message": "Expected a JSON array of property specs"
+            }), 400
+        if len(data) > PRICE_BATCH_MAX_ROWS:
+            return jsonify({
+                "status": "error",
+                "message": f"Too many properties: at most {PRICE_BATCH_MAX_ROWS} per request"
+            }), 413
+
+        results = [None] * len(data)
+        specs = []
+        positions = []
+        for i, item in enumerate(data):
+            try:
+                specs.append(parse_price_spec(item))
+                positions.append(i)
+            except ValueError as e:
+                results[i] = {"index": i, "status": "error", "message": str(e)}
+
+        prices = inference_pool.run(predict_prices_for_specs, specs)
+        for spec, i, price in zip(specs, positions, prices):
+            results[i] = {
+                "index": i,
+                "status": "success",
+                "predicted_price": price,
+                "climateScores": spec['climate_scores']
+            }
+
+        return jsonify({
+            "status": "success",
+            "count": len(data),
+            "predicted": len(specs),
+            "errors": len(data) - len(specs),
+            "results": results
+        })
+
+    except InferenceUnavailable as e:
+        return inference_unavailable(e)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to predict prices: {str(e)}"
+        }), 500
+
+@developer_bp.route('/api/developer/price-sensitivity', methods=['POST'])
+def get_price_sensitivity():
+    """Predicted price over a sweep of one or two parameters of a base property, in one model call"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                "status": "error",
+                "message": "Expected a JSON object with a property spec and a sweep"
+            }), 400
+        try:
+            spec = parse_price_spec(data.get('property', data))
+            axes = parse_sweep(data.get('sweep'))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        cells = int(np.prod([len(values) for _, values in axes]))
+        if cells > PRICE_BATCH_MAX_ROWS:
+            return jsonify({
+                "status": "error",
+                "message": f"Sweep too large: {cells} points, at most {PRICE_BATCH_MAX_ROWS}"
+            }), 413
+
+        if not spec['climate_scores']:
+            spec['climate_scores'] = inference_pool.run(climate_scores_for, spec['latitude'], spec['longitude'])
+        base = price_arguments(spec)
+
+        # The base property first, then the grid in row-major order
+        records = [base] + [sweep_record(base, zip(axes, point))
+                            for point in itertools.product(*[values for _, values in axes])]
+        prices = inference_pool.run(predict_property_prices, records, False)
+        grid = np.array(prices[1:]).reshape([len(values) for _, values in axes])
+
+        return jsonify({
+            "status": "success",
+            "base_price": prices[0],
+            "climateScores": spec['climate_scores'],
+            "axes": [{"parameter": name, "values": values} for name, values in axes],
+            "predicted_prices": grid.tolist()
+        })
+
+    except InferenceUnavailable as e:
+        return inference_unavailable(e)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to compute price sensitivity: {str(e)}"
+        }), 500
+
+@developer_bp.route('/api/developer/price-heatmap', methods=['POST'])
+def get_price_heatmap():
+    """Predicted price of a property spec at every cell of a bbox grid, as a compact float32 raster"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                "status": "error",
+                "message": "Expected a JSON object with a property spec, a bbox and a resolution"
+            }), 400
+        try:
+            bbox, resolution = parse_heatmap_grid(data)
+            spec = dict(data.get('property') or {})
+            # The location is the grid; any value passes validation
+            spec['location'] = {"latitude": bbox[1], "longitude": bbox[0]}
+            arguments = price_arguments(parse_price_spec(spec))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        _, _, height, width = price_heatmap_cache.grid_window(bbox, resolution)
+        if height * width > PRICE_HEATMAP_MAX_CELLS:
+            return jsonify({
+                "status": "error",
+                "message": f"Grid too large: {height * width} cells, at most {PRICE_HEATMAP_MAX_CELLS}; "
+                           f"use a coarser resolution or a smaller bbox"
+            }), 413
+
+        arguments['climate_scores'] = None
+        loaded_model = model_registry.current()
+        model_version = loaded_model.version if loaded_model is not None else 'fallback'
+        spec_hash = hashlib.sha256(json.dumps(arguments, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        layer_versions = tuple(tuple(layer_store.version(layer) or ()) for layer in CLIMATE_LAYERS)
+
+        raster, transform, blocks = inference_pool.run(
+            price_heatmap_cache.render,
+            (spec_hash, model_version, layer_versions),
+            bbox,
+            resolution,
+            lambda lats, lngs: predict_prices_at(arguments, lats, lngs),
+            PRICE_HEATMAP_MAX_CELLS
+        )
+
+        return jsonify({
+            "status": "success",
+            "width": raster.shape[1],
+            "height": raster.shape[0],
+            # Cell (row, col) has its top-left corner at (x0 + col * dx, y0 - row * dy)
+            "transform": list(transform),
+            "dtype": "float32",
+            "encoding": "base64",
+            "data": base64.b64encode(raster.astype('<f4').tobytes()).decode('ascii'),
+            "min": float(raster.min()),
+            "max": float(raster.max()),
+            "spec_hash": spec_hash,
+            "model_version": model_version,
+            "blocks": blocks
+        })
+
+    except InferenceUnavailable as e:
+        return inference_unavailable(e)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to compute price heatmap: {str(e)}"
+        }), 500
+
+PRICE_REQUIRED_FIELDS = ['location', 'bedrooms', 'landArea', 'certificate', 'propertyType', 'landPricePerMeter',
+                         'city', 'district']
+# Fields that must be non-empty strings
+PRICE_TEXT_FIELDS = ['propertyType', 'certificate', 'city', 'district']
+PRICE_ARGUMENTS = ['property_type', 'bedrooms', 'certificate', 'land_price', 'land_area', 'city', 'district',
+                   'climate_scores']
+
+def parse_price_spec(data):
+    """Validate one predict-price request body; raises ValueError with a client-facing message"""
+    if not isinstance(data, dict):
+        raise ValueError("Property spec must be a JSON object")
+    for field in PRICE_REQUIRED_FIELDS:
+        if field not in data:
+            raise ValueError(f"Missing required field: {field}")
+
+    location = data['location']
+    if not isinstance(location, dict) or 'latitude' not in location or 'longitude' not in location:
+        raise ValueError("Location must include latitude and longitude")
+
+    for field in PRICE_TEXT_FIELDS:
+        if not isinstance(data[field], str) or not data[field].strip():
+            raise ValueError(f"{field} must be a non-empty string")
+
+    climate_scores = data.get('climateScores')
+    if climate_scores:
+        try:
+            for key in SCORE_KEYS:
+                float(climate_scores[key])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"climateScores must include numeric {', '.join(SCORE_KEYS)}")
+
+    try:
+        return {
+            "property_type": data['propertyType'],
+            "bedrooms": float(data['bedrooms']),
+            "certificate": data['certificate'],
+            "land_price": float(data['landPricePerMeter']),
+            "land_area": float(data['landArea']),
+            "city": data['city'],
+            "district": data['district'],
+            "climate_scores": climate_scores or None,
+            "latitude": float(location['latitude']),
+            "longitude": float(location['longitude'])
+        }
+    except (TypeError, ValueError):
+        raise ValueError("bedrooms, landArea, landPricePerMeter, latitude and longitude must be numbers")
+
+def climate_scores_for(lat, lng):
+    """Climate scores of a point from the GeoJSON layers, or generated ones if that fails"""
+    try:
+        # Try to calculate based on GeoJSON data first (memoized per grid cell)
+        return climate_score_cache.get(lat, lng, calculate_climate_scores)
+    except Exception as e:
+        # If calculation fails, fall back to generated scores
+        print(f"Error calculating climate scores from GeoJSON: {str(e)}")
+        print("Falling back to generated scores")
+        return generate_climate_scores(lat, lng)
+
+def predict_prices_for_specs(specs):
+    """Predicted prices of many parsed specs, filling in their missing climate scores"""
+    # Climate scores in bulk for rows that did not send them
+    unscored = [k for k, spec in enumerate(specs) if not spec['climate_scores']]
+    if unscored:
+        lats = np.array([specs[k]['latitude'] for k in unscored])
+        lngs = np.array([specs[k]['longitude'] for k in unscored])
+        try:
+            scores = calculate_climate_scores_batch(lats, lngs)
+        except Exception as e:
+            print(f"Error calculating climate scores from GeoJSON: {str(e)}")
+            print("Falling back to generated scores")
+            scores = generate_climate_scores_batch(lats, lngs)
+        for j, k in enumerate(unscored):
+            specs[k]['climate_scores'] = {key: int(scores[key][j]) for key in SCORE_KEYS}
+    return predict_property_prices([price_arguments(spec) for spec in specs])
+
+def inference_unavailable(e):
+    """503 (pool full, with Retry-After) or 504 (timed out) response"""
+    response = jsonify({
+        "status": "error",
+        "message": str(e)
+    })
+    response.status_code = e.status
+    if e.status == 503:
+        response.headers['Retry-After'] = '1'
+    return response
+
+def price_arguments(spec, climate_scores=None):
+    """Keyword arguments of calculate_property_price for a parsed spec"""
+    arguments = {key: spec[key] for key in PRICE_ARGUMENTS}
+    if climate_scores is not None:
+        arguments['climate_scores'] = climate_scores
+    return arguments
+
+# Request fields a sensitivity sweep can vary, as calculate_property_price
+# arguments (climate scores vary one key of climate_scores)
+SWEEP_PARAMETERS = {
+    'landArea': 'land_area',
+    'bedrooms': 'bedrooms',
+    'landPricePerMeter': 'land_price'
+}
+SWEEP_PARAMETERS.update({key: key for key in SCORE_KEYS})
+
+def parse_sweep(sweep):
+    """
+    Sweep axes as (parameter, values) pairs; raises ValueError.
+
+    Each axis is {"parameter", "values": [...]} or {"parameter", "min",
+    "max", "steps"} for evenly spaced values (bedrooms are rounded to whole
+    rooms).
+    """
+    if isinstance(sweep, dict):
+        sweep = [sweep]
+    if not isinstance(sweep, list) or not 1 <= len(sweep) <= 2:
+        raise ValueError("sweep must list one or two parameters")
+    axes = []
+    for axis in sweep:
+        name = axis.get('parameter') if isinstance(axis, dict) else None
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Sweep parameter must be one of: {', '.join(SWEEP_PARAMETERS)}")
+        if any(name == other for other, _ in axes):
+            raise ValueError(f"Parameter {name} is swept twice")
+        try:
+            if 'values' in axis:
+                values = [float(value) for value in axis['values']]
+            else:
+                steps = int(axis.get('steps', 20))
+                if steps < 1:
+                    raise ValueError
+                values = np.linspace(float(axis['min']), float(axis['max']), steps).tolist()
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Sweep of {name} needs numeric values, or min, max and a positive steps")
+        if name == 'bedrooms':
+            values = sorted(set(float(round(value)) for value in values))
+        if not values or len(values) > PRICE_SWEEP_MAX_STEPS:
+            raise ValueError(f"Sweep of {name} needs 1 to {PRICE_SWEEP_MAX_STEPS} values")
+        axes.append((name, values))
+    return axes
+
+def sweep_record(base, assignments):
+    """calculate_property_price arguments of base with the swept parameters replaced"""
+    record = dict(base)
+    for (name, _), value in assignments:
+        argument = SWEEP_PARAMETERS[name]
+        if argument in SCORE_KEYS:
+            record['climate_scores'] = dict(record['climate_scores'], **{argument: value})
+        else:
+            record[argument] = value
+    return record
+
+def parse_heatmap_grid(data):
+    """bbox [min_lng, min_lat, max_lng, max_lat] and resolution (degrees) of a heatmap request"""
+    try:
+        bbox = [float(value) for value in data['bbox']]
+        resolution = float(data.get('resolution', PRICE_HEATMAP_DEFAULT_RESOLUTION))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("bbox must be [min_lng, min_lat, max_lng, max_lat] and resolution a number")
+    if len(bbox) != 4 or not all(math.isfinite(value) for value in bbox):
+        raise ValueError("bbox must be [min_lng, min_lat, max_lng, max_lat]")
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError("bbox must be [min_lng, min_lat, max_lng, max_lat] within valid coordinates")
+    if not math.isfinite(resolution) or resolution <= 0:
+        raise ValueError("resolution must be a positive number of degrees")
+    return bbox, resolution
+
+def predict_prices_at(arguments, lats, lngs):
+    """Predicted price of one property spec at many locations, scoring their climate in bulk"""
+    try:
+        scores = calculate_climate_scores_batch(lats, lngs)
+    except Exception as e:
+        print(f"Error calculating climate scores from GeoJSON: {str(e)}")
+        print("Falling back to generated scores")
+        scores = generate_climate_scores_batch(lats, lngs)
+
+    # Only the climate columns vary, so the feature matrix is one encoded
+    # row repeated with those columns filled in from the score arrays
+    loaded_model = model_registry.current()
+    if loaded_model is None:
+        model_registry.record_fallback('model_unavailable', len(lats))
+        arguments = {name: value for name, value in arguments.items() if name != 'climate_scores'}
+        return calculate_property_price_fallback_batch(climate_scores=scores, **arguments).tolist()
+    encoder = encoder_for(loaded_model)
+    if encoder is not None:
+        try:
+            row = preprocess_record(dict(arguments, climate_scores={key: 0 for key in SCORE_KEYS}))
+            matrix = encoder.encode_repeated(row, len(lats), {
+                CLIMATE_FEATURES[key]: scores[key] for key in SCORE_KEYS
+            })
+            with metrics.timer('model_predict'):
+                return [float(price) for price in encoder.estimator.predict(matrix)]
+        except Exception as e:
+            print(f"Error predicting a price grid with the feature encoder: {str(e)}")
+
+    columns = [scores[key].tolist() for key in SCORE_KEYS]
+    records = [dict(arguments, climate_scores=dict(zip(SCORE_KEYS, values))) for values in zip(*columns)]
+    return predict_property_prices(records, cache=False)
+
+@developer_bp.route('/api/developer/model', methods=['GET'])
+def get_model_info():
+    """Get the loaded price model version, fallback counters and batching, pool and heatmap cache metrics"""
+    stats = model_registry.stats()
+    stats['batching'] = price_batcher.stats()
+    stats['inference'] = inference_pool.stats()
+    stats['heatmap_cache'] = price_heatmap_cache.stats()
+    return jsonify({
+        "status": "success",
+        "data": stats
+    })
+
+@developer_bp.route('/api/developer/predict-price/cache', methods=['GET'])
+def get_prediction_cache_stats():
+    """Get hit/miss statistics of the prediction cache"""
+    return jsonify({
+        "status": "success",
+        "data": prediction_cache.stats()
+    })
+
+@developer_bp.route('/api/developer/model/reload', methods=['POST'])
+@require_admin
+def reload_model():
+    """Load a model file from MODEL_DIR (the configured path by default) and swap it in"""
+    data = request.get_json(silent=True) or {}
+    try:
+        path = resolve_model_path(str(data['path'])) if data.get('path') else None
+        loaded_model = model_registry.load(path)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Failed to load model: {str(e)}",
+            "data": model_registry.stats()
+        }), 400
+    return jsonify({
+        "status": "success",
+        "data": loaded_model.info()
+    })
+
 def load_geojson(layer_name):
-    """Load GeoJSON data from file, using cache if available"""
-    if layer_name in geojson_cache:
-        return geojson_cache[layer_name]
-    
+    """Load a layer's CompactLayer from the shared layer store"""
     try:
-        # Check various possible paths
-        file_paths = [
-            os.path.join(os.path.dirname(__file__), f'../data/geojson/{layer_name}.geojson'),
-            os.path.join(os.path.dirname(__file__), f'../data/{layer_name}.geojson'),
-            os.path.join(os.path.dirname(__file__), f'../static/{layer_name}.geojson')
-        ]
-        
-        for file_path in file_paths:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    print(f"Loading GeoJSON from {file_path}")
-                    geojson_data = json.load(f)
-                    geojson_cache[layer_name] = geojson_data
-                    return geojson_data
-        
-        print(f"Warning: GeoJSON file not found for layer: {layer_name}")
-        return None
+        geojson_data = layer_store.get(layer_name)
+        if geojson_data is None:
+            print(f"Warning: GeoJSON file not found for layer: {layer_name}")
+        return geojson_data
             
     except Exception as e:
         print(f"Error loading GeoJSON data for {layer_name}: {str(e)}")
         return None
 
-def find_gridcode_for_point(geojson_data, lat, lng):
-    """Find the gridcode for a given point in GeoJSON data"""
-    if not geojson_data or 'features' not in geojson_data:
-        print("No valid GeoJSON data provided for gridcode lookup")
+@metrics.timed('find_gridcode_for_point')
+def find_gridcode_for_point(layer_name, lat, lng):
+    """Find the gridcode for a given point in one of the climate layers"""
+    # Rasterized layers answer with a single array lookup on their grid
+    if CLIMATE_LOOKUP_METHOD == 'raster':
+        raster = get_gridcode_raster(layer_name)
+        if raster is not None and raster.cell(lat, lng) is not None:
+            return raster.lookup(lat, lng)
+
+    index = get_gridcode_index(layer_name)
+    if index is None:
+        print(f"Warning: GeoJSON file not found for layer: {layer_name}")
         return None
-        
+
     # Shapely may not be available, so use a simpler approach
-    try:
-        from shapely.geometry import Point, shape
-        point = Point(lng, lat)  # Note: GeoJSON is (longitude, latitude)
-        
-        for feature in geojson_data['features']:
-            if feature is None or 'geometry' not in feature or feature['geometry'] is None:
-                continue
-                
-            if feature['geometry']['type'] == 'Polygon':
-                polygon = shape(feature['geometry'])
-                if polygon.contains(point):
-                    return feature['properties'].get('gridcode')
-        
-        # If no polygon contains the point, find the nearest one
-        min_distance = float('inf')
-        nearest_gridcode = None
-        
-        for feature in geojson_data['features']:
-            if feature is None or 'geometry' not in feature or feature['geometry'] is None:
-                continue
-                
-            if feature['geometry']['type'] == 'Polygon':
-                polygon = shape(feature['geometry'])
-                distance = polygon.exterior.distance(point)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_gridcode = feature['properties'].get('gridcode')
-        
-        return nearest_gridcode
-    except ImportError:
-        # If shapely is not available, use a simpler approach
+    if not index.available:
         print("Shapely not available, using fallback method")
-        return simple_grid_lookup(geojson_data, lat, lng)
+        return simple_grid_lookup(index.layer, lat, lng)
+
+    # Prepared polygons behind an STRtree, built once per layer version
+    return index.lookup(lat, lng)
+
+@metrics.timed('lookup_gridcodes')
+def lookup_gridcodes(layer_name, lats, lngs):
+    """Vectorized find_gridcode_for_point: a float array, NaN where there is no gridcode"""
+    if CLIMATE_LOOKUP_METHOD == 'raster':
+        raster = get_gridcode_raster(layer_name)
+        if raster is not None:
+            values = raster.sample(lats, lngs)
+            # Points off the grid take the polygon lookup, as find_gridcode_for_point does
+            outside = np.flatnonzero(~raster.contains(lats, lngs))
+            if len(outside):
+                values[outside] = lookup_gridcodes_by_polygon(
+                    layer_name, np.asarray(lats)[outside], np.asarray(lngs)[outside])
+            return values
+    return lookup_gridcodes_by_polygon(layer_name, lats, lngs)
+
+def lookup_gridcodes_by_polygon(layer_name, lats, lngs):
+    """lookup_gridcodes through the polygon index only"""
+    index = get_gridcode_index(layer_name)
+    if index is None:
+        return np.full(len(lats), np.nan)
+    if not index.available:
+        return np.array([simple_grid_lookup(index.layer, lat, lng) for lat, lng in zip(lats, lngs)], dtype=np.float64)
+    return index.lookup_many(lats, lngs)
 
 def simple_grid_lookup(geojson_data, lat, lng):
     """A simpler method to find gridcode when shapely is not available"""
@@ -247,15 +749,10 @@ def calculate_climate_scores(lat, lng):
     gridcodes = {}
     
     for layer in layers:
-        geojson_data = load_geojson(layer)
-        if geojson_data:
-            gridcodes[layer] = find_gridcode_for_point(geojson_data, lat, lng)
-        else:
-            print(f"No GeoJSON data found for layer: {layer}")
+        gridcodes[layer] = find_gridcode_for_point(layer, lat, lng)
     
     # Check if we have any gridcodes
     if not any(gridcodes.values()):
-        print("No gridcodes found, falling back to generated scores")
         return generate_climate_scores(lat, lng)
     
     # Convert gridcodes to climate scores
@@ -265,18 +762,15 @@ def calculate_climate_scores(lat, lng):
     uhi_score = convert_gridcode_to_score(gridcodes.get('uhi'), 'uhi')
     
     # For any missing scores, generate based on location
-    temp_scores = generate_climate_scores(lat, lng)
+    if None in (lst_score, ndvi_score, utfvi_score, uhi_score):
+        temp_scores = generate_climate_scores(lat, lng)
     if lst_score is None:
-        print("Land Surface Temperature score not found, using generated score")
         lst_score = temp_scores["lst_score"]
     if ndvi_score is None:
-        print("NDVI score not found, using generated score")
         ndvi_score = temp_scores["ndvi_score"]
     if utfvi_score is None:
-        print("Urban Thermal Field Variance Index score not found, using generated score")
         utfvi_score = temp_scores["utfvi_score"]
     if uhi_score is None:
-        print("Urban Heat Island score not found, using generated score")
         uhi_score = temp_scores["uhi_score"]
     
     # Calculate overall score (weighted average)
@@ -297,6 +791,50 @@ def calculate_climate_scores(lat, lng):
         "overall_score": round(overall_score)
     }
 
+def calculate_climate_scores_batch(lats, lngs):
+    """
+    Vectorized calculate_climate_scores: one int array per score key.
+
+    Gives the same scores as calling calculate_climate_scores point by point,
+    including its generated-score fallbacks for points or layers without
+    gridcodes.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    gridcodes = {layer: lookup_gridcodes(layer, lats, lngs) for layer in CLIMATE_LAYERS}
+
+    # Same test as the per-point path: a gridcode of 0 counts as missing
+    found = np.zeros(len(lats), dtype=bool)
+    for codes in gridcodes.values():
+        found |= np.nan_to_num(codes) != 0
+
+    scores = {f'{layer}_score': convert_gridcode_to_score(gridcodes[layer], layer) for layer in CLIMATE_LAYERS}
+    missing = ~found
+    for values in scores.values():
+        missing |= np.isnan(values)
+
+    # Generated scores for missing layers, and for points without any gridcode
+    generated = np.flatnonzero(missing)
+    temp_scores = generate_climate_scores_batch(lats[generated], lngs[generated])
+    for key, values in scores.items():
+        fill = np.isnan(values[generated])
+        values[generated[fill]] = temp_scores[key][fill]
+
+    weights = {'lst': 0.25, 'ndvi': 0.25, 'utfvi': 0.25, 'uhi': 0.25}
+    overall_score = (
+        scores['lst_score'] * weights['lst'] +
+        scores['ndvi_score'] * weights['ndvi'] +
+        scores['utfvi_score'] * weights['utfvi'] +
+        scores['uhi_score'] * weights['uhi']
+    )
+    scores['overall_score'] = overall_score
+
+    result = {key: np.round(values).astype(np.int64) for key, values in scores.items()}
+    not_found = ~found[generated]
+    for key in SCORE_KEYS:
+        result[key][generated[not_found]] = temp_scores[key][not_found]
+    return result
+
 def generate_climate_scores(lat, lng):
     """
     Generate deterministic climate scores based on coordinates.
@@ -309,123 +847,215 @@ def generate_climate_scores(lat, lng):
     Returns:
         dict: Dictionary of climate scores
     """
-    # Create a deterministic seed from the coordinates
-    # This ensures the same location always gets the same scores
-    seed_value = int(abs(lat * 1000) + abs(lng * 1000))
-    np.random.seed(seed_value)
+    scores = generate_climate_scores_batch([lat], [lng])
+    return {key: int(values[0]) for key, values in scores.items()}
+
+# SplitMix64 constants
+HASH_INCREMENT = np.uint64(0x9E3779B97F4A7C15)
+HASH_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+def hashed_uniform(keys, counter):
+    """
+    Uniform [0, 1) values from a counter-based hash (SplitMix64) of integer keys.
+
+    Stateless: the same key and counter always give the same value in any
+    thread or process, with no shared RNG state to race on.
+    """
+    z = np.asarray(keys, dtype=np.uint64) * np.uint64(4) + np.uint64(counter) + HASH_INCREMENT
+    z = (z ^ (z >> np.uint64(30))) * HASH_MULTIPLIERS[0]
+    z = (z ^ (z >> np.uint64(27))) * HASH_MULTIPLIERS[1]
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+def generate_climate_scores_batch(lats, lngs):
+    """
+    Vectorized generate_climate_scores: one int array per score key.
+
+    The variation comes from hashed_uniform over a key derived from the
+    coordinates instead of the global NumPy RNG, so it is thread-safe.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+
+    # Deterministic key from the coordinates: the same location always gets
+    # the same scores
+    keys = np.floor(np.abs(lats * 1000) + np.abs(lngs * 1000)).astype(np.uint64)
     
     # For Bandung area, we'll use more realistic score ranges
     # Bandung general coordinates: -6.9147 latitude, 107.6098 longitude
+    is_bandung_area = (-7.0 <= lats) & (lats <= -6.8) & (107.5 <= lngs) & (lngs <= 107.7)
+    # North Bandung (higher elevation) typically has better climate scores
+    north = is_bandung_area & (lats > -6.88)
+    # Central Bandung (urban center) has worse climate scores
+    central = is_bandung_area & ~north & (-6.92 <= lats) & (lats <= -6.89) & (107.58 <= lngs) & (lngs <= 107.63)
+
+    # Score bases: (outside Bandung, Bandung, North Bandung, Central Bandung)
+    bases = {
+        "lst_score": (60, 65, 80, 55),  # Land Surface Temperature
+        "ndvi_score": (55, 70, 80, 55),  # Normalized Difference Vegetation Index
+        "utfvi_score": (50, 60, 65, 55),  # Urban Thermal Field Variance Index
+        "uhi_score": (55, 65, 75, 55)  # Urban Heat Island
+    }
     
-    # Check if coordinates are within Bandung area (approximately)
-    is_bandung_area = (-7.0 <= lat <= -6.8) and (107.5 <= lng <= 107.7)
-    
-    if is_bandung_area:
-        # Generate scores for Bandung areas - generally better climate conditions
-        lst_base = 65  # Land Surface Temperature
-        ndvi_base = 70  # Normalized Difference Vegetation Index
-        utfvi_base = 60  # Urban Thermal Field Variance Index
-        uhi_base = 65  # Urban Heat Island
-        
-        # Add variations based on specific areas
-        # North Bandung (higher elevation) typically has better climate scores
-        if lat > -6.88:  # North Bandung
-            lst_base += 15
-            ndvi_base += 10
-            utfvi_base += 5
-            uhi_base += 10
-        # Central Bandung (urban center) has worse climate scores
-        elif -6.92 <= lat <= -6.89 and 107.58 <= lng <= 107.63:
-            lst_base -= 10
-            ndvi_base -= 15
-            utfvi_base -= 5
-            uhi_base -= 10
-    else:
-        # Default score bases for areas outside Bandung
-        lst_base = 60
-        ndvi_base = 55
-        utfvi_base = 50
-        uhi_base = 55
-    
-    # Add some randomness, but keep it deterministic based on the coordinates
+    # Add some variation, deterministic in the coordinates
     variation = 10
-    lst_score = min(100, max(0, lst_base + (np.random.rand() * variation - variation/2)))
-    ndvi_score = min(100, max(0, ndvi_base + (np.random.rand() * variation - variation/2)))
-    utfvi_score = min(100, max(0, utfvi_base + (np.random.rand() * variation - variation/2)))
-    uhi_score = min(100, max(0, uhi_base + (np.random.rand() * variation - variation/2)))
+    raw = {}
+    for counter, (key, (outside, bandung, north_base, central_base)) in enumerate(bases.items()):
+        base = np.select([north, central, is_bandung_area], [north_base, central_base, bandung], outside)
+        raw[key] = np.clip(base + (hashed_uniform(keys, counter) * variation - variation / 2), 0, 100)
     
     # Calculate overall score as weighted average
-    overall_score = (lst_score * 0.3 + ndvi_score * 0.3 + utfvi_score * 0.2 + uhi_score * 0.2)
+    raw["overall_score"] = (raw["lst_score"] * 0.3 + raw["ndvi_score"] * 0.3 +
+                            raw["utfvi_score"] * 0.2 + raw["uhi_score"] * 0.2)
     
     # Return the scores as rounded integers
-    return {
-        "lst_score": round(lst_score),
-        "ndvi_score": round(ndvi_score),
-        "utfvi_score": round(utfvi_score),
-        "uhi_score": round(uhi_score),
-        "overall_score": round(overall_score)
-    }
+    return {key: np.round(values).astype(np.int64) for key, values in raw.items()}
 
 def calculate_property_price(property_type: str, bedrooms: float, certificate: str, land_price: float, land_area: float, city: str, district: str, climate_scores: dict[str, float]) -> float:
     """
     Calculate property price based on input parameters.
     """
-    try:
-        def create_df():
-            # Dummy function to simulate data wrangling
-            # In a real scenario, this would involve more complex operations
-            cert = "Sertifikat Hak Milik" if certificate == "SHM - Sertifikat Hak Milik" else "Sertifikat Hak Guna Bangunan"
-            
-            dict_data = {
-                "TIPE": property_type,
-                "KAMAR": bedrooms,
-                "SERTIFIKAT": cert,
-                "HARGA TANAH": land_price,
-                "LUAS TANAH": land_area,
-                "KOTA": city.upper(),
-                "KEC": district.upper(),
-                "LST": climate_scores["lst_score"],
-                "NDVI": climate_scores["ndvi_score"],
-                "UHI": climate_scores["uhi_score"],
-                "UTFVI": climate_scores["utfvi_score"],
-                "Overall_Score": climate_scores["overall_score"]
-            }
-            df = pd.DataFrame([dict_data])
-            return df
-            
-        df_input = create_df()
-        
-        def preprocess(df):
-            df['KOTA'] = df['KOTA'].map({'KOTA BANDUNG': 1, 'KABUPATEN BANDUNG': 0})
-            df['SERTIFIKAT'] = df['SERTIFIKAT'].map({
-                'Sertifikat Hak Milik': 1,
-                'Sertifikat Hak Guna Bangunan': 0
-            })
-            df['TIPE'] = df['TIPE'].map({'Rumah Baru': 1, 'Rumah Seken': 0})
-            return df
-            
-        df_input = preprocess(df_input)
-        
-        # Try to load the model
+    # Concurrent callers share one model call through the micro-batcher
+    return price_batcher.submit({
+        "property_type": property_type,
+        "bedrooms": bedrooms,
+        "certificate": certificate,
+        "land_price": land_price,
+        "land_area": land_area,
+        "city": city,
+        "district": district,
+        "climate_scores": climate_scores
+    })
+
+def predict_property_prices(records, cache=True):
+    """
+    Predict prices for many properties with a single model.predict call,
+    skipping the rows found in the prediction cache (cache=False bypasses
+    it, for one-off grids that would only evict useful entries).
+
+    Rows are encoded by the model's compiled feature encoder when it has
+    one, and through a DataFrame otherwise. Records that fail preprocessing
+    are priced by calculate_property_price_fallback on their own, and the
+    other rows still share one model call; every row falls back when no
+    model is loaded or the model call fails.
+    """
+    prices = [None] * len(records)
+
+    def fallback(indices, reason):
+        model_registry.record_fallback(reason, len(indices))
+        for i, price in zip(indices, calculate_property_prices_fallback([records[i] for i in indices])):
+            prices[i] = price
+        return prices
+
+    # Keep one malformed record from sending its whole batch to the fallback
+    valid, rows, failed = [], [], []
+    for i, record in enumerate(records):
         try:
-            xgb_model = load('routes/model/best_xgb_pipeline.joblib')
-            predicted_price = xgb_model.predict(df_input)
-            return float(predicted_price[0])
+            rows.append(preprocess_record(record))
+            valid.append(i)
         except Exception as e:
-            print(f"Error loading model: {str(e)}")
-            print("Using fallback calculation method")
-            return calculate_property_price_fallback(
-                property_type, bedrooms, certificate, land_price, land_area, 
-                city, district, climate_scores
-            )
+            if not failed:
+                print(f"Error in price calculation: {str(e)}")
+                traceback.print_exc()
+            failed.append(i)
+    if failed:
+        print(f"Using fallback calculation method for {len(failed)} of {len(records)} properties")
+        fallback(failed, 'preprocessing_error')
+    if not valid:
+        return prices
+
+    # Use the model loaded at startup (or hot-swapped since)
+    loaded_model = model_registry.current()
+    if loaded_model is None:
+        return fallback(valid, 'model_unavailable')
+    try:
+        # Only rows not predicted before by this model version reach predict()
+        if cache:
+            keys = prediction_cache.keys(loaded_model.version, rows)
+            row_prices = [prediction_cache.get(key) for key in keys]
+        else:
+            row_prices = [None] * len(rows)
+        missing = [j for j, price in enumerate(row_prices) if price is None]
+        if missing:
+            encoder = encoder_for(loaded_model)
+            with metrics.timer('model_predict'):
+                if encoder is not None:
+                    predicted_prices = encoder.predict([rows[j] for j in missing])
+                else:
+                    df_input = preprocess_price_frame(create_price_frame([records[valid[j]] for j in missing]))
+                    predicted_prices = loaded_model.model.predict(df_input)
+            for j, price in zip(missing, predicted_prices):
+                row_prices[j] = float(price)
+                if cache:
+                    prediction_cache.put(keys[j], row_prices[j])
     except Exception as e:
-        print(f"Error in price calculation: {str(e)}")
-        traceback.print_exc()
-        # Fallback to basic calculation if any error occurs
-        return calculate_property_price_fallback(
-            property_type, bedrooms, certificate, land_price, land_area, 
-            city, district, climate_scores
-        )
+        print(f"Error predicting with model {loaded_model.version}: {str(e)}")
+        print("Using fallback calculation method")
+        return fallback(valid, 'prediction_error')
+    for i, price in zip(valid, row_prices):
+        prices[i] = price
+    return prices
+
+# Batches run on the inference pool, one per worker at a time
+price_batcher = MicroBatcher(
+    predict_property_prices,
+    max_batch=PRICE_MICROBATCH_SIZE,
+    max_wait=PRICE_MICROBATCH_WAIT_MS / 1000.0,
+    name='price_predictions',
+    executor=inference_pool.submit,
+    max_in_flight=inference_pool.workers,
+    # A caller waits no longer than a pooled prediction may take
+    timeout=INFERENCE_TIMEOUT,
+    timeout_error=lambda message: InferenceUnavailable(message, 504)
+)
+
+@metrics.register_collector
+def collect_prediction_metrics():
+    """Micro-batcher, inference pool, cache and model fallback state as metric families"""
+    batching = price_batcher.stats()
+    inference = inference_pool.stats()
+    fallbacks = model_registry.stats()['fallbacks']
+    caches = [climate_score_cache.stats(), prediction_cache.stats(), price_heatmap_cache.stats()]
+
+    # Batch sizes are counted in power-of-two buckets keyed on their upper bound
+    size_buckets = []
+    cumulative = 0
+    for bound, count in sorted((int(bound), count) for bound, count in batching['batch_size_buckets'].items()):
+        cumulative += count
+        size_buckets.append(('_bucket', (('le', str(bound)),), cumulative))
+    size_buckets.append(('_bucket', (('le', '+Inf'),), batching['batches']))
+    size_buckets += [('_sum', (), batching['items']), ('_count', (), batching['batches'])]
+
+    def cache_samples(key):
+        return [('', (('cache', cache['name']),), cache[key]) for cache in caches]
+
+    return [
+        ('price_microbatch_queue_depth', 'gauge', 'Predictions waiting for a micro-batch',
+         [('', (), batching['queue_depth'])]),
+        ('price_microbatch_size', 'histogram', 'Rows per micro-batched model call', size_buckets),
+        ('inference_pool_pending', 'gauge', 'Inference tasks running or queued', [('', (), inference['pending'])]),
+        ('inference_pool_tasks_total', 'counter', 'Inference tasks by outcome',
+         [('', (('outcome', outcome),), inference[outcome])
+          for outcome in ('completed', 'failures', 'rejected', 'timeouts')]),
+        ('price_model_fallbacks_total', 'counter', 'Rows priced by the fallback method by reason',
+         [('', (('reason', reason),), count) for reason, count in sorted(fallbacks.items())]),
+        ('cache_hits_total', 'counter', 'Cache hits', cache_samples('hits')),
+        ('cache_misses_total', 'counter', 'Cache misses', cache_samples('misses')),
+        ('cache_items', 'gauge', 'Entries held by a cache', cache_samples('items'))
+    ]
+
+# District tiers of the fallback price
+PREMIUM_DISTRICTS = [
+    "CIBEUNYING KALER", "COBLONG", "CIDADAP", "SUKASARI", 
+    "BANDUNG WETAN", "SUMUR BANDUNG"
+]
+MID_TIER_DISTRICTS = [
+    "ANTAPANI", "ARCAMANIK", "BUAHBATU", "CIBEUNYING KIDUL",
+    "SUKAJADI", "LENGKONG", "REGOL"
+]
+DISTRICT_PREMIUMS = {district: 1.15 for district in MID_TIER_DISTRICTS}
+DISTRICT_PREMIUMS.update({district: 1.25 for district in PREMIUM_DISTRICTS})
+PREMIUM_PRICE_FLOOR = 1500000000  # 1.5B minimum for premium districts
 
 def calculate_property_price_fallback(
     property_type, bedrooms, certificate, land_price, land_area, 
@@ -449,20 +1079,7 @@ def calculate_property_price_fallback(
     city_multiplier = 1.1 if "KOTA BANDUNG" in city.upper() else 1.0
     
     # District premium
-    district_premium = 1.0
-    premium_districts = [
-        "CIBEUNYING KALER", "COBLONG", "CIDADAP", "SUKASARI", 
-        "BANDUNG WETAN", "SUMUR BANDUNG"
-    ]
-    mid_tier_districts = [
-        "ANTAPANI", "ARCAMANIK", "BUAHBATU", "CIBEUNYING KIDUL",
-        "SUKAJADI", "LENGKONG", "REGOL"
-    ]
-    
-    if district.upper() in premium_districts:
-        district_premium = 1.25
-    elif district.upper() in mid_tier_districts:
-        district_premium = 1.15
+    district_premium = DISTRICT_PREMIUMS.get(district.upper(), 1.0)
     
     # Climate multiplier
     overall_score = climate_scores.get("overall_score", 70)
@@ -488,8 +1105,8 @@ def calculate_property_price_fallback(
     )
     
     # Add regional price floor based on district
-    if district.upper() in premium_districts:
-        price_floor = 1500000000  # 1.5B minimum for premium districts
+    if district.upper() in PREMIUM_DISTRICTS:
+        price_floor = PREMIUM_PRICE_FLOOR
         predicted_price = max(predicted_price, price_floor)
     
     # Round to nearest 10 million
@@ -497,6 +1114,71 @@ def calculate_property_price_fallback(
     
     return predicted_price
 
+def lookup_table(values, *converts):
+    """Array of convert(value) for every value per convert, computed once per distinct value"""
+    if isinstance(values, str) or np.ndim(values) == 0:
+        results = [np.asarray(convert(values)) for convert in converts]
+    else:
+        index = {}
+        codes = np.fromiter((index.setdefault(value, len(index)) for value in values), dtype=np.int64)
+        results = [np.array([convert(value) for value in index])[codes] for convert in converts]
+    return results[0] if len(results) == 1 else results
+
+def calculate_property_price_fallback_batch(
+    property_type, bedrooms, certificate, land_price, land_area,
+    city, district, climate_scores):
+    """
+    calculate_property_price_fallback over arrays of inputs (scalars
+    broadcast), as an int64 array with the same price for every row.
+
+    climate_scores maps score keys to arrays or scalars; missing keys
+    default to 70 as in the scalar version. String multipliers and district
+    tiers are looked up once per distinct value.
+    """
+    land_value = np.asarray(land_area, dtype=np.float64) * np.asarray(land_price, dtype=np.float64)
+    certificate_multiplier = lookup_table(certificate, lambda value: 1.2 if "SHM" in value else 1.05)
+    type_multiplier = lookup_table(property_type, lambda value: 1.15 if value == "Rumah Baru" else 1.0)
+    bedroom_multiplier = 1 + (np.asarray(bedrooms, dtype=np.float64) * 0.07)
+    city_multiplier = lookup_table(city, lambda value: 1.1 if "KOTA BANDUNG" in value.upper() else 1.0)
+    district_premium, premium = lookup_table(
+        district,
+        lambda value: DISTRICT_PREMIUMS.get(value.upper(), 1.0),
+        lambda value: value.upper() in PREMIUM_DISTRICTS
+    )
+
+    overall_score = np.asarray(climate_scores.get("overall_score", 70), dtype=np.float64)
+    ndvi_score = np.asarray(climate_scores.get("ndvi_score", 70), dtype=np.float64)
+    climate_multiplier = 1.0 + (((overall_score - 50) / 100) * 0.15)
+    climate_multiplier = climate_multiplier + np.where(ndvi_score > 75, 0.03, 0.0)
+
+    predicted_price = (
+        land_value *
+        certificate_multiplier *
+        type_multiplier *
+        bedroom_multiplier *
+        city_multiplier *
+        district_premium *
+        climate_multiplier
+    )
+    predicted_price = np.where(premium, np.maximum(predicted_price, PREMIUM_PRICE_FLOOR), predicted_price)
+
+    # Round to nearest 10 million (half to even, like round())
+    return (np.round(predicted_price / 10000000) * 10000000).astype(np.int64)
+
+def calculate_property_prices_fallback(records):
+    """calculate_property_price_fallback of many calculate_property_price argument dicts"""
+    def numbers(values):
+        return np.fromiter(values, dtype=np.float64, count=len(records))
+
+    columns = {name: [record[name] for record in records] for name in ['property_type', 'certificate', 'city', 'district']}
+    for name in ['bedrooms', 'land_price', 'land_area']:
+        columns[name] = numbers(record[name] for record in records)
+    climate_scores = {
+        key: numbers(record['climate_scores'].get(key, 70) for record in records)
+        for key in ('overall_score', 'ndvi_score')
+    }
+    return calculate_property_price_fallback_batch(climate_scores=climate_scores, **columns).tolist()
+
 
 if __name__ == "__main__":
     predicted_price = calculate_property_price(
@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from app.services.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request, hot-path and service metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -2,7 +2,14 @@ from flask import Blueprint, jsonify, request
 import json
 import os
 import pandas as pd
-from app.config import DEFAULT_BBOX, CLIMATE_PARAMETERS, PRICE_FACTORS
+from app.config import (
+    DEFAULT_BBOX, CLIMATE_PARAMETERS, PRICE_FACTORS, PROPERTY_DEFAULT_PAGE_SIZE, PROPERTY_MAX_PAGE_SIZE
+)
+from app.services.cursors import CursorError, decode_cursor, next_cursor
+from app.services.metrics import metrics
+from app.services.property_data import get_property_frame
+from app.services.score_job import score_job
+from utils.auth import require_admin
 
 property_bp = Blueprint('property', __name__)
 
@@ -15,73 +22,15 @@ import os
 def get_bandung_properties():
     """Get properties from Bandung CSV file"""
     try:
-        # Load CSV file
-        csv_path = os.path.join(os.path.dirname(__file__), '../data/properti_bandung_rumah.csv')
-        df = pd.read_csv(csv_path)
-        
+        df, version = get_property_frame()
+
+        # Cursor pagination: ?limit=N for the first page, then ?cursor=<next_cursor>
+        if 'cursor' in request.args or 'limit' in request.args:
+            return get_properties_page(df, version)
+
         # Convert to list of dictionaries
-        properties = []
-        for idx, row in df.iterrows():
-            # Use safe conversion functions for numeric values
-            def safe_int(val):
-                try:
-                    if pd.isna(val):
-                        return None
-                    return int(float(val))
-                except (ValueError, TypeError):
-                    return None
-                    
-            def safe_float(val):
-                try:
-                    if pd.isna(val):
-                        return None
-                    return float(val)
-                except (ValueError, TypeError):
-                    return None
-            
-            # Get climate scores directly from CSV
-            climate_scores = {
-                "lst_score": safe_float(row.get("score_LST")),
-                "ndvi_score": safe_float(row.get("score_NDVI")),
-                "utfvi_score": safe_float(row.get("score_UTFVI")),
-                "uhi_score": safe_float(row.get("score_UHI")),
-                "overall_score": safe_float(row.get("Overall_Score"))
-            }
-            
-            # Use overall score from CSV if available, otherwise calculate it
-            climate_risk_score = climate_scores["overall_score"]
-            if climate_risk_score is None:
-                climate_risk_score = calculate_mock_climate_risk(row)
-            
-            properties.append({
-                "id": idx + 1,
-                "title": str(row.get("NAMA PROPERTI", "Unnamed Property")),
-                "type": str(row.get("TIPE", "Unknown")),
-                "address": str(row.get("ALAMAT", "")),
-                "location": {
-                    "latitude": safe_float(row.get("LATITUDE")),
-                    "longitude": safe_float(row.get("LONGITUDE"))
-                },
-                "price": safe_int(row.get("HARGA PROPERTI NET (RP)")),
-                "price_per_meter": safe_int(row.get("HARGA TANAH NET (RP/M²)")),
-                "bedrooms": safe_int(row.get("JUMLAH KAMAR TIDUR")),
-                "certificate": str(row.get("SERTIFIKAT", "")),
-                "land_area": safe_float(row.get("LUAS TANAH (M²)")),
-                "building_area": safe_float(row.get("LUAS BANGUNAN (M²)")),
-                "province": str(row.get("PROVINSI", "")),
-                "city": str(row.get("KABKOT", "")),
-                "district": str(row.get("KECAMATAN", "")),
-                "village": str(row.get("DESA", "")),
-                "climate_risk_score": int(climate_risk_score) if climate_risk_score is not None else None,
-                "climate_scores": climate_scores,
-                "risks": {
-                    "surface_temperature": get_risk_level_from_score(climate_scores.get("lst_score", 50), "surface_temperature"),
-                    "heat_stress": get_risk_level_from_score(climate_scores.get("utfvi_score", 50), "heat_stress"),
-                    "green_cover": get_risk_level_from_score(climate_scores.get("ndvi_score", 50), "green_cover"),
-                    "heat_zone": get_risk_level_from_score(climate_scores.get("uhi_score", 50), "heat_zone"),
-                }
-            })
-        
+        properties = [build_property(idx, row) for idx, row in df.iterrows()]
+
         return jsonify({
             "status": "success",
             "count": len(properties),
@@ -96,6 +45,120 @@ def get_bandung_properties():
             "message": f"Failed to load properties: {str(e)}"
         }), 500
 
+def get_properties_page(df, version):
+    """Get one page of properties, only serializing the rows on that page"""
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            offset, limit = decode_cursor(cursor, 'properties', version)
+        except CursorError as e:
+            return jsonify({"status": "error", "message": str(e)}), e.status
+    else:
+        try:
+            limit = int(request.args.get('limit', PROPERTY_DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({"status": "error", "message": "limit must be an integer"}), 400
+        if limit < 1:
+            return jsonify({"status": "error", "message": "limit must be positive"}), 400
+        offset = 0
+    limit = min(limit, PROPERTY_MAX_PAGE_SIZE)
+
+    page = df.iloc[offset:offset + limit]
+    properties = [build_property(idx, row) for idx, row in page.iterrows()]
+
+    return jsonify({
+        "status": "success",
+        "count": len(properties),
+        "total": len(df),
+        "limit": limit,
+        "next_cursor": next_cursor('properties', version, offset, limit, len(df)),
+        "data": properties
+    })
+
+def safe_int(val):
+    try:
+        if pd.isna(val):
+            return None
+        return int(float(val))
+    except (ValueError, TypeError):
+        return None
+
+def safe_float(val):
+    try:
+        if pd.isna(val):
+            return None
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+def build_property(idx, row):
+    """Convert one CSV row into the property listing format"""
+    # Get climate scores directly from CSV
+    climate_scores = {
+        "lst_score": safe_float(row.get("score_LST")),
+        "ndvi_score": safe_float(row.get("score_NDVI")),
+        "utfvi_score": safe_float(row.get("score_UTFVI")),
+        "uhi_score": safe_float(row.get("score_UHI")),
+        "overall_score": safe_float(row.get("Overall_Score"))
+    }
+    
+    # Use overall score from CSV if available, otherwise calculate it
+    climate_risk_score = climate_scores["overall_score"]
+    if climate_risk_score is None:
+        climate_risk_score = calculate_mock_climate_risk(row)
+    
+    return {
+        "id": idx + 1,
+        "title": str(row.get("NAMA PROPERTI", "Unnamed Property")),
+        "type": str(row.get("TIPE", "Unknown")),
+        "address": str(row.get("ALAMAT", "")),
+        "location": {
+            "latitude": safe_float(row.get("LATITUDE")),
+            "longitude": safe_float(row.get("LONGITUDE"))
+        },
+        "price": safe_int(row.get("HARGA PROPERTI NET (RP)")),
+        "price_per_meter": safe_int(row.get("HARGA TANAH NET (RP/M²)")),
+        "bedrooms": safe_int(row.get("JUMLAH KAMAR TIDUR")),
+        "certificate": str(row.get("SERTIFIKAT", "")),
+        "land_area": safe_float(row.get("LUAS TANAH (M²)")),
+        "building_area": safe_float(row.get("LUAS BANGUNAN (M²)")),
+        "province": str(row.get("PROVINSI", "")),
+        "city": str(row.get("KABKOT", "")),
+        "district": str(row.get("KECAMATAN", "")),
+        "village": str(row.get("DESA", "")),
+        "climate_risk_score": int(climate_risk_score) if climate_risk_score is not None else None,
+        "climate_scores": climate_scores,
+        "risks": {
+            "surface_temperature": get_risk_level_from_score(climate_scores.get("lst_score", 50), "surface_temperature"),
+            "heat_stress": get_risk_level_from_score(climate_scores.get("utfvi_score", 50), "heat_stress"),
+            "green_cover": get_risk_level_from_score(climate_scores.get("ndvi_score", 50), "green_cover"),
+            "heat_zone": get_risk_level_from_score(climate_scores.get("uhi_score", 50), "heat_zone"),
+        }
+    }
+
+@property_bp.route('/api/properties/climate-scores/recompute', methods=['POST'])
+@require_admin
+def start_climate_score_job():
+    """Start recomputing the CSV climate score columns against the current layers"""
+    if not score_job.start():
+        return jsonify({
+            "status": "error",
+            "message": "A climate score job is already running",
+            "data": score_job.status()
+        }), 409
+    return jsonify({
+        "status": "success",
+        "data": score_job.status()
+    }), 202
+
+@property_bp.route('/api/properties/climate-scores/recompute', methods=['GET'])
+def get_climate_score_job_status():
+    """Get progress of the climate score recomputation job"""
+    return jsonify({
+        "status": "success",
+        "data": score_job.status()
+    })
+
 def calculate_mock_climate_risk(row):
     """Calculate a mock climate risk score based on location"""
     # In a real application, this would use actual climate data analysis
@@ -208,7 +271,8 @@ def compare_properties():
             
         # Load CSV file
         csv_path = os.path.join(os.path.dirname(__file__), '../data/properti_bandung_rumah.csv')
-        df = pd.read_csv(csv_path)
+        with metrics.timer('csv_load'):
+            df = pd.read_csv(csv_path)
         
         # Filter properties by ID
         # In a real database, you'd query by ID - here we're using array index
@@ -300,7 +364,8 @@ def get_property_by_id(property_id):
     try:
         # Load CSV file
         csv_path = os.path.join(os.path.dirname(__file__), '../data/properti_bandung_rumah.csv')
-        df = pd.read_csv(csv_path)
+        with metrics.timer('csv_load'):
+            df = pd.read_csv(csv_path)
         
         # In a real database, you'd query by ID - here we use the array index
         if property_id <= 0 or property_id > len(df):
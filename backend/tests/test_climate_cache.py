@@ -0,0 +1,49 @@
+# backend/tests/test_climate_cache.py
+import shutil
+
+import pytest
+
+from app.services import climate_cache as climate_cache_module
+from app.services.climate_cache import ClimateScoreCache
+from app.services.gridcode_raster import build_missing_gridcode_rasters, raster_dir
+from app.services.layer_store import layer_store
+from routes import developer_routes
+from routes.developer_routes import calculate_climate_scores
+
+
+def set_lookup_method(monkeypatch, method):
+    monkeypatch.setattr(developer_routes, 'CLIMATE_LOOKUP_METHOD', method)
+    monkeypatch.setattr(climate_cache_module, 'CLIMATE_LOOKUP_METHOD', method)
+
+
+@pytest.mark.parametrize('method, keyed_on', [('polygon', 'coordinates'), ('raster', 'raster_cells')])
+def test_cached_scores_match_uncached(monkeypatch, grid_points, method, keyed_on):
+    if method == 'raster':
+        build_missing_gridcode_rasters()
+    set_lookup_method(monkeypatch, method)
+    lats, lngs = grid_points(1000, seed=5, margin=0.02)
+    points = list(zip(lats.tolist(), lngs.tolist()))
+    cache = ClimateScoreCache(check_seconds=0)
+
+    # Each point is asked twice, in two orders, so hits must not depend on
+    # which point of a cell came first
+    for lat, lng in points + points[::-1]:
+        assert cache.get(lat, lng, calculate_climate_scores) == calculate_climate_scores(lat, lng)
+    stats = cache.stats()
+    assert stats['keyed_on'] == keyed_on
+    assert stats['hits'] > 0
+
+
+def test_switches_to_raster_cells_once_rasters_are_built(monkeypatch):
+    set_lookup_method(monkeypatch, 'raster')
+    for layer_name in ('lst', 'uhi'):
+        shutil.rmtree(raster_dir(layer_name), ignore_errors=True)
+        layer_store.discard_derived(layer_name, 'gridcode_raster')
+    cache = ClimateScoreCache(check_seconds=0)
+
+    cache.get(-6.9, 107.57, calculate_climate_scores)
+    assert cache.stats()['keyed_on'] == 'coordinates'
+
+    build_missing_gridcode_rasters()
+    cache.get(-6.9, 107.57, calculate_climate_scores)
+    assert cache.stats()['keyed_on'] == 'raster_cells'
@@ -0,0 +1,56 @@
+# backend/tests/test_climate_scores.py
+import csv
+import io
+
+import pytest
+
+from app.services.gridcode_raster import build_missing_gridcode_rasters
+from routes import developer_routes
+from routes.developer_routes import SCORE_KEYS, calculate_climate_scores, calculate_climate_scores_batch
+
+
+@pytest.fixture(params=['polygon', 'raster'])
+def lookup_method(request, monkeypatch):
+    if request.param == 'raster':
+        build_missing_gridcode_rasters()
+    monkeypatch.setattr(developer_routes, 'CLIMATE_LOOKUP_METHOD', request.param)
+    return request.param
+
+
+def test_batch_matches_single_points(lookup_method, grid_points):
+    lats, lngs = grid_points(2000, seed=2, margin=0.02)
+    batch = calculate_climate_scores_batch(lats, lngs)
+    mismatches = [
+        i for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist()))
+        if {key: int(batch[key][i]) for key in SCORE_KEYS} != calculate_climate_scores(lat, lng)
+    ]
+    assert mismatches == []
+
+
+def test_batch_endpoint_keeps_input_order(client, lookup_method, grid_points):
+    lats, lngs = grid_points(50, seed=3)
+    points = [[lat, lng] for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    points[7] = ['north', 'east']
+    points[20] = [95.0, 107.6]
+
+    response = client.post('/api/climate/scores/batch', json=points)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == len(points)
+    for i, row in enumerate(data['data']):
+        if i in (7, 20):
+            assert row['error'] == "Invalid coordinates"
+        else:
+            assert {key: row[key] for key in SCORE_KEYS} == calculate_climate_scores(*points[i])
+
+
+def test_batch_endpoint_csv(client, lookup_method, grid_points):
+    lats, lngs = grid_points(30, seed=4)
+    body = 'latitude,longitude\n' + ''.join(f'{lat},{lng}\n' for lat, lng in zip(lats.tolist(), lngs.tolist()))
+
+    response = client.post('/api/climate/scores/batch?format=csv', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == len(lats)
+    for row, lat, lng in zip(rows, lats.tolist(), lngs.tolist()):
+        assert {key: int(row[key]) for key in SCORE_KEYS} == calculate_climate_scores(lat, lng)
@@ -0,0 +1,58 @@
+# backend/tests/test_cursors.py
+import pytest
+
+from app.services.cursors import CursorError, decode_cursor, encode_cursor, next_cursor
+from app.services.layer_store import layer_store
+
+
+def test_cursor_round_trip():
+    token = encode_cursor('lst', (1, 2), 2000, 1000)
+    assert decode_cursor(token, 'lst', (1, 2)) == (2000, 1000)
+
+
+@pytest.mark.parametrize('token', ['garbage', 'a.b', '', 'x.y.z'])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(CursorError) as error:
+        decode_cursor(token, 'lst', (1, 2))
+    assert error.value.status == 400
+
+
+def test_tampered_or_foreign_cursor_is_rejected():
+    payload, signature = encode_cursor('lst', (1, 2), 0, 1000).split('.')
+    forged = encode_cursor('lst', (1, 2), 5000, 1000).split('.')[0]
+    with pytest.raises(CursorError) as error:
+        decode_cursor(f'{forged}.{signature}', 'lst', (1, 2))
+    assert error.value.status == 400
+    with pytest.raises(CursorError) as error:
+        decode_cursor(f'{payload}.{signature}', 'ndvi', (1, 2))
+    assert error.value.status == 400
+
+
+def test_cursor_from_an_older_version_is_gone():
+    token = encode_cursor('lst', (1, 2), 0, 1000)
+    with pytest.raises(CursorError) as error:
+        decode_cursor(token, 'lst', (1, 3))
+    assert error.value.status == 410
+
+
+def test_next_cursor_stops_on_the_last_page():
+    assert next_cursor('lst', (1, 2), 0, 1000, 1000) is None
+    assert decode_cursor(next_cursor('lst', (1, 2), 0, 1000, 1001), 'lst', (1, 2)) == (1000, 1000)
+
+
+def test_geojson_cursor_errors(client):
+    response = client.get('/api/data/geojson/lst?cursor=garbage')
+    assert response.status_code == 400
+
+    stale = encode_cursor('lst', (0, 0), 0, 1000)
+    response = client.get(f'/api/data/geojson/lst?cursor={stale}')
+    assert response.status_code == 410
+
+
+def test_geojson_cursor_walks_every_feature(client):
+    response = client.get('/api/data/geojson/lst?per_page=700').get_json()
+    seen = len(response['features'])
+    while response['next_cursor']:
+        response = client.get(f"/api/data/geojson/lst?cursor={response['next_cursor']}").get_json()
+        seen += len(response['features'])
+    assert seen == len(layer_store.get('lst'))
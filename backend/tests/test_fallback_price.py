@@ -0,0 +1,55 @@
+# backend/tests/test_fallback_price.py
+import random
+
+import numpy as np
+
+from routes.developer_routes import (
+    MID_TIER_DISTRICTS, PREMIUM_DISTRICTS, calculate_property_price_fallback, calculate_property_price_fallback_batch,
+    calculate_property_prices_fallback
+)
+
+
+def random_records(count, seed=3):
+    """Fallback inputs mixing ints and floats, odd spellings and partial climate scores"""
+    rng = random.Random(seed)
+    districts = PREMIUM_DISTRICTS + MID_TIER_DISTRICTS + ['Bojongsoang', 'coblong', 'Regol ', 'Cimahi']
+    records = []
+    for _ in range(count):
+        records.append({
+            "property_type": rng.choice(['Rumah Baru', 'Rumah Seken', 'Apartemen']),
+            "bedrooms": rng.choice([rng.randint(0, 9), rng.uniform(0, 9)]),
+            "certificate": rng.choice(['SHM - Sertifikat Hak Milik', 'HGB', 'shm']),
+            "land_price": rng.choice([rng.randint(1000000, 30000000), rng.uniform(1e6, 3e7)]),
+            "land_area": rng.choice([rng.randint(20, 2000), rng.uniform(20, 2000)]),
+            "city": rng.choice(['Kota Bandung', 'Bandung', 'Kabupaten Bandung', 'kota bandung barat']),
+            "district": rng.choice(districts),
+            "climate_scores": rng.choice([
+                {},
+                {'overall_score': rng.randint(0, 100), 'ndvi_score': rng.choice([75, 76, rng.randint(0, 100)])},
+                {'overall_score': rng.uniform(0, 100)}
+            ])
+        })
+    return records
+
+
+def test_vectorized_fallback_matches_scalar():
+    records = random_records(2000)
+    expected = [calculate_property_price_fallback(**record) for record in records]
+    actual = calculate_property_prices_fallback(records)
+    mismatches = [i for i, (a, b) in enumerate(zip(actual, expected)) if a != b or type(a) is not type(b)]
+    assert mismatches == []
+
+
+def test_fallback_batch_broadcasts_scalars():
+    areas = np.linspace(40, 800, 25)
+    scores = np.arange(0, 100, 4)
+    prices = calculate_property_price_fallback_batch(
+        'Rumah Baru', 3, 'SHM - Sertifikat Hak Milik', 5e6, areas, 'Kota Bandung', 'Coblong',
+        {'overall_score': scores}
+    )
+    expected = [
+        calculate_property_price_fallback('Rumah Baru', 3, 'SHM - Sertifikat Hak Milik', 5e6, area, 'Kota Bandung',
+                                          'Coblong', {'overall_score': score})
+        for area, score in zip(areas.tolist(), scores.tolist())
+    ]
+    assert prices.tolist() == expected
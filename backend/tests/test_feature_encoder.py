@@ -0,0 +1,79 @@
+# backend/tests/test_feature_encoder.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from xgboost import XGBRegressor
+
+from app.services import feature_encoder
+from app.services.feature_encoder import (
+    PRICE_FEATURE_COLUMNS, compile_encoder, create_price_frame, preprocess_price_frame, preprocess_records,
+    validate_price_model
+)
+
+DISTRICTS = ['COBLONG', 'ANTAPANI', 'BOJONGSOANG', 'SUKASARI', 'REGOL']
+
+
+def training_frame(rows, seed=0):
+    """Training rows shaped like preprocess_price_frame output"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "TIPE": rng.integers(0, 2, rows),
+        "KAMAR": rng.integers(1, 6, rows).astype(float),
+        "SERTIFIKAT": rng.integers(0, 2, rows),
+        "HARGA TANAH": rng.uniform(2e6, 2e7, rows),
+        "LUAS TANAH": rng.uniform(60, 400, rows),
+        "KOTA": rng.integers(0, 2, rows),
+        "KEC": rng.choice(DISTRICTS, rows),
+        "LST": rng.uniform(20, 100, rows),
+        "NDVI": rng.uniform(20, 100, rows),
+        "UHI": rng.uniform(20, 100, rows),
+        "UTFVI": rng.uniform(20, 100, rows),
+        "Overall_Score": rng.uniform(20, 100, rows)
+    })
+    prices = df["HARGA TANAH"] * df["LUAS TANAH"] * (1 + 0.1 * df["KAMAR"]) * (1 + 0.2 * (df["KEC"] == 'COBLONG'))
+    return df, prices
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    df, prices = training_frame(400)
+    preprocess = ColumnTransformer([("kec", OneHotEncoder(handle_unknown='ignore'), ["KEC"])], remainder='passthrough')
+    model = Pipeline([("pre", preprocess), ("xgb", XGBRegressor(n_estimators=30, max_depth=4, random_state=0))])
+    return model.fit(df, prices)
+
+
+def dataframe_predictions(model, records):
+    return np.asarray(model.predict(preprocess_price_frame(create_price_frame(records))))
+
+
+def test_encoder_matches_dataframe_predictions(pipeline):
+    encoder = compile_encoder(pipeline)
+    assert encoder is not None
+    records = feature_encoder._probe_records(encoder, count=2000, seed=5)
+    records.append(dict(records[0], district='Unknownville', city='Jakarta', property_type='Apartemen'))
+
+    assert np.array_equal(encoder.predict(preprocess_records(records)), dataframe_predictions(pipeline, records))
+
+
+def test_encode_repeated_matches_encode(pipeline):
+    encoder = compile_encoder(pipeline)
+    row = preprocess_records(feature_encoder._probe_records(encoder, count=2))[0]
+    areas = np.linspace(50, 500, 16)
+    column = PRICE_FEATURE_COLUMNS.index('LUAS TANAH')
+    expected = encoder.encode([row[:column] + (area,) + row[column + 1:] for area in areas])
+    assert np.array_equal(encoder.encode_repeated(row, len(areas), {'LUAS TANAH': areas}), expected)
+
+
+def test_unsupported_models_keep_the_dataframe_path():
+    df, prices = training_frame(200)
+    bare = XGBRegressor(n_estimators=5).fit(df.drop(columns=['KEC']), prices)
+    assert compile_encoder(bare) is None
+
+
+def test_validate_price_model(pipeline):
+    validate_price_model(pipeline)
+    with pytest.raises(ValueError):
+        validate_price_model(object())
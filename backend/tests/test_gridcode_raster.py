@@ -0,0 +1,66 @@
+# backend/tests/test_gridcode_raster.py
+import math
+import shutil
+
+import numpy as np
+import pytest
+
+from app.services import gridcode_raster
+from app.services.gridcode_index import get_gridcode_index
+from app.services.gridcode_raster import (
+    CLIMATE_LAYERS, accuracy_report, build_missing_gridcode_rasters, get_gridcode_raster, raster_dir
+)
+from app.services.layer_store import layer_store
+from routes.developer_routes import find_gridcode_for_point, lookup_gridcodes
+
+
+@pytest.fixture(scope='module')
+def rasters():
+    build_missing_gridcode_rasters()
+    return {layer_name: get_gridcode_raster(layer_name) for layer_name in CLIMATE_LAYERS}
+
+
+def test_lookups_never_rasterize(monkeypatch):
+    def fail(layer, resolution=None):
+        raise AssertionError("rasterized on a lookup")
+
+    shutil.rmtree(raster_dir('ndvi'), ignore_errors=True)
+    layer_store.discard_derived('ndvi', 'gridcode_raster')
+    monkeypatch.setattr(gridcode_raster, 'build_gridcode_raster', fail)
+    assert get_gridcode_raster('ndvi') is None
+    monkeypatch.undo()
+
+    assert build_missing_gridcode_rasters(['ndvi']) == ['ndvi']
+    assert get_gridcode_raster('ndvi') is not None
+    assert build_missing_gridcode_rasters(['ndvi']) == []
+
+
+@pytest.mark.parametrize('layer_name', CLIMATE_LAYERS)
+def test_raster_matches_polygon_lookup(rasters, layer_name):
+    report = accuracy_report(layer_name, samples=2000)
+    assert rasters[layer_name].integer
+    assert report['agreement'] == 1.0
+
+
+def test_points_off_the_grid_have_no_cell(rasters):
+    raster = rasters['lst']
+    x0, y0, dx, dy = raster.transform
+    height, width = raster.codes.shape
+    outside = [(y0 + dy, x0 + dx), (y0 - (height + 1) * dy, x0 + dx), (y0 - dy, x0 - dx), (y0 - dy, x0 + (width + 1) * dx)]
+    for lat, lng in outside:
+        assert raster.cell(lat, lng) is None
+        assert raster.lookup(lat, lng) is None
+    lats, lngs = zip(*outside)
+    assert np.isnan(raster.sample(lats, lngs)).all()
+    assert not raster.contains(lats, lngs).any()
+
+
+@pytest.mark.parametrize('layer_name', CLIMATE_LAYERS)
+def test_raster_lookups_fall_back_to_polygons_off_the_grid(rasters, grid_points, layer_name):
+    lats, lngs = grid_points(2000, seed=1, margin=0.02)
+    index = get_gridcode_index(layer_name)
+    expected = index.lookup_many(lats, lngs)
+
+    assert np.array_equal(lookup_gridcodes(layer_name, lats, lngs), expected, equal_nan=True)
+    single = [find_gridcode_for_point(layer_name, lat, lng) for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    assert [math.nan if code is None else code for code in single] == pytest.approx(expected.tolist(), nan_ok=True)
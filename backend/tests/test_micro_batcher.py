@@ -0,0 +1,101 @@
+# backend/tests/test_micro_batcher.py
+import threading
+import time
+
+import pytest
+
+from app.services.inference_pool import InferencePool, InferenceUnavailable
+from app.services.micro_batcher import MicroBatcher
+
+
+def submit_concurrently(batcher, items):
+    """Submit every item from its own thread; item -> ('ok', result) or (exception type, message)"""
+    outcomes = {}
+    start = threading.Barrier(len(items))
+
+    def call(item):
+        start.wait()
+        try:
+            outcomes[item] = ('ok', batcher.submit(item))
+        except Exception as e:
+            outcomes[item] = (type(e), str(e))
+
+    threads = [threading.Thread(target=call, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_concurrent_submits_share_batches():
+    calls = []
+
+    def double(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch=64, max_wait=0.05)
+    outcomes = submit_concurrently(batcher, list(range(32)))
+    assert outcomes == {item: ('ok', item * 2) for item in range(32)}
+    assert sum(calls) == 32
+    assert len(calls) < 32
+
+
+def test_bad_items_fail_only_their_callers():
+    def double_unless_bad(items):
+        if any(item % 5 == 0 for item in items):
+            raise ValueError("bad item")
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double_unless_bad, max_batch=64, max_wait=0.05)
+    outcomes = submit_concurrently(batcher, list(range(16)))
+    for item, outcome in outcomes.items():
+        assert outcome == ((ValueError, "bad item") if item % 5 == 0 else ('ok', item * 2))
+
+
+def test_batch_wide_errors_are_not_retried():
+    calls = []
+
+    def unavailable(items):
+        calls.append(len(items))
+        raise InferenceUnavailable("pool full", 503)
+
+    batcher = MicroBatcher(unavailable, max_batch=64, max_wait=0.05)
+    outcomes = submit_concurrently(batcher, list(range(16)))
+    assert all(outcome == (InferenceUnavailable, "pool full") for outcome in outcomes.values())
+    assert sum(calls) == 16  # one call per batch, no bisection
+
+
+def test_submit_times_out():
+    def slow(items):
+        time.sleep(0.5)
+        return items
+
+    batcher = MicroBatcher(slow, max_batch=4, max_wait=0.001, timeout=0.1,
+                           timeout_error=lambda message: InferenceUnavailable(message, 504))
+    with pytest.raises(InferenceUnavailable) as error:
+        batcher.submit(1)
+    assert error.value.status == 504
+    assert batcher.stats()['timeouts'] == 1
+
+
+def test_batches_run_on_the_executor_without_blocking_the_worker():
+    pool = InferencePool(executor='thread', workers=2, max_pending=8)
+    running = []
+    lock = threading.Lock()
+    overlap = []
+
+    def slow_double(items):
+        with lock:
+            running.append(1)
+            overlap.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.pop()
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(slow_double, max_batch=2, max_wait=0.001, executor=pool.submit, max_in_flight=2)
+    outcomes = submit_concurrently(batcher, list(range(8)))
+    assert outcomes == {item: ('ok', item * 2) for item in range(8)}
+    assert max(overlap) == 2
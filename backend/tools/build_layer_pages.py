@@ -0,0 +1,42 @@
+# backend/tools/build_layer_pages.py
+"""
+Pre-build the page chunks served by /api/data/geojson/<layer>.
+
+Run this at deploy time: the app builds missing chunks on a background
+thread after their first request and serves pages from the parsed layer
+until they are written.
+
+Usage (from the backend directory):
+    python -m tools.build_layer_pages [layer ...] [--per-page 1000]
+"""
+import argparse
+import time
+
+from app.config import LAYER_PAGE_SIZES
+from app.services.layer_store import VALID_LAYERS
+from app.services.layer_pages import build_page_set
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-serialize GeoJSON layers into page chunks')
+    parser.add_argument('layers', nargs='*', default=VALID_LAYERS, help='layers to build (default: all)')
+    parser.add_argument('--per-page', type=int, action='append', dest='page_sizes',
+                        help='page size to build, can be repeated (default: LAYER_PAGE_SIZES)')
+    args = parser.parse_args()
+
+    for layer_name in args.layers:
+        if layer_name not in VALID_LAYERS:
+            parser.error(f'unknown layer: {layer_name}')
+        for per_page in args.page_sizes or LAYER_PAGE_SIZES:
+            started = time.perf_counter()
+            index = build_page_set(layer_name, per_page)
+            if index is None:
+                print(f"{layer_name}: no GeoJSON file, skipped")
+                continue
+            print(f"{layer_name}: {index['total_pages']} pages of {per_page} "
+                  f"({index['offsets'][-1]} bytes, {index['gzip_offsets'][-1]} gzipped) "
+                  f"in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
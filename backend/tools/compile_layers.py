@@ -0,0 +1,48 @@
+# backend/tools/compile_layers.py
+"""
+Compile the GeoJSON layers into memory-mappable binary stores.
+
+Usage (from the backend directory):
+    python -m tools.compile_layers [layer ...] [--float64]
+"""
+import argparse
+import time
+
+from app.services.binary_store import compiled_layer_dir, open_compiled_layer, save_compiled_layer
+from app.services.geometry_store import load_compact_layer
+from app.services.layer_store import VALID_LAYERS, file_version, resolve_layer_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile GeoJSON layers into binary geometry stores')
+    parser.add_argument('layers', nargs='*', default=VALID_LAYERS, help='layers to compile (default: all)')
+    parser.add_argument('--float64', action='store_true',
+                        help='keep full float64 coordinates instead of float32 offsets')
+    parser.add_argument('--force', action='store_true', help='recompile layers that are already up to date')
+    args = parser.parse_args()
+
+    for layer_name in args.layers:
+        if layer_name not in VALID_LAYERS:
+            parser.error(f'unknown layer: {layer_name}')
+        path = resolve_layer_path(layer_name)
+        if path is None:
+            print(f"{layer_name}: no GeoJSON file, skipped")
+            continue
+        version = file_version(path)
+        if not args.force and open_compiled_layer(layer_name, version) is not None:
+            print(f"{layer_name}: up to date")
+            continue
+
+        started = time.perf_counter()
+        layer = load_compact_layer(path)
+        parsed = time.perf_counter()
+        save_compiled_layer(layer, layer_name, version, float64=args.float64)
+        saved = time.perf_counter()
+        open_compiled_layer(layer_name, version)
+        print(f"{layer_name}: {len(layer)} features, {layer.nbytes} bytes -> {compiled_layer_dir(layer_name)} "
+              f"(parse {parsed - started:.2f}s, write {saved - parsed:.2f}s, "
+              f"open {(time.perf_counter() - saved) * 1000:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
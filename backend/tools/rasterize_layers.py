@@ -0,0 +1,73 @@
+# backend/tools/rasterize_layers.py
+"""
+Rasterize the climate gridcode layers for array-indexed lookups.
+
+The cell size comes from GRIDCODE_RASTER_RESOLUTION (default: the pixel
+size the layer was polygonized from). Run this at build or deploy time:
+the app only opens saved rasters at startup. Layers still without one are
+rasterized on a background thread after startup (unless
+GRIDCODE_RASTER_BUILD_AT_STARTUP is false) and use the polygon lookup
+meanwhile; requests never build one.
+
+Usage (from the backend directory):
+    python -m tools.rasterize_layers [layer ...] [--force] [--report] [--samples 10000]
+"""
+import argparse
+import time
+
+from app.services.gridcode_raster import (
+    CLIMATE_LAYERS, accuracy_report, build_gridcode_raster, open_gridcode_raster, raster_dir,
+    save_gridcode_raster
+)
+from app.services.layer_store import layer_store
+
+
+def _percent(value):
+    return 'n/a' if value is None else f'{value:.2%}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rasterize gridcode layers into lookup grids')
+    parser.add_argument('layers', nargs='*', default=CLIMATE_LAYERS, help='layers to rasterize (default: climate layers)')
+    parser.add_argument('--force', action='store_true', help='rebuild rasters that are already up to date')
+    parser.add_argument('--report', action='store_true', help='compare raster and polygon lookups afterwards')
+    parser.add_argument('--samples', type=int, default=10000, help='random points per accuracy report')
+    args = parser.parse_args()
+
+    for layer_name in args.layers:
+        if layer_name not in CLIMATE_LAYERS:
+            parser.error(f'not a gridcode layer: {layer_name}')
+        version = layer_store.version(layer_name)
+        if version is None:
+            print(f"{layer_name}: no GeoJSON file, skipped")
+            continue
+
+        if args.force or open_gridcode_raster(layer_name, version) is None:
+            started = time.perf_counter()
+            raster = build_gridcode_raster(layer_store.get(layer_name))
+            if raster is None:
+                print(f"{layer_name}: no polygons or shapely 2.x unavailable, skipped")
+                continue
+            save_gridcode_raster(raster, layer_name, version)
+            height, width = raster.codes.shape
+            print(f"{layer_name}: {height}x{width} cells of {raster.resolution:.8f} deg, "
+                  f"{raster.meta['inside_fraction']:.1%} inside polygons, {raster.nbytes} bytes "
+                  f"-> {raster_dir(layer_name)} ({time.perf_counter() - started:.2f}s)")
+        else:
+            print(f"{layer_name}: up to date")
+
+        if args.report:
+            report = accuracy_report(layer_name, samples=args.samples)
+            if report is None:
+                print(f"{layer_name}: accuracy report needs shapely 2.x")
+                continue
+            print(f"  agreement with polygon lookup over {report['samples']} points: {report['agreement']:.2%} "
+                  f"(in polygons {_percent(report['agreement_in_polygons'])}, "
+                  f"nearest-polygon fallback {_percent(report['agreement_fallback'])})")
+            print(f"  per point: polygon {report['polygon_us_per_point']:.1f}us, "
+                  f"raster {report['raster_us_per_point']:.2f}us, "
+                  f"raster batch {report['raster_batch_ns_per_point']:.0f}ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+# backend/tools/recompute_climate_scores.py
+"""
+Recompute the climate score columns of the property CSV in the foreground.
+
+Interrupted runs resume from their checkpoints.
+
+Usage (from the backend directory):
+    python -m tools.recompute_climate_scores [--workers N] [--chunk-size N]
+"""
+import argparse
+
+from app.config import SCORE_JOB_WORKERS, SCORE_JOB_CHUNK_SIZE
+from app.services.score_job import ScoreJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute CSV climate scores against the current layers')
+    parser.add_argument('--workers', type=int, default=SCORE_JOB_WORKERS, help='worker processes')
+    parser.add_argument('--chunk-size', type=int, default=SCORE_JOB_CHUNK_SIZE, help='rows per chunk')
+    args = parser.parse_args()
+
+    status = ScoreJob(workers=args.workers, chunk_size=args.chunk_size).run()
+    print(f"Scored {status['scored_rows']} of {status['total_rows']} rows in {status['chunks_total']} chunks "
+          f"({status['resumed_chunks']} resumed) in {status['duration_seconds']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# backend/tools/seed_tiles.py
+"""
+Pre-seed the on-disk tile cache for a zoom range.
+
+Usage (from the backend directory):
+    python -m tools.seed_tiles [layer ...] --zoom 10-15
+"""
+import argparse
+import time
+
+from app.config import TILE_MIN_ZOOM, TILE_MAX_ZOOM
+from app.services.vector_tiles import TILE_LAYERS, get_tile, tile_range
+
+
+def parse_zoom_range(value):
+    low, _, high = value.partition('-')
+    low, high = int(low), int(high or low)
+    if not TILE_MIN_ZOOM <= low <= high <= TILE_MAX_ZOOM:
+        raise argparse.ArgumentTypeError(f'zoom range must lie within {TILE_MIN_ZOOM}-{TILE_MAX_ZOOM}')
+    return range(low, high + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-seed GeoJSON layer tiles')
+    parser.add_argument('layers', nargs='*', default=TILE_LAYERS, help='layers to seed (default: all tiled layers)')
+    parser.add_argument('--zoom', type=parse_zoom_range, default=parse_zoom_range('10-14'),
+                        help='zoom level or range, e.g. 12 or 10-15 (default: 10-14)')
+    args = parser.parse_args()
+
+    for layer_name in args.layers:
+        if layer_name not in TILE_LAYERS:
+            parser.error(f'unknown layer: {layer_name}')
+        for z in args.zoom:
+            tiles = tile_range(layer_name, z)
+            if tiles is None:
+                print(f"{layer_name}: no GeoJSON file, skipped")
+                break
+            columns, rows = tiles
+            started = time.perf_counter()
+            total_bytes = 0
+            for x in columns:
+                for y in rows:
+                    total_bytes += len(get_tile(layer_name, z, x, y))
+            print(f"{layer_name} z{z}: {len(columns) * len(rows)} tiles, "
+                  f"{total_bytes} bytes gzipped in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
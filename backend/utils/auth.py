@@ -0,0 +1,46 @@
+# backend/utils/auth.py
+import hmac
+from functools import wraps
+
+from flask import jsonify, request
+
+from app.config import ADMIN_TOKEN
+
+
+def is_admin_request():
+    """
+    Whether the current request carries the admin token, read from the
+    X-Admin-Token header or an "Authorization: Bearer" header. Always
+    False while ADMIN_TOKEN is not configured.
+    """
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get('X-Admin-Token', '')
+    authorization = request.headers.get('Authorization', '')
+    if not token and authorization.startswith('Bearer '):
+        token = authorization[len('Bearer '):]
+    return hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+
+def require_admin(view):
+    """
+    Restrict a route to requests carrying the admin token (see
+    is_admin_request). Routes are disabled entirely while ADMIN_TOKEN is
+    not configured.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({
+                "status": "error",
+                "message": "Admin endpoints are disabled (ADMIN_TOKEN is not set)"
+            }), 403
+
+        if not is_admin_request():
+            return jsonify({
+                "status": "error",
+                "message": "Admin token required"
+            }), 401
+        return view(*args, **kwargs)
+
+    return wrapper